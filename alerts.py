@@ -0,0 +1,255 @@
+# alerts.py
+import os
+import json
+import time
+import queue
+import threading
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Callable
+
+PRICE_INDEX_FILE = "price_index.json"
+
+
+class PriceIndex:
+    """
+    In-memory latest / all-time-low price per (domain, ASIN), persisted as JSON.
+
+    Lookups and updates are dict operations, so checking a record costs the same
+    whether 10 or 100k ASINs are tracked.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, List[Any]] = {}     # key -> [last_price, min_price, last_seen]
+        self._dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except Exception:
+                self._data = {}
+
+    @staticmethod
+    def key(product: Dict[str, Any]) -> Optional[str]:
+        asin = product.get("asin")
+        if not asin or asin == "UNKNOWN":
+            return None
+        return f"{product.get('country') or ''}:{asin}"
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        return self._data.get(key)
+
+    def update(self, key: str, price: float) -> Optional[List[Any]]:
+        """Store the new price; returns the previous entry (None for a first sighting)."""
+        with self._lock:
+            prev = self._data.get(key)
+            low = price if prev is None or prev[1] is None else min(prev[1], price)
+            self._data[key] = [price, low, datetime.utcnow().isoformat()]
+            self._dirty = True
+        return prev
+
+    def __len__(self):
+        return len(self._data)
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            data = dict(self._data)
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+
+class AlertRule:
+    """
+    Thresholds for a price drop. Any of them may be unset:
+       drop_abs      — alert when the price fell by at least this amount
+       drop_pct      — alert when the price fell by at least this percentage
+       all_time_low  — alert when the price is below every price seen before
+       below         — alert when the price is at or below this target
+    """
+
+    def __init__(self, drop_abs: Optional[float] = None, drop_pct: Optional[float] = None,
+                 all_time_low: bool = False, below: Optional[float] = None):
+        self.drop_abs = drop_abs or None
+        self.drop_pct = drop_pct or None
+        self.all_time_low = bool(all_time_low)
+        self.below = below or None
+
+    @classmethod
+    def from_filters(cls, filters: Dict[str, Any]) -> "AlertRule":
+        def num(key):
+            try:
+                v = filters.get(key)
+                return float(v) if v not in (None, "", 0, 0.0) else None
+            except Exception:
+                return None
+        return cls(drop_abs=num("alert_drop_abs"), drop_pct=num("alert_drop_pct"),
+                   all_time_low=filters.get("alert_all_time_low", False), below=num("alert_below"))
+
+    @property
+    def active(self) -> bool:
+        return bool(self.drop_abs or self.drop_pct or self.all_time_low or self.below)
+
+    def reasons(self, price: float, prev: Optional[List[Any]]) -> List[str]:
+        out = []
+        if self.below is not None and price <= self.below:
+            out.append(f"at or below target {self.below:g}")
+        if prev is None:
+            return out
+        last, low = prev[0], prev[1]
+        if last:
+            drop = last - price
+            if self.drop_abs is not None and drop >= self.drop_abs:
+                out.append(f"dropped {drop:.2f}")
+            if self.drop_pct is not None and drop > 0 and drop / last * 100 >= self.drop_pct:
+                out.append(f"dropped {drop / last * 100:.1f}%")
+        if self.all_time_low and low is not None and price < low:
+            out.append(f"all-time low (previous low {low:g})")
+        return out
+
+
+class Alert:
+    __slots__ = ("asin", "title", "url", "country", "currency", "price", "previous", "low", "reasons", "ts")
+
+    def __init__(self, product: Dict[str, Any], prev: Optional[List[Any]], reasons: List[str]):
+        self.asin = product.get("asin")
+        self.title = product.get("title", "")
+        self.url = product.get("url", "")
+        self.country = product.get("country", "")
+        self.currency = product.get("currency", "")
+        self.price = product.get("price")
+        self.previous = prev[0] if prev else None
+        self.low = prev[1] if prev else None
+        self.reasons = reasons
+        self.ts = datetime.utcnow().isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def message(self) -> str:
+        was = f" (was {self.previous:g})" if self.previous is not None else ""
+        return f"{self.asin} {self.price:g} {self.currency}{was}: {', '.join(self.reasons)} — {self.title[:60]}"
+
+
+# ---------------- sinks ----------------
+class FileAlertSink:
+    """Appends alerts as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __call__(self, alert: Alert):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(alert.to_dict(), ensure_ascii=False) + "\n")
+
+
+class WebhookAlertSink:
+    """
+    POSTs each alert as JSON. `post` can be swapped for a stand-in (tests, dry runs).
+
+    Alerts are queued and posted from a daemon thread, so a slow or unreachable
+    webhook never holds up the records being checked. close() drains the queue for
+    at most `drain_timeout` seconds; alerts still queued after that (or beyond
+    `max_pending`) are counted in `dropped`, failed posts in `failed`.
+    """
+
+    def __init__(self, url: str, post: Optional[Callable[..., Any]] = None, timeout: float = 5.0,
+                 max_pending: int = 1000, drain_timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.drain_timeout = drain_timeout
+        if post is None:
+            import requests
+            post = requests.post
+        self._post = post
+        self.sent = self.failed = self.dropped = 0
+        self._queue: "queue.Queue[Optional[Alert]]" = queue.Queue()
+        self._deadline: Optional[float] = None
+        self._thread = threading.Thread(target=self._drain, name="alert-webhook", daemon=True)
+        self._thread.start()
+
+    def __call__(self, alert: Alert):
+        if self._deadline is not None or self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+        self._queue.put(alert)
+
+    def _drain(self):
+        while True:
+            alert = self._queue.get()
+            if alert is None:
+                return
+            if self._deadline is not None and time.monotonic() > self._deadline:
+                self.dropped += 1
+                continue
+            try:
+                self._post(self.url, json=alert.to_dict(), timeout=self.timeout)
+                self.sent += 1
+            except Exception:
+                self.failed += 1
+
+    def close(self):
+        if self._deadline is not None:
+            return
+        self._deadline = time.monotonic() + self.drain_timeout
+        self._queue.put(None)
+        self._thread.join(self.drain_timeout + self.timeout)
+
+
+class CallbackAlertSink:
+    """Hands alerts to a callable — the worker uses it to raise a GUI notification."""
+
+    def __init__(self, callback: Callable[[Alert], None]):
+        self.callback = callback
+
+    def __call__(self, alert: Alert):
+        self.callback(alert)
+
+
+class AlertEngine:
+    def __init__(self, index: PriceIndex, rule: AlertRule, sinks: Optional[List[Callable[[Alert], None]]] = None):
+        self.index = index
+        self.rule = rule
+        self.sinks = list(sinks or [])
+        self.fired = 0
+
+    def check(self, product: Dict[str, Any]) -> Optional[Alert]:
+        """Compare a record against the last known price, update the index, dispatch any alert."""
+        price = product.get("price")
+        key = PriceIndex.key(product)
+        if key is None or price is None:
+            return None
+        prev = self.index.update(key, price)
+        if not self.rule.active:
+            return None
+        reasons = self.rule.reasons(price, prev)
+        if not reasons:
+            return None
+        alert = Alert(product, prev, reasons)
+        self.fired += 1
+        for sink in self.sinks:
+            try:
+                sink(alert)
+            except Exception:
+                pass
+        return alert
+
+    def close(self):
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+        self.index.save()
@@ -1,12 +1,72 @@
 # amazon_api.py
 import time
+import itertools
 import random
 import re
-from typing import List, Optional, Dict, Any
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-import undetected_chromedriver as uc
+from typing import List, Optional, Dict, Any, Callable
+
+import html_extract
+from metrics import NullMetrics
+from price_parsing import NumberParser, marketplace_of
+from currency import detect_currency
+from records import ProductRecord, RunContext
+from lean_browsing import LeanBrowsing
+from rate_limiter import RateLimiter
+from refinements import compile_filters, CARD_CHECKABLE
+from driver_watchdog import DriverWatchdog
+from cancellation import CancellationToken, Cancelled
+from tab_pool import TabPool
+from variations import extract_variations
+from selector_registry import SelectorRegistry
+
+
+class By:
+    """Locator strategies (same values as selenium's By) — keeps selenium out of import time."""
+    ID = "id"
+    XPATH = "xpath"
+    LINK_TEXT = "link text"
+    PARTIAL_LINK_TEXT = "partial link text"
+    NAME = "name"
+    TAG_NAME = "tag name"
+    CLASS_NAME = "class name"
+    CSS_SELECTOR = "css selector"
+
+
+_SELENIUM = None
+
+
+def _selenium():
+    """(webdriver, WebDriverWait, uc) imported on first driver creation; uc is None if not installed."""
+    global _SELENIUM
+    if _SELENIUM is None:
+        from selenium import webdriver
+        from selenium.webdriver.support.ui import WebDriverWait
+        try:
+            import undetected_chromedriver as uc
+        except Exception:
+            uc = None
+        _SELENIUM = (webdriver, WebDriverWait, uc)
+    return _SELENIUM
+
+
+_ASIN_URL_RE = re.compile(r"/([A-Z0-9]{10})(?:[/?]|$)")
+
+# Readiness conditions per page type, evaluated in one execute_script per poll.
+# A captcha page or a fully loaded document also counts as ready so empty result
+# pages and blocks do not wait for the whole timeout.
+_CAPTCHA_JS = "document.querySelector(\"form[action*='validateCaptcha']\")"
+READY_JS = {
+    "search": (
+        "return !!(document.querySelector(\"div[data-component-type='s-search-result']\")"
+        f" || {_CAPTCHA_JS}) || document.readyState === 'complete';"
+    ),
+    "product": (
+        "return !!((document.getElementById('productTitle') && document.querySelector("
+        "'#corePrice_feature_div, #corePriceDisplay_desktop_feature_div, #apex_desktop, #priceblock_ourprice, "
+        "#priceblock_dealprice, #price_inside_buybox, #availability'))"
+        f" || {_CAPTCHA_JS}) || document.readyState === 'complete';"
+    ),
+}
 
 # CONFIG - tweak these lists if you want
 PROXIES = []
@@ -47,20 +107,50 @@ class AmazonAPI:
         use_uc: bool = True,
         headless: bool = False,
         pages_per_proxy: int = 2,
+        metrics: Optional[Any] = None,
+        archive: Optional[Any] = None,
+        fetch_mode: str = "browser",
+        lean: Optional[Any] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        watchdog: Optional[DriverWatchdog] = None,
+        cancel: Optional[CancellationToken] = None,
+        selectors: Optional[SelectorRegistry] = None,
     ):
         self.base_url = (base_url or "https://www.amazon.com").rstrip("/")
         self.search_term = search_term or ""
         self.filters = filters or {}
-        self.currency = currency
+        # records carry ISO codes; the GUI hands over a symbol ("$", "€")
+        self.currency = detect_currency(currency, self.base_url)
         self.use_uc = use_uc
         self.headless = headless
         self.pages_per_proxy = pages_per_proxy or int(self.filters.get("pages_per_proxy", 2))
         self.requester = requester
         self.country = country
+        self.numbers = NumberParser.for_domain(self.base_url)
+        self.marketplace = marketplace_of(self.base_url)
+        # field selectors, tried in hit-rate order (selector_registry.py)
+        self.selectors = selectors or SelectorRegistry()
+        self.context = RunContext.from_filters(self.filters)
+        self.pushdown = compile_filters(self.filters, self.base_url)
+        self.metrics = metrics or NullMetrics()
+        self.archive = archive
+        # lean page loads (lean_browsing.LeanBrowsing): blocked images/fonts/ads, eager load strategy
+        if lean is None and self.filters.get("lean_browsing"):
+            lean = LeanBrowsing(metrics=self.metrics, sample_every=int(self.filters.get("lean_sample_every", 25) or 0))
+        self.lean = lean
+        # "browser" drives Chrome; "http" fetches raw HTML through `requester` and parses it with html_extract
+        self.fetch_mode = fetch_mode or "browser"
 
         self.driver = None
         self.wait = None
-        self._stop_requested = False
+        # stop signal shared with the worker and sibling engines (cancellation.py)
+        self.cancel = cancel or CancellationToken()
+        # pages proceed as soon as they are extractable (READY_JS); pacing between loads is
+        # the rate limiter's job — benchmarks pass RateLimiter(0, 0)
+        self.rate_limiter = rate_limiter or RateLimiter.from_filters(self.filters)
+        self.ready_timeout = float(self.filters.get("ready_timeout", 10) or 10)
+        # page-load / script timeouts, hung-driver kills and RSS recycling (driver_watchdog.py)
+        self.watchdog = watchdog or DriverWatchdog.from_filters(self.filters, self.metrics)
 
     # ---------------- low-level driver helpers ----------------
     def _get_next_proxy(self, explicit_proxy: Optional[str] = None) -> Optional[str]:
@@ -77,16 +167,12 @@ class AmazonAPI:
 
     def create_driver(self, proxy: Optional[str] = None):
         # close existing
-        try:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        if self.driver:
+            self.cleanup()
 
-        if self.use_uc:
+        webdriver, WebDriverWait, uc = _selenium()
+        use_uc = self.use_uc and uc is not None
+        if use_uc:
             options = uc.ChromeOptions()
         else:
             options = webdriver.ChromeOptions()
@@ -102,6 +188,10 @@ class AmazonAPI:
         if self.headless:
             options.add_argument("--headless=new")
 
+        if self.lean is not None:
+            self.lean.configure(options)
+        self.watchdog.configure(options)
+
         try:
             ua = random_user_agent()
             options.add_argument(f"user-agent={ua}")
@@ -117,72 +207,87 @@ class AmazonAPI:
                 pass
 
         try:
-            if self.use_uc:
-                try:
-                    self.driver = uc.Chrome(options=options)
-                except Exception:
+            with self.metrics.span("create_driver"):
+                if use_uc:
+                    try:
+                        self.driver = uc.Chrome(options=options)
+                    except Exception:
+                        self.metrics.inc("retries")
+                        self.driver = webdriver.Chrome(options=options)
+                else:
                     self.driver = webdriver.Chrome(options=options)
-            else:
-                self.driver = webdriver.Chrome(options=options)
         except Exception as e:
             raise RuntimeError(f"Failed to create driver: {e}")
 
-        # short wait helper
+        self.watchdog.attach(self.driver)
+        if self.lean is not None and not self.lean.attach(self.driver):
+            self.metrics.inc("lean_unavailable")
+
+        # readiness polling (see _wait_ready)
         try:
-            self.wait = WebDriverWait(self.driver, 12)
+            self.wait = WebDriverWait(self.driver, self.ready_timeout, poll_frequency=0.1)
         except Exception:
             self.wait = None
-
-        # warmup
-        time.sleep(random.uniform(0.8, 1.6))
         return self.driver
 
     def cleanup(self):
+        driver, self.driver = self.driver, None
+        if not driver:
+            return
+        # quit(); survivors of the pre-quit process tree (renderers, a hung chromedriver) are killed
         try:
-            if self.driver:
-                # try to stop service process if available (best-effort)
-                try:
-                    svc = getattr(self.driver, "service", None)
-                    proc = getattr(svc, "process", None)
-                    if proc:
-                        try:
-                            proc.kill()
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-                try:
-                    self.driver.quit()
-                except Exception:
-                    pass
+            self.watchdog.quit(driver)
         except Exception:
             pass
-        finally:
-            self.driver = None
+
+    def clone(self) -> "AmazonAPI":
+        """Independent engine (own driver) with the same settings; shares metrics, archive and requester."""
+        twin = AmazonAPI(
+            search_term=self.search_term,
+            filters=self.filters,
+            base_url=self.base_url,
+            requester=self.requester,
+            country=self.country,
+            currency=self.currency,
+            use_uc=self.use_uc,
+            headless=self.headless,
+            pages_per_proxy=self.pages_per_proxy,
+            metrics=self.metrics,
+            archive=self.archive,
+            fetch_mode=self.fetch_mode,
+            lean=self.lean,
+            rate_limiter=self.rate_limiter,
+            watchdog=self.watchdog,
+            cancel=self.cancel,
+            selectors=self.selectors,
+        )
+        return twin
 
     def stop(self):
-        self._stop_requested = True
-        # attempt immediate cleanup
-        try:
-            self.cleanup()
-        except Exception:
-            pass
+        # safe from any thread: in-flight loads are interrupted, the owning thread cleans up
+        self.cancel.cancel("stopped")
 
     def should_stop(self) -> bool:
-        return self._stop_requested
+        return self.cancel.cancelled
+
+    def _is_blocked(self) -> bool:
+        # Amazon serves a captcha / "sorry" page instead of content when it blocks a client
+        try:
+            cur = (self.driver.current_url or "").lower()
+            if "validatecaptcha" in cur or "/errors/" in cur:
+                return True
+            src = self.driver.page_source or ""
+            return "Enter the characters you see below" in src or "api-services-support@amazon.com" in src
+        except Exception:
+            return False
 
     # ---------------- URL builder / page scraping ----------------
     def build_search_url(self, page: int = 1) -> str:
         base = self.base_url.rstrip("/")
         q = (self.search_term or "").strip()
         q_enc = q.replace(" ", "+")
-        url = f"{base}/s?k={q_enc}"
-
-        min_p = self.filters.get("min", None)
-        max_p = self.filters.get("max", None)
-        price_fragment = self._price_fragment_for_domain(self.base_url, min_p, max_p)
-        if price_fragment:
-            url = url + price_fragment
+        # price, category and known refinements (Prime, rating, brand, ...) are applied by Amazon
+        url = f"{base}/s?k={q_enc}" + self.pushdown.query()
 
         # safe page handling
         try:
@@ -196,45 +301,8 @@ class AmazonAPI:
         if page_num > 1:
             url = url + f"&page={page_num}"
 
-        if self.filters.get("category_node"):
-            url += f"&i={self.filters.get('category_node')}"
-
         return url
 
-    def _price_fragment_for_domain(self, domain: str, min_p, max_p) -> str:
-        if (min_p is None or min_p == "") and (max_p is None or max_p == ""):
-            return ""
-        try:
-            min_val = float(min_p) if min_p is not None and str(min_p).strip() != "" else None
-            max_val = float(max_p) if max_p is not None and str(max_p).strip() != "" else None
-        except Exception:
-            return ""
-
-        domain_name = domain.split("//")[-1].split("/")[0].lower()
-        if domain_name.endswith((".com", ".ca", ".com.au", ".co.uk")):
-            parts = []
-            if min_val is not None:
-                parts.append(f"low-price={int(min_val)}")
-            if max_val is not None:
-                parts.append(f"high-price={int(max_val)}")
-            if parts:
-                return "&" + "&".join(parts)
-            return ""
-
-        if domain_name.endswith((".de", ".fr", ".it", ".es", ".nl", ".se", ".pl")):
-            min_cents = int(min_val * 100) if min_val is not None else 0
-            max_cents = int(max_val * 100) if max_val is not None else 0
-            return f"&rh=p_36:{min_cents}-{max_cents}"
-
-        parts = []
-        if min_val is not None:
-            parts.append(f"low-price={int(min_val)}")
-        if max_val is not None:
-            parts.append(f"high-price={int(max_val)}")
-        if parts:
-            return "&" + "&".join(parts)
-        return ""
-
     def scrape_products(self, url: Optional[str] = None, page: int = 1, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Scrape a search results page and return partial product dicts (listing info).
         This is useful for iterating pages without immediately visiting product pages.
@@ -251,29 +319,73 @@ class AmazonAPI:
         else:
             search_url = self.build_search_url(page=page)
 
+        if self.fetch_mode == "http":
+            return self._scrape_products_http(search_url)
+
         # Ensure a driver
         if not self.driver:
             try:
                 self.create_driver(proxy=self._get_next_proxy(None))
             except Exception:
+                self.metrics.inc("retries")
                 self.create_driver(proxy=None)
 
         try:
-            self.driver.get(search_url)
+            self._driver_get(search_url, "search")
+        except Cancelled:
+            return []
         except Exception:
+            self.metrics.inc("page_errors")
             return []
-
-        time.sleep(random.uniform(1.0, 2.0))
-        results = self._extract_search_page_products()
+        self.metrics.inc("pages")
+        if self._is_blocked():
+            self.metrics.inc("blocks")
+        with self.metrics.span("extract_search_page"):
+            results = self._extract_search_page_products()
+        self.metrics.inc("listings", len(results))
+        self._archive_page("search", search_url, results, page=page)
 
         # clean up driver to avoid many open browsers; caller may reopen as needed
+        self.cleanup()
+
+        return results
+
+    def fetch_html(self, url: str) -> str:
+        """Fetch a page without a browser (through the rotating proxy requester)."""
+        if self.requester is None:
+            raise RuntimeError("fetch_mode 'http' requires a requester")
+        headers = {
+            "User-Agent": random_user_agent(),
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept": "text/html,application/xhtml+xml",
+        }
+        # the pipeline fetches from several threads; the shared limiter paces them per host
+        with self.metrics.span("politeness_wait"):
+            self.rate_limiter.acquire(url, sleep=self.cancel.sleep)
+        with self.metrics.span("http_get"):
+            resp = self.cancel.call(self.requester.get, url, headers=headers)
+        html = resp.text or ""
+        if "validateCaptcha" in html or "Enter the characters you see below" in html:
+            self.metrics.inc("blocks")
+        return html
+
+    def _scrape_products_http(self, search_url: str) -> List[Dict[str, Any]]:
         try:
-            if self.driver:
-                self.driver.quit()
+            html = self.fetch_html(search_url)
+        except Cancelled:
+            return []
         except Exception:
-            pass
-        self.driver = None
-
+            self.metrics.inc("page_errors")
+            return []
+        self.metrics.inc("pages")
+        with self.metrics.span("extract_search_page"):
+            results = html_extract.extract_search_page(html, self.base_url)
+        self.metrics.inc("listings", len(results))
+        if self.archive is not None:
+            try:
+                self.archive.store(html, "search", search_url, results, base_url=self.base_url)
+            except Exception:
+                pass
         return results
 
     def _extract_search_page_products(self) -> List[Dict[str, Any]]:
@@ -312,8 +424,7 @@ class AmazonAPI:
                         frac = c.find_element(By.CLASS_NAME, "a-price-fraction").text
                     except Exception:
                         frac = ""
-                    price_text = whole + (("." + frac) if frac else "")
-                    price = self._normalize_price_text(price_text)
+                    price = self._join_price_parts(whole, frac)
                 except Exception:
                     try:
                         el = c.find_element(By.XPATH, ".//span[contains(@class,'a-offscreen')]")
@@ -328,11 +439,33 @@ class AmazonAPI:
                 except Exception:
                     img = ""
 
+                rating = None
+                try:
+                    r_el = c.find_element(By.XPATH, ".//span[contains(@class,'a-icon-alt')]")
+                    rating = self.numbers.parse_rating(r_el.get_attribute("textContent") or r_el.text)
+                except Exception:
+                    rating = None
+
+                reviews = None
+                try:
+                    rv_el = c.find_element(By.XPATH, ".//span[contains(@class,'s-underline-text')]")
+                    reviews = self.numbers.parse_int(rv_el.get_attribute("textContent") or rv_el.text)
+                except Exception:
+                    reviews = None
+
+                try:
+                    prime = bool(c.find_elements(By.XPATH, ".//i[contains(@class,'a-icon-prime')]"))
+                except Exception:
+                    prime = False
+
                 results.append({
                     "asin": asin,
                     "title": title,
                     "url": url,
                     "price": price,
+                    "rating": rating,
+                    "reviews": reviews,
+                    "prime": prime,
                     "image_url": img,
                     "image": img,
                 })
@@ -341,20 +474,110 @@ class AmazonAPI:
 
         return results
 
-    def _normalize_price_text(self, raw: str) -> Optional[float]:
-        if not raw:
-            return None
-        p = raw.strip()
-        p = p.replace("€", "").replace("$", "").replace("£", "")
-        if "." in p and "," in p:
-            p = p.replace(".", "").replace(",", ".")
-        else:
-            p = p.replace(",", ".")
-        p = re.sub(r"[^\d\.\-]", "", p)
+    def listing_record(self, listing: Dict[str, Any]) -> Dict[str, Any]:
+        """Report row built from a search card alone (fast scan mode, no product page visit)."""
+        return {
+            "asin": listing.get("asin") or "",
+            "url": listing.get("url") or "",
+            "title": (listing.get("title") or "").strip(),
+            "price": listing.get("price"),
+            "rating": listing.get("rating"),
+            "reviews": listing.get("reviews"),
+            "prime": bool(listing.get("prime")),
+            "image_url": listing.get("image_url") or "",
+            "currency": detect_currency(None, self.base_url),
+            "country": self.base_url.split("//")[-1].split(".")[-1].upper(),
+        }
+
+    def _passes_listing_filters(self, row: Dict[str, Any]) -> bool:
+        """Subset of _passes_advanced_filters that can be decided from a search card.
+
+        Fields a card does not carry (availability, BSR, seller) are not checked.
+        """
+        f = self.filters
+        p = row.get("price")
+        if p is not None:
+            try:
+                min_p = float(f.get("min")) if f.get("min", "") not in ("", None) else -1e12
+                max_p = float(f.get("max")) if f.get("max", "") not in ("", None) else 1e12
+            except Exception:
+                min_p, max_p = -1e12, 1e12
+            if p < min_p or p > max_p:
+                return False
+
+        rating = row.get("rating")
+        if rating is not None:
+            min_rating = float(f.get("min_rating", 0)) if f.get("min_rating", "") != "" else 0
+            max_rating = float(f.get("max_rating", 5)) if f.get("max_rating", "") != "" else 5
+            if rating < min_rating or rating > max_rating:
+                return False
+
+        reviews = row.get("reviews")
+        if reviews is not None:
+            if reviews < int(f.get("min_reviews", 0)) or reviews > int(f.get("max_reviews", 1000000000)):
+                return False
+
+        if f.get("prime_only") and not row.get("prime"):
+            return False
+
+        title = (row.get("title") or "").lower()
+        if f.get("brand") and f.get("brand").lower() not in title:
+            return False
+        brands = f.get("brands")
+        if brands and isinstance(brands, list) and not any(b.lower() in title for b in brands):
+            return False
+        for kw in f.get("include_keywords") or []:
+            if kw.lower() not in title:
+                return False
+        for kw in f.get("exclude_keywords") or []:
+            if kw.lower() in title:
+                return False
+        return True
+
+    def prefilter_listing(self, row: Dict[str, Any]) -> bool:
+        """Reject a search card before its product page is opened.
+
+        Only the client-side filters a card can decide (CARD_CHECKABLE) are checked;
+        a field missing from the card passes, the product page check decides it.
+        """
+        checks = [name for name in self.pushdown.client_side if name in CARD_CHECKABLE]
+        if not checks:
+            return True
+        f = self.filters
         try:
-            return float(p)
+            rating = row.get("rating")
+            if rating is not None:
+                if "min_rating" in checks and rating < float(f.get("min_rating") or 0):
+                    return False
+                if "max_rating" in checks and rating > float(f.get("max_rating") or 5):
+                    return False
+            reviews = row.get("reviews")
+            if reviews is not None:
+                if "min_reviews" in checks and reviews < int(f.get("min_reviews") or 0):
+                    return False
+                if "max_reviews" in checks and reviews > int(f.get("max_reviews") or 1000000000):
+                    return False
         except Exception:
-            return None
+            return True
+        if "prime_only" in checks and row.get("prime") is False:
+            return False
+        title = (row.get("title") or "").lower()
+        if title:
+            if any(kw.lower() not in title for kw in f.get("include_keywords") or []):
+                return False
+            if any(kw.lower() in title for kw in f.get("exclude_keywords") or []):
+                return False
+        return True
+
+    def _normalize_price_text(self, raw: str) -> Optional[float]:
+        return self.numbers.parse_price(raw)
+
+    def _join_price_parts(self, whole: str, frac: str) -> Optional[float]:
+        # a-price-whole text carries its own trailing separator ("1.299," on .de, "189." on .com)
+        whole = (whole or "").strip().rstrip(".,")
+        if frac:
+            return self.numbers.parse_price(whole + self.numbers.fmt.decimal + frac.strip())
+        return self.numbers.parse_price(whole)
 
     # ---------------- product page scraping ----------------
     def get_single_product_info(self, url: str) -> Optional[Dict[str, Any]]:
@@ -371,31 +594,170 @@ class AmazonAPI:
                 return None
         return self._visit_and_extract(url)
 
+    def product_url(self, listing: Dict[str, Any]) -> Optional[str]:
+        """Canonical /dp/ URL for a listing (sponsored redirect links are not fetchable over HTTP)."""
+        asin = listing.get("asin")
+        if asin:
+            return f"{self.base_url}/dp/{asin}"
+        return listing.get("url") or None
+
+    def _visit_and_extract_http(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            html = self.fetch_html(url)
+        except Cancelled:
+            return None
+        except Exception:
+            self.metrics.inc("page_errors")
+            return None
+        self.metrics.inc("product_pages")
+        product = None
+        try:
+            with self.metrics.span("extract_product_page"):
+                product = html_extract.extract_product_page(html, url, self.base_url, currency=self.currency, filters=self.filters)
+        finally:
+            self._archive_page("product", url, product, html=html)
+        return product
+
     def _visit_and_extract(self, url: str) -> Optional[Dict[str, Any]]:
         if self.should_stop():
             return None
 
+        if self.fetch_mode == "http":
+            return self._visit_and_extract_http(url)
+
         if not self.driver:
             try:
                 self.create_driver(proxy=self._get_next_proxy(None))
             except Exception:
+                self.metrics.inc("retries")
                 self.create_driver(proxy=None)
 
         try:
-            self.driver.get(url)
+            self._driver_get(url, "product")
+        except Cancelled:
+            return None
         except Exception:
+            self.metrics.inc("page_errors")
             return None
+        return self._extract_product(url)
+
+    def visit_many(self, urls: List[str], tabs: Optional[int] = None):
+        """Yield (url, product or None) for product pages, in completion order.
 
-        time.sleep(random.uniform(1.0, 2.2))
+        With tabs > 1 one browser keeps that many loads in flight (tab_pool.TabPool)
+        instead of loading pages one after another. http fetch mode and tabs <= 1 visit
+        the URLs sequentially. Lean mode keeps blocking on in tab mode, without
+        unblocked baseline samples (they would affect every open tab).
+        """
+        tabs = int(tabs or self.filters.get("browser_tabs", 1) or 1)
+        if self.fetch_mode == "http" or tabs <= 1:
+            for url in urls:
+                if self.should_stop():
+                    return
+                yield url, self._visit_and_extract(url)
+            return
+
+        # the pool is drained every `batch` loads so an over-budget browser can be recycled;
+        # `urls` is consumed lazily, so the caller may still drop URLs it no longer needs
+        batch = tabs * self.watchdog.check_every
+        source = iter(urls)
+        recycle = [False]
+
+        def before_start(url):
+            self.cancel.check()
+            if self.watchdog.needs_recycle(self.driver):
+                recycle[0] = True
+            with self.metrics.span("politeness_wait"):
+                self.rate_limiter.acquire(url, sleep=self.cancel.sleep)
+
+        while not self.should_stop():
+            started: List[str] = []
+
+            def feed():
+                for url in itertools.islice(source, batch):
+                    started.append(url)
+                    yield url
+
+            if not self.driver or recycle[0]:
+                recycle[0] = False
+                try:
+                    self.create_driver(proxy=self._get_next_proxy(None))
+                except Exception:
+                    self.metrics.inc("retries")
+                    self.create_driver(proxy=None)
+            driver = self.driver
+            pool = TabPool(driver, size=tabs, ready_js=READY_JS["product"],
+                           timeout=self.watchdog.page_load_timeout + self.ready_timeout,
+                           should_stop=self.should_stop, before_start=before_start, sleep=self.cancel.sleep)
+            done = set()
+            try:
+                with self.cancel.on_cancel(lambda: self.watchdog.kill(driver)):
+                    pool.open()
+                    for url, ready in pool.run(feed()):
+                        done.add(url)
+                        if not ready:
+                            self.metrics.inc("ready_timeouts")
+                        if self.lean is not None:
+                            self.lean.after_get(driver, "product", False, 0.0)
+                        yield url, self._extract_product(url)
+            except Cancelled:
+                self.cleanup()
+                return
+            except Exception:
+                # a dead or wedged browser: report the rest of the batch as failed, start fresh
+                self.metrics.inc("page_errors")
+                self.cleanup()
+                if self.should_stop():
+                    return
+                for url in started:
+                    if url not in done:
+                        yield url, None
+            finally:
+                # also runs when the consumer stops early (max products)
+                if self.driver is driver:
+                    pool.close()
+            if not started:
+                return
+
+    def _extract_product(self, url: str) -> Optional[Dict[str, Any]]:
+        """Product record from the page the driver is currently on.
+
+        The page source is archived whatever extraction returns: pages without a
+        title or price (blocks, layout changes) are the ones worth replaying.
+        """
+        self.metrics.inc("product_pages")
+        try:
+            page_source = self.driver.page_source or ""
+        except Exception:
+            page_source = ""
+        product = None
+        try:
+            product = self._product_from_page(url, page_source)
+        finally:
+            self._archive_page("product", url, product, html=page_source)
+        return product
 
-        title = self._safe_text_by_id("productTitle") or ""
-        price = self.get_price()
-        rating = self._extract_rating()
-        review_count = self._extract_review_count()
-        images = self._extract_images()
-        availability = self._extract_availability()
-        seller_info = self._extract_seller_info()
-        bsr = self._extract_bsr()
+    def _product_from_page(self, url: str, page_source: str) -> Optional[ProductRecord]:
+        if self._is_blocked():
+            self.metrics.inc("blocks")
+
+        m = self.metrics
+        with m.span("extract_title"):
+            title = self._safe_text_by_id("productTitle") or ""
+        with m.span("extract_price"):
+            price = self.get_price()
+        with m.span("extract_rating"):
+            rating = self._extract_rating()
+        with m.span("extract_review_count"):
+            review_count = self._extract_review_count()
+        with m.span("extract_images"):
+            images = self._extract_images()
+        with m.span("extract_availability"):
+            availability = self._extract_availability()
+        with m.span("extract_seller_info"):
+            seller_info = self._extract_seller_info()
+        with m.span("extract_bsr"):
+            bsr = self._extract_bsr()
 
         # description
         description = ""
@@ -434,15 +796,15 @@ class AmazonAPI:
             else:
                 seller_type = "fbm"
 
-        discount = False
-        try:
-            src = (self.driver.page_source or "").lower()
-            if "you save" in src or "was $" in src or "was €" in src or "save" in src:
-                discount = True
-        except Exception:
-            discount = False
+        src = page_source.lower()
+        discount = "you save" in src or "was $" in src or "was €" in src or "save" in src
+
+        # sibling variants (twister data): one visit covers the whole family
+        with m.span("extract_variations"):
+            parent_asin, variations = extract_variations(page_source, self.numbers)
 
-        currency = self.currency or ""
+        with m.span("extract_currency"):
+            currency = self._extract_currency()
         country = self.base_url.split("//")[-1].split(".")[-1].upper()
 
         if not title and not price:
@@ -450,39 +812,109 @@ class AmazonAPI:
 
         main_image = images[0] if images else ""
 
-        product = {
-            "asin": self.extract_asin(url),
-            "url": url,
-            "title": title or "",
-            "description": description or "",
-            "seller": seller_info or "",
-            "price": price,
-            "rating": rating,
-            "reviews": review_count,
-            "images": images,
-            "image_url": main_image,
-            "image": main_image,
-            "currency": currency,
-            "availability": availability,
-            "seller_info": seller_info,
-            "bsr": bsr,
-            "brand": brand or "",
-            "condition": condition or "",
-            "seller_type": seller_type or "",
-            "discount": discount,
-            "category_node": self.filters.get("category_node") or "",
-            "country": country,
-            "include_keywords": self.filters.get("include_keywords") or [],
-            "exclude_keywords": self.filters.get("exclude_keywords") or [],
-            "other": None,
-        }
+        return ProductRecord(
+            asin=self.extract_asin(url),
+            url=url,
+            title=title or "",
+            description=description or "",
+            price=price,
+            rating=rating,
+            reviews=review_count,
+            images=images,
+            image_url=main_image,
+            currency=currency,
+            availability=availability,
+            seller_info=seller_info,
+            bsr=bsr,
+            brand=brand or "",
+            condition=condition or "",
+            seller_type=seller_type or "",
+            discount=discount,
+            country=country,
+            parent_asin=parent_asin,
+            variations=variations,
+            prime=self._is_prime(),
+            context=self.context,
+        ).strip()
+
+    def _driver_get(self, url: str, kind: str):
+        """Politeness slot, driver.get() and the readiness wait for `kind` ("search" / "product").
+
+        Timed as driver_get_<kind> / wait_ready_<kind>; in lean mode the load is also
+        sampled for bytes / load time. A driver over its memory budget is replaced first;
+        one that hangs past the page-load timeout is killed and the error re-raised.
+        Raises Cancelled when the run is stopped before or during the load.
+        """
+        self.cancel.check()
+        if self.watchdog.needs_recycle(self.driver):
+            self.create_driver(proxy=self._get_next_proxy(None))
+        with self.metrics.span("politeness_wait"):
+            self.rate_limiter.acquire(url, sleep=self.cancel.sleep)
+        sample = self.lean.before_get(self.driver) if self.lean is not None else False
+        start = time.perf_counter()
+        driver = self.driver
+        with self.metrics.span(f"driver_get_{kind}"):
+            try:
+                # Stop kills the browser under a blocked get() rather than waiting it out
+                with self.cancel.on_cancel(lambda: self.watchdog.kill(driver)), self.watchdog.guard(driver):
+                    driver.get(url)
+            except TimeoutError:
+                # hung beyond the page-load timeout: processes are gone, start over next time
+                self.cleanup()
+                raise
+            except Exception as e:
+                if self.cancel.cancelled:
+                    self.cleanup()
+                    raise Cancelled(self.cancel.reason) from None
+                if type(e).__name__ != "TimeoutException":
+                    raise
+                # page-load timeout: keep what has rendered so far
+                self.metrics.inc("page_load_timeouts")
+                try:
+                    driver.execute_script("window.stop();")
+                except Exception:
+                    self.cleanup()
+                    raise
+        with self.metrics.span(f"wait_ready_{kind}"):
+            self._wait_ready(kind)
+        if self.lean is not None:
+            self.lean.after_get(self.driver, kind, sample, time.perf_counter() - start)
+
+    def _wait_ready(self, kind: str) -> bool:
+        """Poll (every 100 ms) until the page is extractable; False on timeout (extraction still runs)."""
+        js = READY_JS.get(kind)
+        if js is None or self.wait is None:
+            return True
+
+        def ready(d):
+            self.cancel.check()
+            return d.execute_script(js)
 
-        # clean all string fields
-        for k, v in list(product.items()):
-            if isinstance(v, str):
-                product[k] = v.strip()
+        try:
+            self.wait.until(ready)
+            return True
+        except Cancelled:
+            raise
+        except Exception:
+            self.metrics.inc("ready_timeouts")
+            return False
 
-        return product
+    def _archive_page(self, kind: str, url: str, record: Any, html: Optional[str] = None, **meta):
+        # raw HTML capture for later re-extraction (see archive.py); never breaks scraping
+        if self.archive is None or (html is None and not self.driver):
+            return
+        try:
+            with self.metrics.span("archive"):
+                if html is None:
+                    html = self.driver.page_source or ""
+                self.archive.store(
+                    html, kind, url, record,
+                    base_url=self.base_url, currency=self.currency,
+                    filters={k: self.filters.get(k) for k in ("category_node", "include_keywords", "exclude_keywords")},
+                    **meta,
+                )
+        except Exception:
+            pass
 
     def _safe_text_by_id(self, elem_id: str) -> Optional[str]:
         try:
@@ -501,80 +933,31 @@ class AmazonAPI:
     def safe_get_text(self, by, value) -> Optional[str]:
         return self.safe_get(by, value)
 
-    def get_price(self) -> Optional[float]:
-        xpaths = [
-            '//*[@id="corePrice_feature_div"]//span[contains(@class,"a-price-whole")]',
-            '//*[@id="corePriceDisplay_desktop_feature_div"]//span[contains(@class,"a-price-whole")]',
-            '//*[@id="priceblock_dealprice"]',
-            '//*[@id="priceblock_ourprice"]',
-            "//span[contains(@class,'a-offscreen') and (contains(text(),'$') or contains(text(),'€') or contains(text(),'£'))]",
-        ]
-        for xp in xpaths:
-            try:
-                els = self.driver.find_elements(By.XPATH, xp)
-                if not els:
-                    continue
-                for el in els:
-                    txt = el.get_attribute("innerText") or el.text or ""
-                    val = self.parse_price(txt)
-                    if val is not None:
-                        return val
-            except Exception:
-                pass
-
-        try:
-            el = self.driver.find_element(By.CSS_SELECTOR, "span.a-price span.a-offscreen")
-            txt = el.get_attribute("innerText") or el.text or ""
-            return self.parse_price(txt)
-        except Exception:
-            pass
+    def _select(self, field: str, parse: Callable[[str], Any]) -> Any:
+        """First parsed value for `field` from the selector registry's candidates."""
+        def attempt(sel):
+            els = self.driver.find_elements(sel.by, sel.value)
+            for el in (els if sel.every else els[:1]):
+                txt = (el.text if sel.attr == "text" else el.get_attribute(sel.attr) or el.text) or ""
+                value = parse(txt)
+                if value is not None:
+                    return value
+            return None
+        return self.selectors.first(field, self.marketplace, attempt)
 
-        return None
+    def get_price(self) -> Optional[float]:
+        return self._select("price", self.parse_price)
 
     def parse_price(self, p: str) -> Optional[float]:
-        if not p:
-            return None
-        s = p.strip()
-        s = s.replace("\xa0", " ")
-        s = s.replace("€", "").replace("$", "").replace("£", "").replace(",", ".")
-        s = re.sub(r"[^\d\.\-]", "", s)
-        if not s:
-            return None
-        try:
-            return float(s)
-        except Exception:
-            try:
-                return float(s.split()[0])
-            except Exception:
-                return None
+        return self.numbers.parse_price(p)
 
     def _extract_rating(self) -> Optional[float]:
-        try:
-            el = self.driver.find_element(By.ID, "acrPopover")
-            txt = el.get_attribute("title") or el.text or ""
-            m = re.search(r"(\d[\.,]?\d?)\s+out of", txt)
-            if m:
-                return float(m.group(1).replace(",", "."))
-        except Exception:
-            pass
-        try:
-            el = self.driver.find_element(By.CSS_SELECTOR, "span.a-icon-alt")
-            txt = el.text or ""
-            m = re.search(r"(\d[\.,]?\d?)\s+out of", txt)
-            if m:
-                return float(m.group(1).replace(",", "."))
-        except Exception:
-            pass
-        return None
+        return self._select("rating", self.numbers.parse_rating)
 
     def _extract_review_count(self) -> Optional[int]:
         try:
             el = self.driver.find_element(By.ID, "acrCustomerReviewText")
-            txt = el.text or ""
-            m = re.search(r"([\d,\. ]+)", txt)
-            if m:
-                n = m.group(1).replace(",", "").replace(".", "").replace(" ", "")
-                return int(n)
+            return self.numbers.parse_int(el.text or "")
         except Exception:
             pass
         return None
@@ -583,16 +966,12 @@ class AmazonAPI:
         try:
             try:
                 el = self.driver.find_element(By.ID, "productDetails_detailBullets_sections1")
-                txt = el.text or ""
-                m = re.search(r"Best Sellers Rank\s*#?\s*([\d,]+)", txt, re.I)
-                if m:
-                    return int(m.group(1).replace(",", ""))
+                val = self.numbers.parse_bsr(el.text or "")
+                if val is not None:
+                    return val
             except Exception:
                 pass
-            src = (self.driver.page_source or "")
-            m = re.search(r"Best Sellers Rank[:\s#]*([\d,]+)", src, re.I)
-            if m:
-                return int(m.group(1).replace(",", ""))
+            return self.numbers.parse_bsr(self.driver.page_source or "")
         except Exception:
             pass
         return None
@@ -611,29 +990,15 @@ class AmazonAPI:
             return []
 
     def _extract_seller_info(self) -> Optional[str]:
-        try:
-            txt = self.safe_get_text(By.ID, "merchant-info")
-            if txt:
-                return txt
-            try:
-                el = self.driver.find_element(By.ID, "sellerProfileTriggerId")
-                return el.text.strip()
-            except Exception:
-                pass
-        except Exception:
-            pass
-        return None
+        return self._select("seller_info", lambda t: t.strip() or None)
+
+    def _extract_currency(self) -> str:
+        """ISO currency of the displayed price, read from the page (marketplace default if absent)."""
+        found = self._select("currency", lambda t: detect_currency(t, self.base_url) if t.strip() else None)
+        return found or detect_currency(None, self.base_url)
 
     def _extract_availability(self) -> Optional[str]:
-        try:
-            el = self.driver.find_element(By.ID, "availability")
-            return el.text.strip()
-        except Exception:
-            try:
-                txt = self.driver.find_element(By.CSS_SELECTOR, "#availability .a-color-state").text.strip()
-                return txt
-            except Exception:
-                return None
+        return self._select("availability", lambda t: t.strip())
 
     def _passes_advanced_filters(self, product: Dict[str, Any]) -> bool:
         p = product.get("price")
@@ -704,9 +1069,14 @@ class AmazonAPI:
                 return False
 
         if self.filters.get("discount_only"):
-            page_src = (self.driver.page_source or "").lower()
-            if not ("you save" in page_src or "was" in page_src or "save" in page_src or "discount" in page_src):
-                return False
+            if self.driver is None:
+                # HTTP mode / stored rows: rely on the flag computed at extraction time
+                if not product.get("discount"):
+                    return False
+            else:
+                page_src = (self.driver.page_source or "").lower()
+                if not ("you save" in page_src or "was" in page_src or "save" in page_src or "discount" in page_src):
+                    return False
 
         return True
 
@@ -723,7 +1093,7 @@ class AmazonAPI:
                 return url.split("/dp/")[1].split("/")[0]
             if "/gp/product/" in url:
                 return url.split("/gp/product/")[1].split("/")[0]
-            m = re.search(r"/([A-Z0-9]{10})(?:[/?]|$)", url)
+            m = _ASIN_URL_RE.search(url)
             if m:
                 return m.group(1)
         except Exception:
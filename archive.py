@@ -0,0 +1,206 @@
+# archive.py
+"""
+Raw HTML capture / replay.
+
+Capture: AmazonAPI stores every fetched page (when an archive is attached) as a
+compressed, content-addressed blob plus one index line holding the URL and the
+record extracted at fetch time. Identical pages are stored once.
+
+    archive/
+      index.jsonl                 {"kind": "product", "url": ..., "sha": ..., "record": {...}}
+      blobs/ab/abcdef....zst      zstd-compressed page HTML (zlib .z if zstandard is missing)
+
+Replay: re-run html_extract over the archive on a process pool, with no network:
+
+    python archive.py replay reports/archive --out reextracted.jsonl
+"""
+import os
+import sys
+import json
+import zlib
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Iterator, Tuple
+
+try:
+    import zstandard as zstd
+    _HAS_ZSTD = True
+except Exception:
+    _HAS_ZSTD = False
+
+import html_extract
+from records import as_dict
+
+
+class HtmlArchive:
+    def __init__(self, directory: str, level: int = 10):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.level = level
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._known = set()
+        if _HAS_ZSTD:
+            self._compressor = zstd.ZstdCompressor(level=level)
+        else:
+            self._compressor = None
+
+    # ---------------- blobs ----------------
+    @staticmethod
+    def digest(html: str) -> str:
+        return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, sha: str, ext: str) -> str:
+        return os.path.join(self.blob_dir, sha[:2], f"{sha}.{ext}")
+
+    def _find_blob(self, sha: str) -> Optional[str]:
+        for ext in ("zst", "z"):
+            path = self._blob_path(sha, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put_html(self, html: str) -> str:
+        """Store page HTML once per distinct content, return its sha256."""
+        sha = self.digest(html)
+        if sha in self._known or self._find_blob(sha):
+            self._known.add(sha)
+            return sha
+        raw = html.encode("utf-8")
+        if self._compressor is not None:
+            data, ext = self._compressor.compress(raw), "zst"
+        else:
+            data, ext = zlib.compress(raw, min(self.level, 9)), "z"
+        path = self._blob_path(sha, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._known.add(sha)
+        return sha
+
+    def get_html(self, sha: str) -> Optional[str]:
+        path = self._find_blob(sha)
+        if path is None:
+            return None
+        return read_blob(path)
+
+    # ---------------- index ----------------
+    def store(self, html: str, kind: str, url: str, record: Any = None, **meta) -> Optional[str]:
+        """Archive a fetched page with the record(s) extracted from it."""
+        if not html:
+            return None
+        with self._lock:
+            sha = self.put_html(html)
+            entry = {"ts": datetime.utcnow().isoformat(), "kind": kind, "url": url, "sha": sha, "record": as_dict(record)}
+            entry.update(meta)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        return sha
+
+    def entries(self, kind: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except Exception:
+                    continue
+                if kind is None or entry.get("kind") == kind:
+                    yield entry
+
+
+def read_blob(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        if not _HAS_ZSTD:
+            raise RuntimeError("zstandard required to read .zst archive blobs")
+        return zstd.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+# ---------------- replay ----------------
+def _replay_one(task: Tuple[str, str, str, str, Optional[str], Dict[str, Any]]):
+    """Worker-process entry point: (directory, kind, sha, url, base_url, meta) -> extracted."""
+    directory, kind, sha, url, base_url, meta = task
+    archive = HtmlArchive(directory)
+    html = archive.get_html(sha)
+    if html is None:
+        return {"kind": kind, "url": url, "sha": sha, "error": "missing blob"}
+    base_url = base_url or _base_of(url)
+    try:
+        if kind == "search":
+            record = html_extract.extract_search_page(html, base_url)
+        else:
+            record = html_extract.extract_product_page(html, url, base_url,
+                                                       currency=meta.get("currency"), filters=meta.get("filters"))
+    except Exception as e:
+        return {"kind": kind, "url": url, "sha": sha, "error": str(e)}
+    return {"kind": kind, "url": url, "sha": sha, "record": as_dict(record)}
+
+
+def _base_of(url: str) -> str:
+    parts = (url or "").split("/")
+    return "/".join(parts[:3]) if len(parts) >= 3 else "https://www.amazon.com"
+
+
+def replay(directory: str, kind: Optional[str] = None, workers: Optional[int] = None,
+           dedupe: bool = True) -> Iterator[Dict[str, Any]]:
+    """Re-extract every archived page in parallel; yields results in index order.
+
+    With dedupe, a blob archived several times (same content, same URL) is parsed once.
+    """
+    archive = HtmlArchive(directory)
+    tasks = []
+    seen = set()
+    for e in archive.entries(kind):
+        key = (e.get("sha"), e.get("url"))
+        if dedupe and key in seen:
+            continue
+        seen.add(key)
+        meta = {"currency": e.get("currency"), "filters": e.get("filters")}
+        tasks.append((directory, e.get("kind"), e.get("sha"), e.get("url"), e.get("base_url"), meta))
+
+    if not tasks:
+        return
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_replay_one, tasks, chunksize=chunksize):
+            yield result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Raw HTML archive tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("replay", help="re-run extraction over an archive without network")
+    rp.add_argument("directory")
+    rp.add_argument("--kind", choices=["search", "product"])
+    rp.add_argument("--workers", type=int, default=None)
+    rp.add_argument("--out", default=None, help="JSONL output file (default: stdout)")
+    args = ap.parse_args(argv)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    count = errors = 0
+    try:
+        for result in replay(args.directory, kind=args.kind, workers=args.workers):
+            count += 1
+            if result.get("error"):
+                errors += 1
+            out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Replayed {count} pages ({errors} errors)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+# benchmark.py
+"""
+Offline extraction benchmark over saved HTML fixtures.
+
+    python benchmark.py                       # HTML-parser path only
+    python benchmark.py --path both -r 5      # parser + Selenium (needs Chrome)
+    python benchmark.py --fail-on-regression  # exit 1 if slower than history
+
+Fixtures live in benchmarks/fixtures/search/*.html and benchmarks/fixtures/product/*.html
+(product files are named <ASIN>.html). They are served by a local HTTP stand-in server so
+the Selenium path goes through driver.get() exactly like a live run, without touching Amazon.
+
+Each run appends a line to benchmarks/history.jsonl; results are compared against the
+median of the previous runs for the same path so regressions in
+_extract_search_page_products / _visit_and_extract show up.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+
+import html_extract
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+HISTORY_FILE = os.path.join(BENCH_DIR, "history.jsonl")
+
+# a run is flagged when it is this much worse than the historical median
+REGRESSION_TOLERANCE = 0.20
+
+
+class FixtureServer:
+    """Serves the fixture directory on 127.0.0.1 in a background thread."""
+
+    def __init__(self, directory: str = FIXTURE_DIR):
+        handler = partial(_QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def load_fixtures(directory: str = FIXTURE_DIR) -> Dict[str, List[str]]:
+    out = {"search": [], "product": []}
+    for kind in out:
+        folder = os.path.join(directory, kind)
+        if os.path.isdir(folder):
+            out[kind] = sorted(f for f in os.listdir(folder) if f.endswith(".html"))
+    return out
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _max_rss_kb() -> Optional[int]:
+    try:
+        import resource
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except Exception:
+        return None
+
+
+def _summarize(path: str, latencies: Dict[str, List[float]], products: int, wall: float, peak_kb: Optional[float]) -> Dict[str, Any]:
+    all_lat = [x for v in latencies.values() for x in v]
+    result = {
+        "path": path,
+        "pages": len(all_lat),
+        "products": products,
+        "wall_s": round(wall, 4),
+        "products_per_s": round(products / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(_percentile(all_lat, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(all_lat, 0.95) * 1000, 3),
+        "py_peak_kb": round(peak_kb, 1) if peak_kb is not None else None,
+        "max_rss_kb": _max_rss_kb(),
+    }
+    for kind, values in latencies.items():
+        result[f"{kind}_p50_ms"] = round(_percentile(values, 0.50) * 1000, 3)
+        result[f"{kind}_p95_ms"] = round(_percentile(values, 0.95) * 1000, 3)
+    return result
+
+
+# ---------------- HTML-parser path ----------------
+def bench_parser(fixtures: Dict[str, List[str]], repeat: int = 3, directory: str = FIXTURE_DIR) -> Dict[str, Any]:
+    pages = {kind: [] for kind in fixtures}
+    for kind, names in fixtures.items():
+        for name in names:
+            with open(os.path.join(directory, kind, name), "r", encoding="utf-8") as f:
+                pages[kind].append((name, f.read()))
+
+    latencies = {"search": [], "product": []}
+    products = 0
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for name, html in pages["search"]:
+            s = time.perf_counter()
+            rows = html_extract.extract_search_page(html, "https://www.amazon.com")
+            latencies["search"].append(time.perf_counter() - s)
+            products += len(rows)
+        for name, html in pages["product"]:
+            s = time.perf_counter()
+            item = html_extract.extract_product_page(html, f"https://www.amazon.com/dp/{name[:-5]}")
+            latencies["product"].append(time.perf_counter() - s)
+            products += 1 if item else 0
+    wall = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _summarize("parser", latencies, products, wall, peak / 1024)
+
+
+# ---------------- Selenium path ----------------
+def bench_selenium(fixtures: Dict[str, List[str]], repeat: int = 3, directory: str = FIXTURE_DIR,
+                   use_uc: bool = False) -> Dict[str, Any]:
+    from amazon_api import AmazonAPI
+    from rate_limiter import RateLimiter
+
+    latencies = {"search": [], "product": []}
+    products = 0
+    with FixtureServer(directory) as server:
+        api = AmazonAPI(base_url=server.base_url, use_uc=use_uc, headless=True)
+        api.rate_limiter = RateLimiter(0, 0)
+        api.create_driver(proxy=None)
+        try:
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                for name in fixtures["search"]:
+                    s = time.perf_counter()
+                    api.driver.get(f"{server.base_url}/search/{name}")
+                    rows = api._extract_search_page_products()
+                    latencies["search"].append(time.perf_counter() - s)
+                    products += len(rows)
+                for name in fixtures["product"]:
+                    s = time.perf_counter()
+                    item = api._visit_and_extract(f"{server.base_url}/product/{name}")
+                    latencies["product"].append(time.perf_counter() - s)
+                    products += 1 if item else 0
+            wall = time.perf_counter() - t0
+        finally:
+            api.cleanup()
+    return _summarize("selenium", latencies, products, wall, None)
+
+
+# ---------------- history ----------------
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return ""
+
+
+def load_history(path: str = HISTORY_FILE) -> List[Dict[str, Any]]:
+    rows = []
+    if not os.path.exists(path):
+        return rows
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except Exception:
+                continue
+    return rows
+
+
+def append_history(result: Dict[str, Any], path: str = HISTORY_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = dict(result)
+    entry["ts"] = datetime.utcnow().isoformat()
+    entry["rev"] = _git_rev()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def check_regression(result: Dict[str, Any], history: List[Dict[str, Any]], last_n: int = 10) -> List[str]:
+    """Compare against the median of the last runs of the same path; return problems found."""
+    prev = [h for h in history if h.get("path") == result["path"] and h.get("pages") == result["pages"]][-last_n:]
+    if not prev:
+        return []
+    problems = []
+    base_rate = statistics.median(h["products_per_s"] for h in prev)
+    if base_rate and result["products_per_s"] < base_rate * (1 - REGRESSION_TOLERANCE):
+        problems.append(f"{result['path']}: products/s {result['products_per_s']} < median {base_rate}")
+    base_p95 = statistics.median(h["p95_ms"] for h in prev)
+    if base_p95 and result["p95_ms"] > base_p95 * (1 + REGRESSION_TOLERANCE):
+        problems.append(f"{result['path']}: p95 {result['p95_ms']} ms > median {base_p95} ms")
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline extraction benchmark over saved HTML fixtures")
+    ap.add_argument("--path", choices=["parser", "selenium", "both"], default="parser")
+    ap.add_argument("-r", "--repeat", type=int, default=3)
+    ap.add_argument("--fixtures", default=FIXTURE_DIR)
+    ap.add_argument("--no-history", action="store_true", help="do not append this run to history")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args(argv)
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures["search"] and not fixtures["product"]:
+        print(f"No fixtures found in {args.fixtures}")
+        return 2
+
+    results = []
+    if args.path in ("parser", "both"):
+        results.append(bench_parser(fixtures, args.repeat, args.fixtures))
+    if args.path in ("selenium", "both"):
+        results.append(bench_selenium(fixtures, args.repeat, args.fixtures))
+
+    history = load_history()
+    problems = []
+    for r in results:
+        print(json.dumps(r, indent=2))
+        problems.extend(check_regression(r, history))
+        if not args.no_history:
+            append_history(r)
+
+    for p in problems:
+        print(f"[REGRESSION] {p}")
+    if problems and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
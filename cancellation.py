@@ -0,0 +1,111 @@
+# cancellation.py
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Any
+
+
+class Cancelled(Exception):
+    """Raised inside an operation interrupted by CancellationToken.cancel()."""
+
+
+class CancellationToken:
+    """
+    Thread-safe stop signal for one run, shared by every engine and helper.
+
+    cancel() may be called from any thread (the GUI's Stop button). It never touches
+    a WebDriver session owned by another thread; it wakes what is waiting:
+
+      - sleep() / wait() return at once (rate limiter slots, polling loops)
+      - callbacks registered with on_cancel() run — an in-flight page load registers
+        a kill of its browser process tree, so the blocked driver.get() fails
+      - call() abandons a blocking call (an HTTP request) and raises Cancelled
+
+    The token is also a plain `should_stop` callable: token() -> bool.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], Any]] = {}
+        self._next_id = 0
+        self.reason = ""
+
+    def __call__(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception:
+                pass
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to `seconds`; True if cancelled meanwhile."""
+        return self._event.wait(max(0.0, seconds))
+
+    def sleep(self, seconds: float):
+        """Interruptible time.sleep(): raises Cancelled as soon as the token fires."""
+        if self._event.wait(max(0.0, seconds)):
+            raise Cancelled(self.reason)
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], Any]):
+        """Run `callback` if the token fires while the block is executing."""
+        with self._lock:
+            fired = self._event.is_set()
+            if not fired:
+                key = self._next_id
+                self._next_id += 1
+                self._callbacks[key] = callback
+        if fired:
+            try:
+                callback()
+            except Exception:
+                pass
+            raise Cancelled(self.reason)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._callbacks.pop(key, None)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call on a helper thread and return its result, or raise
+        Cancelled when the token fires first (the call is left to finish on its own
+        timeout; its result is discarded)."""
+        self.check()
+        done = threading.Event()
+        box: Dict[str, Any] = {}
+
+        def runner():
+            try:
+                box["result"] = fn(*args, **kwargs)
+            except BaseException as e:
+                box["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=runner, name="cancellable", daemon=True).start()
+        with self.on_cancel(done.set):
+            done.wait()
+        if "error" in box:
+            raise box["error"]
+        if "result" not in box:
+            raise Cancelled(self.reason)
+        return box["result"]
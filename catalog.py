@@ -0,0 +1,268 @@
+# catalog.py
+import os
+import re
+import csv
+import glob
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+from price_parsing import marketplace_of
+from marketplaces import get_marketplace
+from records import as_dict
+
+CATALOG_FILE = "catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    title TEXT, brand TEXT, description TEXT,
+    price REAL, currency TEXT, rating REAL, reviews INTEGER,
+    url TEXT, image_url TEXT,
+    first_seen TEXT, last_seen TEXT,
+    UNIQUE (domain, asin)
+);
+CREATE INDEX IF NOT EXISTS products_price ON products(price);
+CREATE INDEX IF NOT EXISTS products_rating ON products(rating);
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    title, brand, description, content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, title, brand, description) VALUES (new.id, new.title, new.brand, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, title, brand, description)
+    VALUES ('delete', old.id, old.title, old.brand, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE OF title, brand, description ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, title, brand, description)
+    VALUES ('delete', old.id, old.title, old.brand, old.description);
+    INSERT INTO products_fts(rowid, title, brand, description) VALUES (new.id, new.title, new.brand, new.description);
+END;
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime REAL);
+"""
+
+# bm25 column weights: title, brand, description
+_RANK = "bm25(products_fts, 10.0, 5.0, 1.0)"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_PRICE_BUCKETS = (0, 10, 25, 50, 100, 250, 500, 1000)
+_RATING_BUCKETS = (4.5, 4.0, 3.0, 0)
+
+_COLUMNS = ("domain", "asin", "title", "brand", "description", "price", "currency", "rating", "reviews",
+            "url", "image_url")
+
+
+def match_query(text: str, prefix: bool = True) -> str:
+    """User text -> FTS5 MATCH expression: every word must occur; with `prefix` the
+    last word also matches as a prefix ("usb hu" finds "USB hub"). Quoting each word
+    keeps FTS5 operators and punctuation in the input from being interpreted."""
+    words = _TOKEN_RE.findall(text or "")
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    if prefix:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _num(value, cast=float):
+    if value is None or value == "":
+        return None
+    try:
+        return cast(value)
+    except Exception:
+        return None
+
+
+class Catalog:
+    """
+    Every product the app has extracted, across runs, in one SQLite file with an FTS5
+    index over title, brand and description.
+
+        cat = Catalog.for_folder("reports")
+        cat.add(product)                                  # upsert by (domain, ASIN)
+        cat.search("usb c hub", min_price=10, domains=["de"])
+        cat.facets("usb c hub")                           # counts per domain / price / rating bucket
+        cat.backfill("reports")                           # older runs: result stores and CSV reports
+
+    Search is ranked with bm25 (title weighted over brand over description); filters
+    are plain column predicates on the matched rows.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._pending = 0
+
+    @classmethod
+    def for_folder(cls, folder: str) -> "Catalog":
+        return cls(os.path.join(folder or "reports", CATALOG_FILE))
+
+    # ---------------- writing ----------------
+    def _values(self, row: Dict[str, Any]) -> Optional[Tuple]:
+        asin = (row.get("asin") or "").strip()
+        if not asin:
+            return None
+        url = row.get("url") or ""
+        if url:
+            domain = marketplace_of(url)
+        else:
+            # country codes ("UK") are not domains ("co.uk")
+            m = get_marketplace(row.get("country") or "US")
+            domain = m.key if m is not None else (row.get("country") or "com").lower()
+        return (domain, asin, row.get("title") or "", row.get("brand") or "", row.get("description") or "",
+                _num(row.get("price")), row.get("currency") or "", _num(row.get("rating")),
+                _num(row.get("reviews"), int), url, row.get("image_url") or row.get("image") or "")
+
+    def add(self, row: Any, commit_every: int = 100) -> bool:
+        values = self._values(as_dict(row))
+        if values is None:
+            return False
+        now = datetime.utcnow().isoformat(timespec="seconds")
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO products ({', '.join(_COLUMNS)}, first_seen, last_seen) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))}, ?, ?) "
+                "ON CONFLICT(domain, asin) DO UPDATE SET "
+                "title = CASE WHEN excluded.title != '' THEN excluded.title ELSE title END, "
+                "brand = CASE WHEN excluded.brand != '' THEN excluded.brand ELSE brand END, "
+                "description = CASE WHEN excluded.description != '' THEN excluded.description ELSE description END, "
+                "price = COALESCE(excluded.price, price), currency = COALESCE(NULLIF(excluded.currency, ''), currency), "
+                "rating = COALESCE(excluded.rating, rating), reviews = COALESCE(excluded.reviews, reviews), "
+                "url = COALESCE(NULLIF(excluded.url, ''), url), "
+                "image_url = COALESCE(NULLIF(excluded.image_url, ''), image_url), last_seen = excluded.last_seen",
+                (*values, now, now),
+            )
+            self._pending += 1
+            if self._pending >= commit_every:
+                self._conn.commit()
+                self._pending = 0
+        return True
+
+    def add_many(self, rows: Iterable[Any]) -> int:
+        n = sum(1 for row in rows if self.add(row, commit_every=1000))
+        self.flush()
+        return n
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def backfill(self, folder: str) -> int:
+        """Ingest run result stores and CSV reports under `folder` not seen before (or changed since)."""
+        paths = glob.glob(os.path.join(folder, ".results", "*.sqlite")) + glob.glob(os.path.join(folder, "*.csv"))
+        added = 0
+        for path in sorted(paths):
+            try:
+                mtime = os.path.getmtime(path)
+                with self._lock:
+                    seen = self._conn.execute("SELECT mtime FROM sources WHERE path = ?", (path,)).fetchone()
+                if seen is not None and seen[0] >= mtime:
+                    continue
+                added += self.add_many(_read_source(path))
+                with self._lock:
+                    self._conn.execute("INSERT OR REPLACE INTO sources (path, mtime) VALUES (?, ?)", (path, mtime))
+                    self._conn.commit()
+            except Exception:
+                continue
+        return added
+
+    # ---------------- reading ----------------
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def _where(self, query: str, prefix: bool, min_price, max_price, min_rating, domains) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        match = match_query(query, prefix)
+        if match:
+            clauses.append("products_fts MATCH ?")
+            params.append(match)
+        if min_price is not None:
+            clauses.append("p.price >= ?")
+            params.append(float(min_price))
+        if max_price is not None:
+            clauses.append("p.price <= ?")
+            params.append(float(max_price))
+        if min_rating:
+            clauses.append("p.rating >= ?")
+            params.append(float(min_rating))
+        if domains:
+            clauses.append(f"p.domain IN ({', '.join('?' * len(domains))})")
+            params.extend(d.lower() for d in domains)
+        source = "products_fts JOIN products p ON p.id = products_fts.rowid" if match else "products p"
+        return f"FROM {source}" + (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def search(self, query: str, prefix: bool = True, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, min_rating: Optional[float] = None,
+               domains: Optional[List[str]] = None, limit: int = 200, offset: int = 0) -> List[Dict[str, Any]]:
+        """Best matches first (most recently seen first when there is no query text)."""
+        where, params = self._where(query, prefix, min_price, max_price, min_rating, domains)
+        order = _RANK if match_query(query, prefix) else "p.last_seen DESC"
+        sql = (f"SELECT {', '.join('p.' + c for c in _COLUMNS)}, p.last_seen {where} "
+               f"ORDER BY {order} LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [dict(zip(_COLUMNS + ("last_seen",), r)) for r in rows]
+
+    def facets(self, query: str = "", prefix: bool = True, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, min_rating: Optional[float] = None,
+               domains: Optional[List[str]] = None) -> Dict[str, List[Tuple[str, int]]]:
+        """Match counts per domain, price bucket and rating bucket for the same query and filters."""
+        where, params = self._where(query, prefix, min_price, max_price, min_rating, domains)
+        price_case = "CASE " + " ".join(
+            f"WHEN p.price < {hi} THEN '{lo}-{hi}'" for lo, hi in zip(_PRICE_BUCKETS, _PRICE_BUCKETS[1:])
+        ) + f" WHEN p.price IS NOT NULL THEN '{_PRICE_BUCKETS[-1]}+' END"
+        rating_case = "CASE " + " ".join(
+            f"WHEN p.rating >= {r} THEN '{r}+'" for r in _RATING_BUCKETS
+        ) + " END"
+        buckets = (
+            ("domain", "p.domain", "COUNT(*) DESC"),
+            ("price", price_case, "MIN(p.price)"),
+            ("rating", rating_case, "MIN(p.rating) DESC"),
+        )
+        out = {}
+        with self._lock:
+            for name, expr, order in buckets:
+                rows = self._conn.execute(
+                    f"SELECT {expr} AS bucket, COUNT(*) {where} GROUP BY bucket ORDER BY {order}", params
+                ).fetchall()
+                out[name] = [(b, n) for b, n in rows if b is not None]
+        return out
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.commit()
+            finally:
+                self._conn.close()
+
+
+def _read_source(path: str) -> Iterable[Dict[str, Any]]:
+    if path.endswith(".sqlite"):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for (data,) in conn.execute("SELECT data FROM rows ORDER BY id"):
+                try:
+                    yield json.loads(data)
+                except Exception:
+                    continue
+        finally:
+            conn.close()
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            # report headers may be the export labels ("Title", "ASIN") or the record keys
+            yield {k.strip().lower().replace(" ", "_"): v for k, v in row.items() if k}
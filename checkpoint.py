@@ -0,0 +1,194 @@
+# checkpoint.py
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Set, Tuple
+
+
+class RunJournal:
+    """
+    Append-only JSONL journal of a scraping run, used to resume after a crash or Stop.
+
+    One line per event:
+       {"event": "store", "path": "..."}                      result store holding the run's rows
+       {"event": "listings", "page": 3, "listings": [...]}   search page fetched, listings queued
+       {"event": "asin", "asin": "B0...", "kept": true}       product handled (kept = passed the filters)
+       {"event": "page_done", "page": 3}                      every listing of the page handled
+       {"event": "complete"}                                  run finished normally
+
+    Only ASINs and page numbers are held in memory. Kept products live in the run's
+    ResultStore and are read back from it on resume; queued listings are re-read from
+    the journal file (iter_listings()).
+
+    The journal file name is derived from the run parameters, so re-running the same
+    search (same domain, term, ASINs, pages and filters) picks the journal up again.
+    Restored products and journaled rejections are only valid under the filters they
+    were decided with, so every filter that changes a run's results is part of the key.
+    """
+
+    # filter keys that change what a run fetches or keeps; anything else (output folder,
+    # UI flags, pacing) does not
+    KEY_FIELDS = (
+        "base_url", "category_node", "start_page", "max_pages", "scan_mode",
+        "min", "max", "min_rating", "max_rating", "min_reviews", "max_reviews",
+        "prime_only", "in_stock_only", "discount_only", "condition", "seller_type",
+        "brand", "brands", "include_keywords", "exclude_keywords", "bsr_min", "bsr_max",
+        "base_currency", "dedupe_variations", "keep_rejects",
+    )
+
+    def __init__(self, path: str, resume: bool = True):
+        self.path = path
+        self._lock = threading.Lock()
+        self.store_path: Optional[str] = None
+        self.listed_pages: Set[int] = set()
+        self.pages_done: Set[int] = set()
+        self.asins_done: Set[str] = set()
+        self.asins_kept: Set[str] = set()
+        self.completed = False
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if resume and os.path.exists(self.path):
+            self._load()
+            if self.completed:
+                # a finished run is not resumed; start a fresh journal
+                self._reset()
+        else:
+            self._reset()
+
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    @classmethod
+    def for_run(cls, directory: str, search_term: str, asin_list: Optional[List[str]],
+                filters: Dict[str, Any], resume: bool = True) -> "RunJournal":
+        key = cls.run_key(search_term, asin_list, filters)
+        return cls(os.path.join(directory, ".journal", f"{key}.jsonl"), resume=resume)
+
+    @classmethod
+    def run_key(cls, search_term: str, asin_list: Optional[List[str]], filters: Dict[str, Any]) -> str:
+        filters = filters or {}
+        params = {
+            "search_term": (search_term or "").strip().lower(),
+            "asins": list(asin_list or []),
+        }
+        for k in cls.KEY_FIELDS:
+            params[k] = filters.get(k)
+        raw = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    # ---------------- loading ----------------
+    def _reset(self):
+        self.store_path = None
+        self.listed_pages = set()
+        self.pages_done = set()
+        self.asins_done = set()
+        self.asins_kept = set()
+        self.completed = False
+        open(self.path, "w", encoding="utf-8").close()
+
+    def restart(self):
+        """Drop all progress (e.g. the result store of the interrupted run is gone)."""
+        with self._lock:
+            self._fh.close()
+            self._reset()
+            self._fh = open(self.path, "a", encoding="utf-8")
+
+    def _entries(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except Exception:
+                    # last line may be truncated by a crash mid-write
+                    continue
+
+    def _load(self):
+        for entry in self._entries():
+            self._apply(entry)
+
+    def _apply(self, entry: Dict[str, Any]):
+        event = entry.get("event")
+        if event == "listings":
+            self.listed_pages.add(int(entry.get("page", 0)))
+        elif event == "asin":
+            asin = entry.get("asin")
+            if asin:
+                self.asins_done.add(asin)
+                if entry.get("kept"):
+                    self.asins_kept.add(asin)
+        elif event == "store":
+            self.store_path = entry.get("path")
+        elif event == "page_done":
+            self.pages_done.add(int(entry.get("page", 0)))
+        elif event == "complete":
+            self.completed = True
+
+    def _write(self, entry: Dict[str, Any]):
+        entry["ts"] = datetime.utcnow().isoformat()
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            try:
+                os.fsync(self._fh.fileno())
+            except Exception:
+                pass
+        self._apply(entry)
+
+    # ---------------- recording ----------------
+    def record_store(self, path: str):
+        self._write({"event": "store", "path": path})
+
+    def record_listings(self, page: int, listings: Iterable[Dict[str, Any]]):
+        self._write({"event": "listings", "page": int(page), "listings": list(listings)})
+
+    def record_asin(self, asin: str, kept: bool = False):
+        if not asin:
+            return
+        self._write({"event": "asin", "asin": asin, "kept": bool(kept)})
+
+    def record_page_done(self, page: int):
+        self._write({"event": "page_done", "page": int(page)})
+
+    def record_complete(self):
+        self._write({"event": "complete"})
+
+    # ---------------- queries ----------------
+    def is_page_done(self, page: int) -> bool:
+        return int(page) in self.pages_done
+
+    def iter_listings(self) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """(page, listings) for every search page recorded, read back from the file."""
+        if not self.listed_pages:
+            return
+        with self._lock:
+            self._fh.flush()
+        for entry in self._entries():
+            if entry.get("event") == "listings":
+                yield int(entry.get("page", 0)), entry.get("listings") or []
+
+    def is_asin_done(self, asin: str) -> bool:
+        return bool(asin) and asin in self.asins_done
+
+    def forget_unstored(self, stored: Set[str]) -> int:
+        """Un-mark kept ASINs whose rows never reached the result store (lost in a crash
+        between the journal line and the store commit), so they are visited again."""
+        lost = self.asins_kept - stored
+        self.asins_done -= lost
+        self.asins_kept -= lost
+        return len(lost)
+
+    @property
+    def has_progress(self) -> bool:
+        return bool(self.asins_done or self.pages_done or self.listed_pages)
+
+    def close(self):
+        with self._lock:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
@@ -0,0 +1,191 @@
+# currency.py
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+
+from price_parsing import FORMATS, marketplace_of
+
+FX_FILE = "fx_rates.json"      # cache file name inside the output folder
+ECB_DAILY_URL = "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml"
+
+# longest tokens first so "US$" wins over "$"
+_SYMBOLS = [
+    ("US$", "USD"), ("USD", "USD"), ("EUR", "EUR"), ("GBP", "GBP"), ("CHF", "CHF"),
+    ("PLN", "PLN"), ("SEK", "SEK"), ("zł", "PLN"), ("kr", "SEK"),
+    ("€", "EUR"), ("£", "GBP"), ("$", "USD"),
+]
+_SYMBOL_RE = re.compile("|".join(re.escape(s) for s, _ in _SYMBOLS))
+_SYMBOL_MAP = dict(_SYMBOLS)
+_DISPLAY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "PLN": "zł", "SEK": "kr"}
+_ECB_RATE_RE = re.compile(r"currency=['\"]([A-Z]{3})['\"]\s+rate=['\"]([\d.]+)['\"]")
+_ECB_DATE_RE = re.compile(r"time=['\"](\d{4}-\d{2}-\d{2})['\"]")
+
+
+def detect_currency(text: Optional[str], domain: Optional[str] = None) -> str:
+    """ISO code from a price string ('$189.99', '1.299,00 €'); falls back to the marketplace currency."""
+    if text:
+        m = _SYMBOL_RE.search(text)
+        if m:
+            return _SYMBOL_MAP[m.group(0)]
+    return FORMATS[marketplace_of(domain)].currency
+
+
+def currency_symbol(code: Optional[str]) -> str:
+    """Display symbol for an ISO code ('EUR' -> '€'); unknown codes are shown as they are."""
+    code = (code or "").upper()
+    return _DISPLAY_SYMBOLS.get(code, code)
+
+
+class FxTable:
+    """
+    Exchange rates cached in a JSON file in the output folder (not the install directory):
+
+        {"base": "EUR", "updated": "2026-10-16", "rates": {"USD": 1.08, "GBP": 0.85, ...}}
+
+    rates[X] is units of X per one unit of `base`. The file is re-read when it changes
+    on disk, and refreshed from the ECB daily feed when older than `max_age_hours`
+    (best effort — the cached table is kept if the download fails). refresh_in_background()
+    does that from a daemon thread, so a run never waits on the feed unless there is
+    no cached table at all.
+    """
+
+    _shared: Dict[str, "FxTable"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str, max_age_hours: float = 24.0, refresh_url: Optional[str] = ECB_DAILY_URL):
+        self.path = path
+        self.max_age = timedelta(hours=max_age_hours)
+        self.refresh_url = refresh_url
+        self.base = "EUR"
+        self.updated: Optional[datetime] = None
+        self.rates: Dict[str, float] = {"EUR": 1.0}
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_lock = threading.Lock()   # not self._lock: that one is held during downloads
+        self._checked = threading.Event()     # set after the first background refresh attempt
+        self._load()
+
+    @classmethod
+    def shared(cls, path: str, **kwargs) -> "FxTable":
+        with cls._shared_lock:
+            table = cls._shared.get(path)
+            if table is None:
+                table = cls._shared[path] = cls(path, **kwargs)
+            return table
+
+    @classmethod
+    def for_folder(cls, folder: str, **kwargs) -> "FxTable":
+        return cls.shared(os.path.join(folder or "reports", FX_FILE), **kwargs)
+
+    # ---------------- file cache ----------------
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        rates = {k.upper(): float(v) for k, v in (data.get("rates") or {}).items()}
+        self.base = (data.get("base") or "EUR").upper()
+        rates[self.base] = 1.0
+        self.rates = rates
+        try:
+            self.updated = datetime.fromisoformat(str(data.get("updated")))
+        except Exception:
+            self.updated = None
+        self._mtime = mtime
+
+    def save(self):
+        data = {
+            "base": self.base,
+            "updated": self.updated.date().isoformat() if self.updated else None,
+            "rates": {k: v for k, v in sorted(self.rates.items()) if k != self.base},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def is_stale(self) -> bool:
+        return self.updated is None or datetime.utcnow() - self.updated > self.max_age
+
+    def ensure_fresh(self) -> bool:
+        """Reload if the file changed; download new rates if stale. Returns True if rates were refreshed."""
+        with self._lock:
+            self._load()
+            if not self.is_stale() or not self.refresh_url:
+                return False
+            try:
+                import requests
+                resp = requests.get(self.refresh_url, timeout=10)
+                resp.raise_for_status()
+                self._apply_ecb(resp.text)
+            except Exception:
+                return False
+            try:
+                self.save()
+            except OSError:
+                pass    # read-only output folder: the rates still apply to this process
+            return True
+
+    def refresh_in_background(self, check_every: float = 3600.0) -> threading.Thread:
+        """Start (once per table) a daemon thread running ensure_fresh() now and every `check_every` s."""
+        with self._refresher_lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                def loop():
+                    while True:
+                        self.ensure_fresh()
+                        self._checked.set()
+                        time.sleep(check_every)
+
+                self._refresher = threading.Thread(target=loop, name="fx-refresh", daemon=True)
+                self._refresher.start()
+            return self._refresher
+
+    def wait_checked(self, timeout: Optional[float] = None) -> bool:
+        """Block until the background refresher has tried the feed once (True) or `timeout` passes."""
+        return self._checked.wait(timeout)
+
+    def _apply_ecb(self, xml: str):
+        rates = {cur: float(rate) for cur, rate in _ECB_RATE_RE.findall(xml)}
+        if not rates:
+            raise ValueError("no rates in ECB feed")
+        rates["EUR"] = 1.0
+        self.base = "EUR"
+        self.rates = rates
+        m = _ECB_DATE_RE.search(xml)
+        self.updated = datetime.fromisoformat(m.group(1)) if m else datetime.utcnow()
+
+    # ---------------- conversion ----------------
+    def convert(self, amount: Optional[float], from_cur: str, to_cur: str) -> Optional[float]:
+        if amount is None or not from_cur or not to_cur:
+            return None
+        from_cur, to_cur = from_cur.upper(), to_cur.upper()
+        if from_cur == to_cur:
+            return amount
+        src = self.rates.get(from_cur)
+        dst = self.rates.get(to_cur)
+        if not src or not dst:
+            return None
+        return round(amount / src * dst, 2)
+
+
+def normalize_record(product: Dict[str, Any], fx: FxTable, base_currency: str) -> Dict[str, Any]:
+    """Add price_base / base_currency next to the raw price and its detected currency."""
+    if not base_currency:
+        return product
+    product["base_currency"] = base_currency.upper()
+    product["price_base"] = fx.convert(product.get("price"), product.get("currency") or "", base_currency)
+    return product
@@ -0,0 +1,357 @@
+# driver_watchdog.py
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+try:
+    import psutil  # optional: process tree / RSS; /proc is read directly without it
+except Exception:
+    psutil = None
+
+# Chrome ignores unknown switches; this one tags every browser we launch with the
+# launching process id so orphans of a crashed run can be found and reaped.
+MARKER_SWITCH = "--amazon-tracker-owner"
+
+
+def marker_arg(owner_pid: Optional[int] = None) -> str:
+    return f"{MARKER_SWITCH}={owner_pid or os.getpid()}"
+
+
+# ---------------- process tree helpers ----------------
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except Exception:
+        return False
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    """ppid -> [pid] from /proc/<pid>/stat."""
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except Exception:
+        return children
+    for name in entries:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as fh:
+                stat = fh.read().decode("utf-8", "replace")
+            # "pid (comm) state ppid ..." — comm may contain spaces and parentheses
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+            children.setdefault(ppid, []).append(int(name))
+        except Exception:
+            continue
+    return children
+
+
+def process_tree(root_pids: Iterable[int]) -> List[int]:
+    """The given pids and all their descendants (live processes only)."""
+    roots = [int(p) for p in root_pids if p]
+    if psutil is not None:
+        seen = []
+        for pid in roots:
+            try:
+                proc = psutil.Process(pid)
+                for p in [proc] + proc.children(recursive=True):
+                    if p.pid not in seen:
+                        seen.append(p.pid)
+            except Exception:
+                continue
+        return seen
+    children = _proc_children()
+    seen, stack = [], [p for p in roots if _pid_alive(p)]
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.append(pid)
+        stack.extend(children.get(pid, []))
+    return seen
+
+
+def _start_time(pid: int) -> Optional[float]:
+    """Process start time (identifies a pid across reuse); None when it cannot be read."""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).create_time()
+        except Exception:
+            return None
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as fh:
+            stat = fh.read().decode("utf-8", "replace")
+        # field 22, starttime in clock ticks since boot
+        return float(stat[stat.rindex(")") + 2:].split()[19])
+    except Exception:
+        return None
+
+
+def snapshot_tree(root_pids: Iterable[int]) -> List[Tuple[int, Optional[float]]]:
+    """(pid, start time) of the live process tree, taken while its owner is still running."""
+    return [(pid, _start_time(pid)) for pid in process_tree(root_pids)]
+
+
+def kill_snapshot(snapshot: Iterable[Tuple[int, Optional[float]]], unverified: bool = False) -> int:
+    """SIGKILL the processes of a snapshot that are still the same processes.
+
+    A pid counts as the same process only when its start time is unchanged, so a pid
+    reused by an unrelated process after the snapshot is left alone. With `unverified`,
+    pids whose start time cannot be read (no psutil and no /proc) are killed too.
+    """
+    killed = 0
+    for pid, started in reversed(list(snapshot)):
+        if pid == os.getpid():
+            continue
+        now = _start_time(pid)
+        if now is None and not (unverified and started is None and _pid_alive(pid)):
+            continue
+        if now is not None and now != started:
+            continue
+        try:
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            killed += 1
+        except Exception:
+            pass
+    return killed
+
+
+def _rss_bytes(pid: int) -> int:
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except Exception:
+            return 0
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except Exception:
+        pass
+    return 0
+
+
+def tree_rss(root_pids: Iterable[int]) -> int:
+    """Resident memory of the whole process tree in bytes (0 when it cannot be read)."""
+    return sum(_rss_bytes(pid) for pid in process_tree(root_pids))
+
+
+def kill_tree(root_pids: Iterable[int]) -> int:
+    """SIGKILL the processes and all their descendants; returns how many were signalled."""
+    pids = process_tree(root_pids)
+    killed = 0
+    # children first so nothing gets re-parented mid-walk
+    for pid in reversed(pids):
+        if pid == os.getpid():
+            continue
+        try:
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            killed += 1
+        except Exception:
+            pass
+    return killed
+
+
+def _cmdline(pid: int) -> str:
+    if psutil is not None:
+        try:
+            return " ".join(psutil.Process(pid).cmdline())
+        except Exception:
+            return ""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as fh:
+            return fh.read().replace(b"\0", b" ").decode("utf-8", "replace")
+    except Exception:
+        return ""
+
+
+def _all_pids() -> List[int]:
+    if psutil is not None:
+        try:
+            return psutil.pids()
+        except Exception:
+            return []
+    try:
+        return [int(n) for n in os.listdir("/proc") if n.isdigit()]
+    except Exception:
+        return []
+
+
+def reap_orphans() -> int:
+    """Kill browsers tagged with MARKER_SWITCH whose launching process is gone."""
+    killed = 0
+    for pid in _all_pids():
+        cmd = _cmdline(pid)
+        idx = cmd.find(MARKER_SWITCH + "=")
+        if idx < 0:
+            continue
+        try:
+            owner = int(cmd[idx + len(MARKER_SWITCH) + 1:].split()[0])
+        except Exception:
+            continue
+        if owner != os.getpid() and not _pid_alive(owner):
+            killed += kill_tree([pid])
+    return killed
+
+
+def driver_pids(driver) -> List[int]:
+    """Root pids of a selenium / undetected_chromedriver session (chromedriver and browser)."""
+    pids = []
+    try:
+        proc = getattr(getattr(driver, "service", None), "process", None)
+        if proc is not None and proc.pid:
+            pids.append(int(proc.pid))
+    except Exception:
+        pass
+    try:
+        browser_pid = getattr(driver, "browser_pid", None)
+        if browser_pid:
+            pids.append(int(browser_pid))
+    except Exception:
+        pass
+    return pids
+
+
+class DriverWatchdog:
+    """
+    Supervision for Chrome drivers:
+
+      - page-load and script timeouts on every driver, so a stuck load raises
+      - a timer per page load that kills the process tree when even the timeout does
+        not fire (chromedriver itself hung) — the blocked call then fails and the
+        engine replaces the driver
+      - RSS of the browser process tree checked every `check_every` loads; above
+        `max_rss_mb` the engine recycles the driver before the next load
+      - browsers are tagged with MARKER_SWITCH; reap_orphans() cleans up after crashed runs
+
+    max_rss_mb=0 disables recycling. One instance can be shared by several engines.
+    """
+
+    def __init__(self, page_load_timeout: float = 30, script_timeout: float = 15,
+                 max_rss_mb: float = 1500, check_every: int = 10, grace: float = 15,
+                 metrics: Optional[Any] = None):
+        self.page_load_timeout = float(page_load_timeout or 0)
+        self.script_timeout = float(script_timeout or 0)
+        self.max_rss_mb = float(max_rss_mb or 0)
+        self.check_every = max(1, int(check_every or 1))
+        self.grace = float(grace or 0)
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._loads: Dict[int, int] = {}
+        self.peak_rss = 0
+
+    @classmethod
+    def from_filters(cls, filters: Optional[Dict[str, Any]], metrics: Optional[Any] = None) -> "DriverWatchdog":
+        f = filters or {}
+        return cls(page_load_timeout=f.get("page_load_timeout", 30),
+                   script_timeout=f.get("script_timeout", 15),
+                   max_rss_mb=f.get("driver_max_rss_mb", 1500),
+                   check_every=f.get("rss_check_every", 10),
+                   metrics=metrics)
+
+    def _inc(self, name: str):
+        if self.metrics is not None:
+            self.metrics.inc(name)
+
+    # ---------------- driver setup ----------------
+    def configure(self, options):
+        options.add_argument(marker_arg())
+
+    def attach(self, driver):
+        try:
+            if self.page_load_timeout:
+                driver.set_page_load_timeout(self.page_load_timeout)
+            if self.script_timeout:
+                driver.set_script_timeout(self.script_timeout)
+        except Exception:
+            pass
+
+    # ---------------- per page ----------------
+    @contextmanager
+    def guard(self, driver):
+        """Kill the driver's processes if the block outlives page_load_timeout + grace."""
+        if not self.page_load_timeout:
+            yield
+            return
+        pids = driver_pids(driver)
+        fired = []
+
+        def _kill():
+            fired.append(True)
+            self._inc("driver_hangs")
+            kill_tree(pids)
+
+        timer = threading.Timer(self.page_load_timeout + self.grace, _kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        except Exception:
+            if fired:
+                raise TimeoutError("driver hung and was killed") from None
+            raise
+        finally:
+            timer.cancel()
+        if fired:
+            raise TimeoutError("driver hung and was killed")
+
+    def needs_recycle(self, driver) -> bool:
+        """Count a load on `driver`; True when its process tree is over the RSS budget."""
+        if not self.max_rss_mb or driver is None:
+            return False
+        key = id(driver)
+        with self._lock:
+            n = self._loads[key] = self._loads.get(key, 0) + 1
+        if n % self.check_every:
+            return False
+        rss = tree_rss(driver_pids(driver))
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+        if rss > self.max_rss_mb * 1024 * 1024:
+            self._inc("driver_recycles")
+            return True
+        return False
+
+    def forget(self, driver):
+        with self._lock:
+            self._loads.pop(id(driver), None)
+
+    def kill(self, driver) -> int:
+        """Hard stop for a running driver (Stop during a load, a hung browser)."""
+        self.forget(driver)
+        return kill_snapshot(snapshot_tree(driver_pids(driver)), unverified=True)
+
+    def quit(self, driver, timeout: Optional[float] = None) -> int:
+        """driver.quit(), then kill what is left of its process tree; returns the kill count.
+
+        The tree is snapshotted before quit(). After a clean quit only processes of the
+        snapshot that are still running (same pid and start time — orphaned renderers)
+        are killed; the pids of processes that exited may already belong to someone else.
+        When quit() raises or outlives `timeout` (default: grace), the snapshot is killed.
+        """
+        snapshot = snapshot_tree(driver_pids(driver))
+        self.forget(driver)
+        done = threading.Event()
+        failed = []
+
+        def _quit():
+            try:
+                driver.quit()
+            except Exception:
+                failed.append(True)
+            finally:
+                done.set()
+
+        threading.Thread(target=_quit, name="driver-quit", daemon=True).start()
+        if not done.wait(timeout if timeout is not None else (self.grace or None)):
+            self._inc("driver_hangs")
+            failed.append(True)
+        return kill_snapshot(snapshot, unverified=bool(failed))
@@ -0,0 +1,381 @@
+# html_extract.py
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Dict, Any, Callable
+
+from price_parsing import NumberParser
+from currency import detect_currency
+from records import ProductRecord, RunContext
+from variations import extract_variations
+
+# Selenium-free extraction over raw page HTML.
+# Mirrors AmazonAPI._extract_search_page_products() and AmazonAPI._visit_and_extract()
+# so saved or archived pages can be (re-)extracted without a browser; the returned
+# dicts use the same keys as the Selenium path.
+
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+_SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+_WS_RE = re.compile(r"\s+")
+_ASIN_URL_RE = re.compile(r"/([A-Z0-9]{10})(?:[/?]|$)")
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent", "_text")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Any] = []      # Node or str
+        self.parent = parent
+        self._text = None
+
+    def get(self, name: str, default: str = "") -> str:
+        v = self.attrs.get(name)
+        return v if v is not None else default
+
+    @property
+    def classes(self) -> List[str]:
+        return (self.attrs.get("class") or "").split()
+
+    def has_class(self, cls: str) -> bool:
+        return cls in self.classes
+
+    def iter(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            for c in reversed(node.children):
+                if isinstance(c, Node):
+                    stack.append(c)
+
+    def find_all(self, pred: Callable[["Node"], bool]) -> List["Node"]:
+        return [n for n in self.iter() if n is not self and pred(n)]
+
+    def find(self, pred: Callable[["Node"], bool]) -> Optional["Node"]:
+        for n in self.iter():
+            if n is not self and pred(n):
+                return n
+        return None
+
+    def find_class(self, cls: str, tag: Optional[str] = None) -> Optional["Node"]:
+        return self.find(lambda n: (tag is None or n.tag == tag) and n.has_class(cls))
+
+    def find_all_class(self, cls: str, tag: Optional[str] = None) -> List["Node"]:
+        return self.find_all(lambda n: (tag is None or n.tag == tag) and n.has_class(cls))
+
+    def text(self) -> str:
+        """Visible text, whitespace collapsed (roughly WebElement.text)."""
+        if self._text is None:
+            parts: List[str] = []
+            self._collect(parts)
+            self._text = _WS_RE.sub(" ", "".join(parts)).strip()
+        return self._text
+
+    def _collect(self, parts: List[str]):
+        if self.tag in _SKIP_TEXT_TAGS:
+            return
+        for c in self.children:
+            if isinstance(c, str):
+                parts.append(c)
+            else:
+                if c.tag in ("br", "p", "div", "li"):
+                    parts.append(" ")
+                c._collect(parts)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.ids: Dict[str, Node] = {}
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._stack[-1]
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, parent)
+        parent.children.append(node)
+        el_id = node.attrs.get("id")
+        if el_id and el_id not in self.ids:
+            self.ids[el_id] = node
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS and self._stack[-1].tag == tag:
+            self._stack.pop()
+
+    def handle_endtag(self, tag):
+        # tolerate misnested markup: pop up to the matching open tag, ignore stray end tags
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].children.append(data)
+
+
+class Document:
+    """Parsed page with id lookup, the minimum the extractors need."""
+
+    def __init__(self, html: str):
+        builder = _TreeBuilder()
+        builder.feed(html or "")
+        builder.close()
+        self.root = builder.root
+        self.ids = builder.ids
+        self.source = html or ""
+
+    def by_id(self, el_id: str) -> Optional[Node]:
+        return self.ids.get(el_id)
+
+    def text_by_id(self, el_id: str) -> Optional[str]:
+        el = self.ids.get(el_id)
+        return el.text() if el is not None else None
+
+
+# ---------------- search page ----------------
+def extract_search_page(html: str, base_url: str = "https://www.amazon.com") -> List[Dict[str, Any]]:
+    doc = html if isinstance(html, Document) else Document(html)
+    base_url = (base_url or "").rstrip("/")
+    numbers = NumberParser.for_domain(base_url)
+    results: List[Dict[str, Any]] = []
+    raw_prices: List[Optional[str]] = []
+
+    cards = doc.root.find_all(lambda n: n.tag == "div" and n.get("data-component-type") == "s-search-result")
+    for c in cards:
+        asin = c.get("data-asin")
+        if not asin:
+            continue
+
+        title = ""
+        h2 = c.find(lambda n: n.tag == "h2")
+        if h2 is not None:
+            span = h2.find(lambda n: n.tag == "span")
+            title = (span or h2).text()
+
+        url = ""
+        link = c.find(lambda n: n.tag == "a" and n.get("class") == "a-link-normal s-no-outline")
+        if link is not None:
+            href = link.get("href")
+            if href:
+                url = href.split("?")[0]
+                if href.startswith("/"):
+                    url = f"{base_url}{href}"
+
+        raw_price = None
+        whole = c.find_class("a-price-whole")
+        if whole is not None:
+            frac = c.find_class("a-price-fraction")
+            # the whole part carries a trailing decimal separator span in the markup
+            raw_price = whole.text().rstrip(".,")
+            if frac is not None:
+                raw_price += numbers.fmt.decimal + frac.text()
+        else:
+            off = c.find_class("a-offscreen", tag="span")
+            if off is not None:
+                raw_price = off.text()
+        raw_prices.append(raw_price)
+
+        img = ""
+        img_el = c.find(lambda n: n.tag == "img")
+        if img_el is not None:
+            img = img_el.get("src") or img_el.get("data-src")
+
+        alt = c.find_class("a-icon-alt", tag="span")
+        rv = c.find_class("s-underline-text", tag="span")
+
+        results.append({
+            "asin": asin,
+            "title": title,
+            "url": url,
+            "price": None,
+            "rating": numbers.parse_rating(alt.text()) if alt is not None else None,
+            "reviews": numbers.parse_int(rv.text()) if rv is not None else None,
+            "prime": c.find_class("a-icon-prime") is not None,
+            "image_url": img,
+            "image": img,
+        })
+
+    # one batch pass over the page's price column
+    for row, price in zip(results, numbers.parse_prices(raw_prices)):
+        row["price"] = price
+    return results
+
+
+# ---------------- product page ----------------
+_PRICE_CONTAINERS = ("corePrice_feature_div", "corePriceDisplay_desktop_feature_div")
+
+
+def _extract_price(doc: Document, numbers: NumberParser) -> Optional[float]:
+    for cid in _PRICE_CONTAINERS:
+        box = doc.by_id(cid)
+        if box is None:
+            continue
+        for el in box.find_all_class("a-price-whole", tag="span"):
+            val = numbers.parse_price(el.text())
+            if val is not None:
+                return val
+    for pid in ("priceblock_dealprice", "priceblock_ourprice"):
+        val = numbers.parse_price(doc.text_by_id(pid) or "")
+        if val is not None:
+            return val
+    for el in doc.root.find_all_class("a-offscreen", tag="span"):
+        txt = el.text()
+        if "$" in txt or "€" in txt or "£" in txt:
+            val = numbers.parse_price(txt)
+            if val is not None:
+                return val
+    box = doc.root.find_class("a-price", tag="span")
+    if box is not None:
+        off = box.find_class("a-offscreen", tag="span")
+        if off is not None:
+            return numbers.parse_price(off.text())
+    return None
+
+
+def _extract_currency(doc: Document, base_url: str) -> str:
+    for cid in _PRICE_CONTAINERS:
+        box = doc.by_id(cid)
+        if box is None:
+            continue
+        for cls in ("a-price-symbol", "a-offscreen"):
+            el = box.find_class(cls)
+            if el is not None and el.text():
+                return detect_currency(el.text(), base_url)
+    box = doc.root.find_class("a-price", tag="span")
+    off = box.find_class("a-offscreen", tag="span") if box is not None else None
+    return detect_currency(off.text() if off is not None else None, base_url)
+
+
+def _extract_rating(doc: Document, numbers: NumberParser) -> Optional[float]:
+    el = doc.by_id("acrPopover")
+    candidates = []
+    if el is not None:
+        candidates.append(el.get("title") or el.text())
+    alt = doc.root.find_class("a-icon-alt", tag="span")
+    if alt is not None:
+        candidates.append(alt.text())
+    for txt in candidates:
+        val = numbers.parse_rating(txt)
+        if val is not None:
+            return val
+    return None
+
+
+def _extract_review_count(doc: Document, numbers: NumberParser) -> Optional[int]:
+    return numbers.parse_int(doc.text_by_id("acrCustomerReviewText") or "")
+
+
+def _extract_bsr(doc: Document, numbers: NumberParser) -> Optional[int]:
+    val = numbers.parse_bsr(doc.text_by_id("productDetails_detailBullets_sections1") or "")
+    if val is not None:
+        return val
+    return numbers.parse_bsr(doc.source)
+
+
+def _extract_images(doc: Document, limit: int = 8) -> List[str]:
+    imgs = []
+    for t in doc.root.find_all(lambda n: n.tag == "img" and "s-image" in n.get("class")):
+        src = t.get("src")
+        if src and src.startswith("http") and "sprite" not in src and "data:image" not in src:
+            imgs.append(src)
+    return list(dict.fromkeys(imgs))[:limit]
+
+
+def _extract_seller_info(doc: Document) -> Optional[str]:
+    return doc.text_by_id("merchant-info") or doc.text_by_id("sellerProfileTriggerId") or None
+
+
+def _extract_availability(doc: Document) -> Optional[str]:
+    txt = doc.text_by_id("availability")
+    return txt if txt is not None else None
+
+
+def extract_product_page(html: str, url: str, base_url: str = "https://www.amazon.com",
+                         currency: Optional[str] = None, filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    doc = html if isinstance(html, Document) else Document(html)
+    filters = filters or {}
+    base_url = (base_url or "https://www.amazon.com").rstrip("/")
+
+    numbers = NumberParser.for_domain(base_url)
+
+    title = doc.text_by_id("productTitle") or ""
+    price = _extract_price(doc, numbers)
+    if not title and not price:
+        return None
+
+    rating = _extract_rating(doc, numbers)
+    review_count = _extract_review_count(doc, numbers)
+    images = _extract_images(doc)
+    availability = _extract_availability(doc)
+    seller_info = _extract_seller_info(doc)
+    bsr = _extract_bsr(doc, numbers)
+
+    description = doc.text_by_id("productDescription") or ""
+    if not description:
+        meta = doc.root.find(lambda n: n.tag == "meta" and n.get("name") == "description")
+        description = meta.get("content") if meta is not None else ""
+
+    brand = doc.text_by_id("bylineInfo") or ""
+    condition = doc.text_by_id("condition") or ""
+
+    seller_type = ""
+    if seller_info:
+        s = seller_info.lower()
+        if "fulfilled by amazon" in s or "fba" in s:
+            seller_type = "fba"
+        elif "sold by amazon" in s or "amazon.com" in s or "ships from and sold by amazon" in s:
+            seller_type = "amazon"
+        else:
+            seller_type = "fbm"
+
+    src = doc.source.lower()
+    discount = "you save" in src or "was $" in src or "was €" in src or "save" in src
+
+    parent_asin, variations = extract_variations(doc.source, numbers)
+
+    main_image = images[0] if images else ""
+    return ProductRecord(
+        asin=extract_asin(url),
+        url=url,
+        title=title,
+        description=description or "",
+        price=price,
+        rating=rating,
+        reviews=review_count,
+        images=images,
+        image_url=main_image,
+        currency=_extract_currency(doc, base_url) or currency or "",
+        availability=availability,
+        seller_info=seller_info,
+        bsr=bsr,
+        brand=brand,
+        condition=condition,
+        seller_type=seller_type,
+        discount=discount,
+        country=base_url.split("//")[-1].split(".")[-1].upper(),
+        parent_asin=parent_asin,
+        variations=variations,
+        prime=doc.root.find_class("a-icon-prime") is not None,
+        context=RunContext.from_filters(filters),
+    ).strip()
+
+
+def extract_asin(url: str) -> str:
+    try:
+        if "/dp/" in url:
+            return url.split("/dp/")[1].split("/")[0]
+        if "/gp/product/" in url:
+            return url.split("/gp/product/")[1].split("/")[0]
+        m = _ASIN_URL_RE.search(url)
+        if m:
+            return m.group(1)
+    except Exception:
+        pass
+    return "UNKNOWN"
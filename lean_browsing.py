@@ -0,0 +1,149 @@
+# lean_browsing.py
+import threading
+from typing import List, Optional, Dict, Any
+
+# Extraction reads text and image URLs (src / data-a-dynamic-image attributes), never
+# the image bytes — these requests can be dropped without changing any record.
+BLOCKED_URL_PATTERNS: List[str] = [
+    # images / media / fonts
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8", "*.ts", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # ads / analytics / telemetry
+    "*amazon-adsystem.com*", "*aax-*.amazon*", "*fls-na.amazon.*", "*fls-eu.amazon.*", "*unagi*.amazon.*",
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*facebook.net*", "*criteo.*", "*adnxs.com*", "*scorecardresearch.com*",
+]
+
+LEAN_CHROME_ARGS: List[str] = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--mute-audio",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--metrics-recording-only",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication,InterestFeedContentSuggestions",
+]
+
+# transferSize of the document plus every resource the page fetched, and time to DOMContentLoaded.
+# Cross-origin resources without Timing-Allow-Origin report 0, so byte counts are a lower bound.
+_PAGE_COST_JS = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+let bytes = nav.transferSize || 0;
+const res = performance.getEntriesByType('resource');
+for (const r of res) { bytes += r.transferSize || 0; }
+return [bytes, nav.domContentLoadedEventEnd || 0, res.length];
+"""
+
+# the default resource-timing buffer (250 entries) overflows on a full product page
+_BUFFER_JS = "try { performance.setResourceTimingBufferSize(5000); } catch (e) {}"
+
+
+class LeanBrowsing:
+    """
+    Lean page loads for Chrome drivers:
+
+      - Network.setBlockedURLs (CDP) drops images, media, fonts and ad/analytics hosts
+      - pageLoadStrategy "eager": driver.get() returns at DOMContentLoaded
+      - background Chrome features (sync, translate, component updates, ...) disabled
+
+    Savings are measured, not assumed: every `sample_every`-th page is loaded with
+    blocking lifted as a baseline, and bytes / load time of lean and baseline pages
+    are averaged per page kind. One instance can be shared by several engines.
+    """
+
+    def __init__(self, metrics: Optional[Any] = None, sample_every: int = 25,
+                 patterns: Optional[List[str]] = None):
+        self.metrics = metrics
+        self.sample_every = max(0, int(sample_every or 0))
+        self.patterns = list(patterns or BLOCKED_URL_PATTERNS)
+        self._lock = threading.Lock()
+        self._pages = 0
+        # kind -> {"lean": [pages, bytes, ms], "full": [pages, bytes, ms]}
+        self._stats: Dict[str, Dict[str, List[float]]] = {}
+
+    # ---------------- driver setup ----------------
+    def configure(self, options):
+        for arg in LEAN_CHROME_ARGS:
+            options.add_argument(arg)
+        options.page_load_strategy = "eager"
+
+    def attach(self, driver) -> bool:
+        """Enable request blocking on a freshly created driver; False if CDP is unavailable."""
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _BUFFER_JS})
+            return True
+        except Exception:
+            return False
+
+    # ---------------- per page ----------------
+    def before_get(self, driver) -> bool:
+        """Returns True when this load is a full (unblocked) baseline sample."""
+        with self._lock:
+            self._pages += 1
+            sample = self.sample_every > 0 and (self._pages - 1) % self.sample_every == 0
+        if sample:
+            try:
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+            except Exception:
+                return False
+        return sample
+
+    def after_get(self, driver, kind: str, sample: bool, elapsed: float):
+        if sample:
+            try:
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+            except Exception:
+                pass
+        try:
+            nbytes, dcl_ms, _ = driver.execute_script(_PAGE_COST_JS)
+        except Exception:
+            return
+        ms = float(dcl_ms or 0) or elapsed * 1000
+        with self._lock:
+            s = self._stats.setdefault(kind, {"lean": [0, 0, 0.0], "full": [0, 0, 0.0]})["full" if sample else "lean"]
+            s[0] += 1
+            s[1] += int(nbytes or 0)
+            s[2] += ms
+        if self.metrics is not None:
+            self.metrics.inc("bytes_transferred", int(nbytes or 0))
+            if sample:
+                self.metrics.inc("baseline_pages")
+
+    # ---------------- reporting ----------------
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per page kind: average bytes / load ms with and without blocking, and the saving."""
+        out = {}
+        with self._lock:
+            items = {k: {m: list(v) for m, v in d.items()} for k, d in self._stats.items()}
+        for kind, d in items.items():
+            lean, full = d["lean"], d["full"]
+            row = {"pages": lean[0] + full[0], "baseline_pages": full[0]}
+            if lean[0]:
+                row["lean_bytes"] = round(lean[1] / lean[0])
+                row["lean_ms"] = round(lean[2] / lean[0], 1)
+            if full[0]:
+                row["full_bytes"] = round(full[1] / full[0])
+                row["full_ms"] = round(full[2] / full[0], 1)
+            if lean[0] and full[0]:
+                row["saved_bytes_per_page"] = row["full_bytes"] - row["lean_bytes"]
+                row["saved_ms_per_page"] = round(row["full_ms"] - row["lean_ms"], 1)
+            out[kind] = row
+        return out
+
+    def format_summary(self) -> str:
+        lines = []
+        for kind, r in sorted(self.summary().items()):
+            if "saved_bytes_per_page" in r:
+                lines.append(f"{kind}: {r['lean_bytes'] / 1024:.0f} KB / {r['lean_ms']:.0f} ms per page "
+                             f"(saved {r['saved_bytes_per_page'] / 1024:.0f} KB, {r['saved_ms_per_page']:.0f} ms "
+                             f"vs {r['baseline_pages']} unblocked samples)")
+            elif "lean_bytes" in r:
+                lines.append(f"{kind}: {r['lean_bytes'] / 1024:.0f} KB / {r['lean_ms']:.0f} ms per page (no baseline sample)")
+        return "\n".join(lines)
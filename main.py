@@ -1,12 +1,25 @@
 # main.py
 import sys
+import startup
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication
 from gui import ModernTrackerGUI
 
 def main():
+    startup.mark("imports")
     app = QApplication(sys.argv)
     w = ModernTrackerGUI()
     w.show()
+    startup.mark("window shown")
+
+    def load_engine():
+        # selenium / scraping engine load after the first paint
+        w.preload_engine()
+        startup.mark("engine loaded")
+        if "--startup-report" in sys.argv:
+            print("Startup timing:\n" + startup.format_marks(), file=sys.stderr)
+
+    QTimer.singleShot(0, load_engine)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,214 @@
+# marketplaces.py
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Dict, Any, Callable, Tuple
+
+from price_parsing import marketplace_of
+from currency import currency_symbol
+
+
+class Marketplace:
+    """One Amazon domain; `currency` is the ISO code records and FX rates use."""
+    __slots__ = ("code", "label", "base_url", "currency")
+
+    def __init__(self, code: str, label: str, base_url: str, currency: str):
+        self.code = code
+        self.label = label
+        self.base_url = base_url
+        self.currency = currency
+
+    @property
+    def key(self) -> str:
+        return marketplace_of(self.base_url)
+
+    @property
+    def symbol(self) -> str:
+        # display only
+        return currency_symbol(self.currency)
+
+
+# code -> marketplace; the GUI domain combobox is built from this table
+MARKETPLACES: Dict[str, Marketplace] = {
+    "US": Marketplace("US", "US (.com)", "https://www.amazon.com", "USD"),
+    "DE": Marketplace("DE", "DE (.de)", "https://www.amazon.de", "EUR"),
+    "FR": Marketplace("FR", "FR (.fr)", "https://www.amazon.fr", "EUR"),
+    "UK": Marketplace("UK", "UK (.co.uk)", "https://www.amazon.co.uk", "GBP"),
+    "IT": Marketplace("IT", "IT (.it)", "https://www.amazon.it", "EUR"),
+    "ES": Marketplace("ES", "ES (.es)", "https://www.amazon.es", "EUR"),
+}
+
+DOMAIN_MAP = {m.label: m.base_url for m in MARKETPLACES.values()}
+
+
+def get_marketplace(code_or_url: str) -> Optional[Marketplace]:
+    """Accepts 'DE', 'de', '.de', 'co.uk', 'UK' or a full URL."""
+    if not code_or_url:
+        return None
+    raw = code_or_url.strip()
+    m = MARKETPLACES.get(raw.upper().lstrip("."))
+    if m is not None:
+        return m
+    key = marketplace_of(raw if "amazon." in raw else f"amazon.{raw.lstrip('.').lower()}")
+    for m in MARKETPLACES.values():
+        if m.key == key:
+            return m
+    return None
+
+
+def parse_domains(text_or_list) -> List[Marketplace]:
+    items = text_or_list.replace(",", " ").split() if isinstance(text_or_list, str) else list(text_or_list or [])
+    out = []
+    for item in items:
+        m = get_marketplace(item)
+        if m is not None and m not in out:
+            out.append(m)
+    return out
+
+
+def split_proxies(proxies: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Separate shared proxies from marketplace-pinned ones written as 'DE|proxy'."""
+    shared: List[str] = []
+    pinned: Dict[str, List[str]] = {}
+    for p in proxies or []:
+        p = (p or "").strip()
+        if not p:
+            continue
+        if "|" in p:
+            code, _, proxy = p.partition("|")
+            m = get_marketplace(code)
+            if m is not None and proxy.strip():
+                pinned.setdefault(m.code, []).append(proxy.strip())
+                continue
+        shared.append(p)
+    return shared, pinned
+
+
+def proxies_for(code: str, proxies: List[str]) -> List[str]:
+    shared, pinned = split_proxies(proxies)
+    return pinned.get(code) or shared
+
+
+class CrossMarketRunner:
+    """
+    Tracks one ASIN set on several marketplaces in parallel.
+
+    Each marketplace gets its own engine (driver, proxy rotation restricted to that
+    marketplace's proxies, price parsing by domain) on its own thread. When only a
+    search term is given, the ASIN set comes from searching the first marketplace.
+
+    merged() returns one row per ASIN with price_<CODE> / currency_<CODE> / url_<CODE>
+    columns for every marketplace.
+    """
+
+    def __init__(
+        self,
+        make_engine: Callable[[Marketplace], Any],
+        domains: List[Marketplace],
+        asin_list: Optional[List[str]] = None,
+        search_term: str = "",
+        max_pages: int = 1,
+        should_stop: Optional[Callable[[], bool]] = None,
+        on_product: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ):
+        self.make_engine = make_engine
+        self.domains = domains
+        self.asin_list = list(asin_list or [])
+        self.search_term = search_term or ""
+        self.max_pages = max(1, int(max_pages or 1))
+        self.should_stop = should_stop or (lambda: False)
+        self.on_product = on_product
+        self.results: Dict[str, Dict[str, Dict[str, Any]]] = {}     # asin -> code -> product
+        self.engines: List[Any] = []
+        self.asin_order: List[str] = []
+        self._lock = threading.Lock()
+
+    def _engine(self, m: Marketplace):
+        eng = self.make_engine(m)
+        with self._lock:
+            self.engines.append(eng)
+        return eng
+
+    def discover_asins(self) -> List[str]:
+        """ASIN set from a search on the first marketplace."""
+        eng = self._engine(self.domains[0])
+        asins: List[str] = []
+        try:
+            for page in range(1, self.max_pages + 1):
+                if self.should_stop():
+                    break
+                for p in eng.scrape_products(url=None, page=page):
+                    a = p.get("asin")
+                    if a and a not in asins:
+                        asins.append(a)
+        finally:
+            eng.cleanup()
+        return asins
+
+    def _track_domain(self, m: Marketplace, asins: List[str]) -> int:
+        eng = self._engine(m)
+        found = 0
+        try:
+            for asin in asins:
+                if self.should_stop():
+                    break
+                try:
+                    item = eng._get_full_product_from_listing({"asin": asin})
+                except Exception:
+                    item = None
+                if not item:
+                    continue
+                found += 1
+                with self._lock:
+                    self.results.setdefault(asin, {})[m.code] = item
+                if self.on_product is not None:
+                    self.on_product(m.code, item)
+        finally:
+            eng.cleanup()
+        return found
+
+    def run(self) -> Dict[str, int]:
+        asins = self.asin_list or (self.discover_asins() if self.search_term else [])
+        if not asins or not self.domains:
+            return {}
+        counts: Dict[str, int] = {}
+        with ThreadPoolExecutor(max_workers=len(self.domains), thread_name_prefix="market") as pool:
+            futures = {pool.submit(self._track_domain, m, asins): m for m in self.domains}
+            for fut in as_completed(futures):
+                m = futures[fut]
+                try:
+                    counts[m.code] = fut.result()
+                except Exception:
+                    counts[m.code] = 0
+        self.asin_order = asins
+        return counts
+
+    def stop(self):
+        with self._lock:
+            engines = list(self.engines)
+        for eng in engines:
+            try:
+                eng.stop()
+            except Exception:
+                pass
+
+    def merged(self) -> List[Dict[str, Any]]:
+        order = self.asin_order or list(self.results)
+        rows = []
+        for asin in order:
+            per_domain = self.results.get(asin)
+            if not per_domain:
+                continue
+            first = next(iter(per_domain.values()))
+            row = {"asin": asin, "title": first.get("title", ""), "brand": first.get("brand", "")}
+            for m in self.domains:
+                item = per_domain.get(m.code) or {}
+                row[f"price_{m.code}"] = item.get("price")
+                row[f"currency_{m.code}"] = item.get("currency") or (m.currency if item else "")
+                row[f"url_{m.code}"] = item.get("url", "")
+                if "price_base" in item:
+                    row[f"price_base_{m.code}"] = item.get("price_base")
+            base = next((i.get("base_currency") for i in per_domain.values() if i.get("base_currency")), None)
+            if base:
+                row["base_currency"] = base
+            rows.append(row)
+        return rows
@@ -0,0 +1,155 @@
+# metrics.py
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any
+
+
+class RunMetrics:
+    """
+    Per-run timing spans and counters.
+
+    Spans (create_driver, driver_get, extract_*, filter, image_download, report_export)
+    accumulate count / total / max seconds. Counters track pages, products,
+    filtered-out items, retries and blocks. Everything is thread-safe so several
+    drivers can share one instance.
+
+    Output:
+       to_prometheus()  -> Prometheus text exposition format
+       summary()        -> dict, written as JSON next to the report
+       serve(port)      -> optional HTTP endpoint serving /metrics
+    """
+
+    PREFIX = "amazon_tracker"
+
+    def __init__(self, run_name: str = ""):
+        self.run_name = run_name
+        self.started_at = datetime.utcnow()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self._server = None
+
+    # ---------------- recording ----------------
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            s = self.spans.get(name)
+            if s is None:
+                s = self.spans[name] = {"count": 0, "total": 0.0, "max": 0.0}
+            s["count"] += 1
+            s["total"] += seconds
+            if seconds > s["max"]:
+                s["max"] = seconds
+
+    def inc(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # ---------------- output ----------------
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = {
+                k: {
+                    "count": v["count"],
+                    "total_s": round(v["total"], 4),
+                    "mean_s": round(v["total"] / v["count"], 4) if v["count"] else 0.0,
+                    "max_s": round(v["max"], 4),
+                }
+                for k, v in sorted(self.spans.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "run": self.run_name,
+            "started_at": self.started_at.isoformat(),
+            "elapsed_s": round(self.elapsed(), 3),
+            "counters": counters,
+            "spans": spans,
+        }
+
+    def to_prometheus(self) -> str:
+        p = self.PREFIX
+        lines = []
+        with self._lock:
+            lines.append(f"# HELP {p}_stage_seconds Time spent per scraping stage.")
+            lines.append(f"# TYPE {p}_stage_seconds summary")
+            for name, s in sorted(self.spans.items()):
+                lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {s["total"]:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+            lines.append(f"# HELP {p}_stage_seconds_max Slowest single call per stage.")
+            lines.append(f"# TYPE {p}_stage_seconds_max gauge")
+            for name, s in sorted(self.spans.items()):
+                lines.append(f'{p}_stage_seconds_max{{stage="{name}"}} {s["max"]:.6f}')
+            for name, v in sorted(self.counters.items()):
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                lines.append(f"{p}_{name}_total {v}")
+        lines.append(f"# TYPE {p}_run_elapsed_seconds gauge")
+        lines.append(f"{p}_run_elapsed_seconds {self.elapsed():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_summary(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def write_prometheus(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+
+    # ---------------- HTTP endpoint ----------------
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Serve /metrics in a daemon thread until close() is called."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer   # only when the endpoint is on
+
+        metrics = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, int(port)), _Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.shutdown()
+                self._server.server_close()
+            except Exception:
+                pass
+            self._server = None
+
+
+class NullMetrics(RunMetrics):
+    """Drop-in used when no metrics object is attached; records nothing."""
+
+    @contextmanager
+    def span(self, name: str):
+        yield
+
+    def observe(self, name: str, seconds: float):
+        pass
+
+    def inc(self, name: str, n: int = 1):
+        pass
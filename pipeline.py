@@ -0,0 +1,135 @@
+# pipeline.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Tuple
+
+import html_extract
+
+
+def parse_product_html(html: str, url: str, base_url: str, currency: Optional[str],
+                       filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Parser-process entry point. Returns the product record (no DOM objects cross the process boundary)."""
+    if not html:
+        return None
+    return html_extract.extract_product_page(html, url, base_url, currency=currency, filters=filters)
+
+
+def parse_search_html(html: str, base_url: str) -> List[Dict[str, Any]]:
+    if not html:
+        return []
+    return html_extract.extract_search_page(html, base_url)
+
+
+class HtmlPipeline:
+    """
+    Fetch / parse pipeline for HTML fetched without a browser.
+
+    Fetching is I/O-bound and runs on a thread pool; parsing and regex extraction is
+    CPU-bound and runs on a process pool so it is not serialized by the GIL of the
+    QThread driving the run. The two pools are sized independently.
+
+    Backpressure: at most `max_pending` URLs are in flight (fetching, waiting to be
+    parsed or parsed but not yet consumed). URLs are pulled from the input iterator
+    only when a slot frees up, and results are yielded to the caller as they
+    complete, so a slow consumer throttles fetching instead of buffering pages.
+
+    With an `archive` (archive.HtmlArchive), every fetched page is stored by the
+    fetch stage before it is parsed, so HTTP runs can be replayed offline.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], str],
+        base_url: str = "https://www.amazon.com",
+        currency: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        fetch_workers: int = 4,
+        parse_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        archive: Optional[Any] = None,
+    ):
+        self.fetch = fetch
+        self.base_url = (base_url or "https://www.amazon.com").rstrip("/")
+        self.currency = currency
+        self.filters = {k: (filters or {}).get(k) for k in ("category_node", "include_keywords", "exclude_keywords")}
+        self.fetch_workers = max(1, int(fetch_workers or 1))
+        self.parse_workers = max(1, int(parse_workers or os.cpu_count() or 1))
+        self.max_pending = max(1, int(max_pending or (self.fetch_workers + self.parse_workers) * 2))
+        self.should_stop = should_stop or (lambda: False)
+        self.archive = archive
+
+        self._fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="fetch")
+        self._parse_pool = None
+        self._lock = threading.Lock()
+
+    def _parser(self) -> ProcessPoolExecutor:
+        # started lazily: spawning processes is only worth it once there is HTML to parse
+        with self._lock:
+            if self._parse_pool is None:
+                self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+            return self._parse_pool
+
+    def _fetch_one(self, url: str) -> str:
+        html = self.fetch(url) or ""
+        if html and self.archive is not None:
+            # stored unparsed: the record is only known once the parser process returns
+            try:
+                self.archive.store(html, "product", url, None, base_url=self.base_url,
+                                   currency=self.currency, filters=self.filters)
+            except Exception:
+                pass
+        return html
+
+    def run(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Yield (url, record) in completion order; record is None when fetch or parse failed."""
+        source = iter(urls)
+        pending = {}       # future -> (stage, url)
+        exhausted = False
+
+        def fill():
+            nonlocal exhausted
+            while not exhausted and len(pending) < self.max_pending and not self.should_stop():
+                try:
+                    url = next(source)
+                except StopIteration:
+                    exhausted = True
+                    return
+                pending[self._fetch_pool.submit(self._fetch_one, url)] = ("fetch", url)
+
+        fill()
+        try:
+            while pending:
+                if self.should_stop():
+                    break
+                done, _ = wait(list(pending), timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage, url = pending.pop(fut)
+                    if stage == "fetch":
+                        try:
+                            html = fut.result()
+                        except Exception:
+                            html = ""
+                        if not html:
+                            yield url, None
+                            continue
+                        pfut = self._parser().submit(parse_product_html, html, url, self.base_url,
+                                                     self.currency, self.filters)
+                        pending[pfut] = ("parse", url)
+                    else:
+                        try:
+                            record = fut.result()
+                        except Exception:
+                            record = None
+                        yield url, record
+                fill()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    def close(self):
+        self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
@@ -0,0 +1,159 @@
+# price_parsing.py
+import re
+from typing import List, Optional, Dict, Iterable
+
+
+class NumberFormat:
+    """Decimal / thousands conventions of one Amazon marketplace."""
+    __slots__ = ("key", "decimal", "thousands", "currency")
+
+    def __init__(self, key: str, decimal: str, thousands: str, currency: str):
+        self.key = key
+        self.decimal = decimal
+        self.thousands = thousands
+        self.currency = currency
+
+
+# keyed by domain suffix (amazon.<key>)
+FORMATS: Dict[str, NumberFormat] = {
+    "com": NumberFormat("com", ".", ",", "USD"),
+    "co.uk": NumberFormat("co.uk", ".", ",", "GBP"),
+    "de": NumberFormat("de", ",", ".", "EUR"),
+    "fr": NumberFormat("fr", ",", " ", "EUR"),
+    "it": NumberFormat("it", ",", ".", "EUR"),
+    "es": NumberFormat("es", ",", ".", "EUR"),
+}
+DEFAULT_MARKETPLACE = "com"
+
+# first number-looking run, separators included: "1.299,00", "1 299,00", "189.", "-3"
+_NUMBER_RE = re.compile(r"-?\d[\d.,'\s  ]*")
+_SPACES_RE = re.compile(r"[\s  ']")
+_DIGITS_RE = re.compile(r"\d+")
+
+# "4.5 out of 5 stars", "4,5 von 5 Sternen", "4,5 sur 5 étoiles", "4,5 su 5 stelle", "4,5 de 5 estrellas"
+_RATING_RE = re.compile(r"(\d(?:[.,]\d)?)\s*(?:out of|von|sur|su|de|/)\s*5", re.I)
+
+# "Best Sellers Rank: #1,523", "Bestseller-Rang: Nr. 1.523", "meilleures ventes d'Amazon : 1 523",
+# "classifica Bestseller di Amazon: n. 1.523", "más vendidos de Amazon: nº1.523"
+_BSR_RE = re.compile(
+    r"(?:Best Sellers Rank|Bestseller-Rang|meilleures ventes d'Amazon|classifica Bestseller di Amazon|"
+    r"m[áa]s vendidos de Amazon)[:\s#]*(?:Nr\.|n\.|n[ºo°])?\s*([\d][\d.,\s  ]*)",
+    re.I,
+)
+
+
+def marketplace_of(domain_or_url: Optional[str]) -> str:
+    """'https://www.amazon.co.uk/dp/..' -> 'co.uk'; unknown domains fall back to 'com'."""
+    host = (domain_or_url or "").split("//")[-1].split("/")[0].lower()
+    for key in sorted(FORMATS, key=len, reverse=True):
+        if host.endswith("." + key):
+            return key
+    return DEFAULT_MARKETPLACE
+
+
+class NumberParser:
+    """
+    Marketplace-aware parsing of prices, counts, ratings and BSR.
+
+    Patterns are compiled once at import; a parser only carries its NumberFormat.
+    Use NumberParser.for_domain(base_url) — instances are shared per marketplace.
+    """
+
+    _instances: Dict[str, "NumberParser"] = {}
+
+    def __init__(self, marketplace: str = DEFAULT_MARKETPLACE):
+        self.fmt = FORMATS.get(marketplace, FORMATS[DEFAULT_MARKETPLACE])
+
+    @classmethod
+    def for_domain(cls, domain_or_url: Optional[str]) -> "NumberParser":
+        key = marketplace_of(domain_or_url)
+        inst = cls._instances.get(key)
+        if inst is None:
+            inst = cls._instances[key] = cls(key)
+        return inst
+
+    # ---------------- scalars ----------------
+    def parse_price(self, raw: Optional[str]) -> Optional[float]:
+        if not raw:
+            return None
+        m = _NUMBER_RE.search(raw)
+        if not m:
+            return None
+        token = _SPACES_RE.sub("", m.group(0)).rstrip(".,")
+        if not token or token == "-":
+            return None
+
+        has_dot = "." in token
+        has_comma = "," in token
+        if has_dot and has_comma:
+            # whichever separator comes last is the decimal one
+            dec = "." if token.rfind(".") > token.rfind(",") else ","
+            token = token.replace("," if dec == "." else ".", "").replace(dec, ".")
+        elif has_dot or has_comma:
+            sep = "." if has_dot else ","
+            head, _, tail = token.rpartition(sep)
+            if token.count(sep) > 1:
+                token = token.replace(sep, "")
+            elif len(tail) == 3 and sep != self.fmt.decimal:
+                # "1,299" on .com / "1.299" on .de: thousands grouping
+                token = head + tail
+            else:
+                token = head.replace(sep, "") + "." + tail
+        try:
+            return float(token)
+        except ValueError:
+            return None
+
+    def parse_int(self, raw: Optional[str]) -> Optional[int]:
+        """Counts such as '1,234 ratings', '1.234 Sternebewertungen', '1 234 évaluations'."""
+        if not raw:
+            return None
+        m = _NUMBER_RE.search(raw)
+        if not m:
+            return None
+        digits = "".join(_DIGITS_RE.findall(m.group(0)))
+        return int(digits) if digits else None
+
+    def parse_rating(self, raw: Optional[str]) -> Optional[float]:
+        if not raw:
+            return None
+        m = _RATING_RE.search(raw)
+        if not m:
+            return None
+        try:
+            return float(m.group(1).replace(",", "."))
+        except ValueError:
+            return None
+
+    def parse_bsr(self, raw: Optional[str]) -> Optional[int]:
+        if not raw:
+            return None
+        m = _BSR_RE.search(raw)
+        if not m:
+            return None
+        return self.parse_int(m.group(1))
+
+    # ---------------- batch ----------------
+    def parse_prices(self, values: Iterable[Optional[str]]) -> List[Optional[float]]:
+        """Normalize a whole column of raw price strings; each distinct string is parsed once."""
+        values = list(values)
+        memo = {v: self.parse_price(v) for v in set(values) if isinstance(v, str)}
+        return [memo.get(v) if isinstance(v, str) else v for v in values]
+
+    def parse_ints(self, values: Iterable[Optional[str]]) -> List[Optional[int]]:
+        values = list(values)
+        memo = {v: self.parse_int(v) for v in set(values) if isinstance(v, str)}
+        return [memo.get(v) if isinstance(v, str) else v for v in values]
+
+    def parse_ratings(self, values: Iterable[Optional[str]]) -> List[Optional[float]]:
+        values = list(values)
+        memo = {v: self.parse_rating(v) for v in set(values) if isinstance(v, str)}
+        return [memo.get(v) if isinstance(v, str) else v for v in values]
+
+
+def parse_price(raw: Optional[str], domain: Optional[str] = None) -> Optional[float]:
+    return NumberParser.for_domain(domain).parse_price(raw)
+
+
+def parse_price_column(values: Iterable[Optional[str]], domain: Optional[str] = None) -> List[Optional[float]]:
+    return NumberParser.for_domain(domain).parse_prices(values)
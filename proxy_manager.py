@@ -16,8 +16,10 @@ class RotatingProxyRequester:
         self.proxies = [p.strip() for p in (proxies or []) if p and p.strip()]
         self.proxy_cycle = cycle(self.proxies) if self.proxies else None
 
-    def get(self, url, timeout=15):
+    def get(self, url, timeout=15, headers=None):
         session = requests.Session()
+        if headers:
+            session.headers.update(headers)
         if not self.proxy_cycle:
             resp = session.get(url, timeout=timeout)
             resp.raise_for_status()
@@ -0,0 +1,65 @@
+# rate_limiter.py
+import time
+import random
+import threading
+from typing import Optional, Dict, Any, Callable
+
+
+def _host(url_or_host: Optional[str]) -> str:
+    return (url_or_host or "").split("//")[-1].split("/")[0].lower()
+
+
+class RateLimiter:
+    """
+    Politeness delay between page loads, kept out of extraction.
+
+    Requests to the same host are spaced at least `min_interval` seconds apart, plus a
+    random 0..`jitter` seconds. Time spent loading and extracting a page counts towards
+    the interval, so a slow page is not followed by an extra sleep. Slots are reserved
+    under a lock and slept outside it: engines sharing one limiter (concurrent search
+    pages, several drivers) queue up instead of bursting.
+
+    min_interval=0 and jitter=0 turn the limiter off.
+    """
+
+    def __init__(self, min_interval: float = 1.0, jitter: float = 0.5,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic):
+        self.min_interval = max(0.0, float(min_interval or 0))
+        self.jitter = max(0.0, float(jitter or 0))
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next: Dict[str, float] = {}
+        self.waited = 0.0
+
+    @classmethod
+    def from_filters(cls, filters: Optional[Dict[str, Any]]) -> "RateLimiter":
+        f = filters or {}
+        delay = f.get("politeness_delay")
+        jitter = f.get("politeness_jitter")
+        return cls(min_interval=1.0 if delay is None else delay, jitter=0.5 if jitter is None else jitter)
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_interval > 0 or self.jitter > 0
+
+    def acquire(self, url_or_host: Optional[str] = None, sleep: Optional[Callable[[float], None]] = None) -> float:
+        """Block until the next request to this host may start; returns seconds waited.
+
+        `sleep` overrides the limiter's sleep for this call — an interruptible one
+        (CancellationToken.sleep) lets a stop cut the wait short.
+        """
+        if not self.enabled:
+            return 0.0
+        host = _host(url_or_host)
+        gap = self.min_interval + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + gap
+        wait = start - now
+        if wait > 0:
+            (sleep or self._sleep)(wait)
+            with self._lock:
+                self.waited += wait
+        return max(wait, 0.0)
@@ -0,0 +1,219 @@
+# records.py
+import sys
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
+
+
+class RunContext:
+    """
+    Per-run values every product row used to carry a copy of (category node,
+    include/exclude keywords). Records share one instance and only materialize
+    the values at the export boundary.
+    """
+    __slots__ = ("category_node", "include_keywords", "exclude_keywords")
+
+    def __init__(self, category_node: str = "", include_keywords: Iterable[str] = (), exclude_keywords: Iterable[str] = ()):
+        self.category_node = category_node or ""
+        self.include_keywords = tuple(include_keywords or ())
+        self.exclude_keywords = tuple(exclude_keywords or ())
+
+    @classmethod
+    def from_filters(cls, filters: Optional[Dict[str, Any]]) -> "RunContext":
+        f = filters or {}
+        key = (f.get("category_node") or "", tuple(f.get("include_keywords") or ()), tuple(f.get("exclude_keywords") or ()))
+        ctx = _CONTEXTS.get(key)
+        if ctx is None:
+            ctx = _CONTEXTS[key] = cls(*key)
+        return ctx
+
+    def __reduce__(self):
+        # unpickled records (parser processes) share the cached instance again
+        return _context_for, (self.category_node, self.include_keywords, self.exclude_keywords)
+
+
+_CONTEXTS: Dict[Tuple, RunContext] = {}
+
+
+def _context_for(category_node, include_keywords, exclude_keywords) -> RunContext:
+    return RunContext.from_filters({"category_node": category_node, "include_keywords": include_keywords,
+                                    "exclude_keywords": exclude_keywords})
+
+EMPTY_CONTEXT = RunContext()
+
+# low-cardinality text fields: one shared string object per distinct value
+_INTERNED = ("currency", "country", "seller_type", "condition")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProductRecord:
+    """
+    Slotted product row. Replaces the 24-key dict built by the extractors:
+
+      - `image` and `seller` are aliases of `image_url` / `seller_info`, not stored twice
+      - `images` is a tuple
+      - category_node / include_keywords / exclude_keywords come from the shared RunContext
+      - country, currency, seller_type and condition are interned
+      - parent_asin / variations: the twister data of the page (variations.py),
+        {child_asin: {"dimensions", "price"}} — empty for products without variants
+
+    Mapping-style access (get, [], items, keys, in) keeps existing callers working;
+    keys set that are not fields (price_base, base_currency, ...) go to a small
+    `extra` dict. to_dict() / to_tuple() produce the export layout (same keys and
+    order as the old dict).
+    """
+
+    __slots__ = (
+        "asin", "url", "title", "description", "price", "rating", "reviews", "images", "image_url",
+        "currency", "availability", "seller_info", "bsr", "brand", "condition", "seller_type",
+        "discount", "country", "other", "parent_asin", "variations", "prime", "context", "extra",
+    )
+
+    # export layout (the historical dict order) and the attribute each column reads
+    EXPORT_FIELDS = (
+        "asin", "url", "title", "description", "seller", "price", "rating", "reviews", "images", "image_url",
+        "image", "currency", "availability", "seller_info", "bsr", "brand", "condition", "seller_type",
+        "discount", "category_node", "country", "include_keywords", "exclude_keywords", "other",
+        "parent_asin", "variations", "prime",
+    )
+    _ALIASES = {"image": "image_url", "seller": "seller_info"}
+    _CONTEXT_FIELDS = ("category_node", "include_keywords", "exclude_keywords")
+
+    def __init__(self, asin: str = "", url: str = "", title: str = "", description: str = "", price: Optional[float] = None,
+                 rating: Optional[float] = None, reviews: Optional[int] = None, images: Iterable[str] = (),
+                 image_url: str = "", currency: str = "", availability: Optional[str] = None,
+                 seller_info: Optional[str] = None, bsr: Optional[int] = None, brand: str = "", condition: str = "",
+                 seller_type: str = "", discount: bool = False, country: str = "", other: Any = None,
+                 parent_asin: str = "", variations: Optional[Dict[str, Dict[str, Any]]] = None,
+                 prime: bool = False, context: Optional[RunContext] = None):
+        self.asin = asin
+        self.url = url
+        self.title = title
+        self.description = description
+        self.price = price
+        self.rating = rating
+        self.reviews = reviews
+        self.images = tuple(images or ())
+        self.image_url = image_url
+        self.currency = _intern(currency)
+        self.availability = availability
+        self.seller_info = seller_info
+        self.bsr = bsr
+        self.brand = brand
+        self.condition = _intern(condition)
+        self.seller_type = _intern(seller_type)
+        self.discount = discount
+        self.country = _intern(country)
+        self.other = other
+        self.parent_asin = parent_asin
+        self.variations = variations or {}
+        self.prime = prime
+        self.context = context or EMPTY_CONTEXT
+        self.extra: Optional[Dict[str, Any]] = None
+
+    # ---------------- aliases ----------------
+    @property
+    def image(self) -> str:
+        return self.image_url
+
+    @property
+    def seller(self) -> str:
+        return self.seller_info or ""
+
+    # ---------------- mapping compatibility ----------------
+    def _columns(self) -> Tuple[str, ...]:
+        return self.EXPORT_FIELDS + tuple(self.extra) if self.extra else self.EXPORT_FIELDS
+
+    def __getitem__(self, key: str):
+        if key in self._CONTEXT_FIELDS:
+            value = getattr(self.context, key)
+            return list(value) if isinstance(value, tuple) else value
+        if key == "images":
+            return list(self.images)
+        if key in self._ALIASES or key in self.__slots__:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key in self._ALIASES:
+            key = self._ALIASES[key]
+        if key in self.__slots__ and key not in ("context", "extra"):
+            setattr(self, key, _intern(value) if key in _INTERNED else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key) -> bool:
+        return key in self._columns()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns())
+
+    def __len__(self) -> int:
+        return len(self._columns())
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return value
+
+    def keys(self) -> List[str]:
+        return list(self._columns())
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(k, self[k]) for k in self._columns()]
+
+    def values(self) -> List[Any]:
+        return [self[k] for k in self._columns()]
+
+    def strip(self) -> "ProductRecord":
+        """Trim whitespace of every text field in place (done once, at extraction)."""
+        for s in self.__slots__:
+            v = getattr(self, s, None)
+            if isinstance(v, str):
+                setattr(self, s, _intern(v.strip()) if s in _INTERNED else v.strip())
+        return self
+
+    # ---------------- export boundary ----------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: self[k] for k in self._columns()}
+
+    def to_tuple(self, columns: Optional[Iterable[str]] = None) -> Tuple[Any, ...]:
+        return tuple(self.get(k) for k in (columns or self._columns()))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], context: Optional[RunContext] = None) -> "ProductRecord":
+        rec = cls(context=context)
+        for k, v in data.items():
+            if k in cls._CONTEXT_FIELDS:
+                continue
+            rec[k] = v
+        if "image_url" not in data and data.get("image"):
+            rec.image_url = data["image"]
+        return rec
+
+    def __getstate__(self):
+        return tuple(getattr(self, s) for s in self.__slots__)
+
+    def __setstate__(self, state):
+        for s, v in zip(self.__slots__, state):
+            setattr(self, s, _intern(v) if s in _INTERNED else v)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ProductRecord):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    def __repr__(self) -> str:
+        return f"ProductRecord(asin={self.asin!r}, price={self.price!r}, title={self.title[:40]!r})"
+
+
+def as_dict(row: Any) -> Any:
+    """Plain dict for a ProductRecord; anything else is returned unchanged."""
+    return row.to_dict() if isinstance(row, ProductRecord) else row
@@ -0,0 +1,254 @@
+# refilter.py
+from typing import List, Dict, Any, Iterable, Optional, Sequence
+
+from records import as_dict
+
+_IN_STOCK = ("in stock", "available", "usually ships")
+_TEXT_COLUMNS = ("title", "brand", "availability", "seller_info")
+
+
+def _pandas():
+    # same lazy import as report.py; without pandas the rows are filtered in a loop
+    try:
+        import pandas as pd
+    except Exception:
+        return None
+    return pd
+
+
+def _num(value, default, cast=float):
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except Exception:
+        return default
+
+
+def thresholds(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """The filter dict as AmazonAPI._passes_advanced_filters reads it, parsed once."""
+    f = filters or {}
+    brands = f.get("brands")
+    return {
+        "min": _num(f.get("min"), -1e12),
+        "max": _num(f.get("max"), 1e12),
+        "min_rating": _num(f.get("min_rating"), 0),
+        "max_rating": _num(f.get("max_rating"), 5),
+        "min_reviews": _num(f.get("min_reviews"), 0, int),
+        "max_reviews": _num(f.get("max_reviews"), 1000000000, int),
+        "prime_only": bool(f.get("prime_only")),
+        "in_stock_only": bool(f.get("in_stock_only")),
+        "brand": (f.get("brand") or "").lower(),
+        "brands": [b.lower() for b in brands] if isinstance(brands, list) else [],
+        "include_keywords": [k.lower() for k in f.get("include_keywords") or []],
+        "exclude_keywords": [k.lower() for k in f.get("exclude_keywords") or []],
+        "bsr_min": _num(f.get("bsr_min"), 0, int),
+        "bsr_max": _num(f.get("bsr_max"), 1000000000, int),
+        "seller_type": (f.get("seller_type") or "").lower(),
+        "discount_only": bool(f.get("discount_only")),
+    }
+
+
+def row_passes(row: Dict[str, Any], t: Dict[str, Any], listing: bool = False) -> bool:
+    """Pure-python check of one stored row against thresholds(); same rules as the
+    vectorized masks (discount_only uses the stored flag, as in HTTP mode).
+
+    With `listing`, the rules of AmazonAPI._passes_listing_filters (fast-scan runs):
+    a missing rating or review count passes, brands match the title only and the
+    fields a search card does not carry are not checked.
+    """
+    p = _num(row.get("price"), None)
+    if p is not None and (p < t["min"] or p > t["max"]):
+        return False
+    if listing:
+        rating = _num(row.get("rating"), None)
+        reviews = _num(row.get("reviews"), None, int)
+    else:
+        rating = _num(row.get("rating"), 0.0) or 0.0
+        reviews = _num(row.get("reviews") or row.get("review_count"), 0, int) or 0
+    if rating is not None and (rating < t["min_rating"] or rating > t["max_rating"]):
+        return False
+    if reviews is not None and (reviews < t["min_reviews"] or reviews > t["max_reviews"]):
+        return False
+    if t["prime_only"] and not row.get("prime"):
+        return False
+    title = (row.get("title") or "").lower()
+    brand = "" if listing else (row.get("brand") or "").lower()
+    if t["brand"] and t["brand"] not in title and t["brand"] not in brand:
+        return False
+    if t["brands"] and not any(b in title or b in brand for b in t["brands"]):
+        return False
+    if any(kw not in title for kw in t["include_keywords"]):
+        return False
+    if any(kw in title for kw in t["exclude_keywords"]):
+        return False
+    if listing:
+        return True
+    if t["in_stock_only"]:
+        av = (row.get("availability") or "").lower()
+        if not any(s in av for s in _IN_STOCK):
+            return False
+    bsr = _num(row.get("bsr"), 0, int) or 0
+    if bsr and (bsr < t["bsr_min"] or bsr > t["bsr_max"]):
+        return False
+    seller_type = t["seller_type"]
+    if seller_type:
+        seller = (row.get("seller_info") or "").lower()
+        fba = "fulfillment by amazon" in seller or "fba" in seller
+        if seller_type == "amazon" and "amazon" not in seller:
+            return False
+        if seller_type == "fba" and not fba:
+            return False
+        if seller_type == "fbm" and fba:
+            return False
+    if t["discount_only"] and not row.get("discount"):
+        return False
+    return True
+
+
+class ResultFrame:
+    """
+    Rows of finished runs held column-wise, re-filtered without a re-scrape.
+
+        frame = ResultFrame(store.iter_rows(), listing=False)
+        frame.extend(store.iter_rows(rejected=True))    # rows the run's filters turned down
+        rows = frame.apply(filters)                     # the GUI filter dict
+        idx = frame.select(filters)                     # positions into frame.rows (table models)
+
+    apply() runs the checks of the filter the run used — AmazonAPI._passes_advanced_filters,
+    or _passes_listing_filters for fast-scan (`listing`) runs — as boolean masks
+    over pandas columns. Numbers are coerced and text columns lower-cased once, when
+    the frame is built, so changing a threshold only re-evaluates the masks.
+    Without pandas the same rules run row by row.
+
+    Loosening a filter can only bring back rows the run stored. Cards rejected by the
+    prefilter are stored with the fields of the card alone; listings Amazon drops for
+    a pushed-down refinement (refinements.py) are never fetched, unless the run was
+    started with `keep_rejects`, which pushes nothing but the category and visits
+    every card.
+    """
+
+    def __init__(self, rows: Iterable[Any] = (), listing: bool = False):
+        self.listing = listing
+        self.rows: List[Dict[str, Any]] = []
+        self._frame = None
+        self._contains = {}     # (column, text) -> mask; substring scans dominate, thresholds are cheap
+        self.extend(rows)
+
+    def extend(self, rows: Iterable[Any]):
+        self.rows.extend(as_dict(r) for r in rows)
+        self._frame = None
+        self._contains = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _columns(self):
+        pd = _pandas()
+        if pd is None:
+            return None
+        if self._frame is None:
+            src = pd.DataFrame.from_records(self.rows)
+            n = len(src)
+
+            def col(name):
+                return src[name] if name in src.columns else pd.Series([None] * n, dtype=object)
+
+            def number(name):
+                return pd.to_numeric(col(name), errors="coerce")
+
+            reviews = number("reviews")
+            frame = pd.DataFrame({
+                "price": number("price"),
+                # NaN = missing; the full-page filter counts it as 0, the card filter lets it pass
+                "rating": number("rating"),
+                "reviews_card": reviews,
+                # `reviews or review_count`: a zero count falls through as well
+                "reviews": reviews.where(reviews.fillna(0) != 0, number("review_count")).fillna(0),
+                "bsr": number("bsr").fillna(0),
+                "prime": col("prime").fillna(False).astype(bool),
+                "discount": col("discount").fillna(False).astype(bool),
+            })
+            for name in _TEXT_COLUMNS:
+                frame[name] = col(name).fillna("").astype(str).str.lower()
+            self._frame = frame
+        return self._frame
+
+    def mask(self, filters: Dict[str, Any]):
+        """Boolean Series over self.rows (pandas), or None without pandas."""
+        c = self._columns()
+        if c is None:
+            return None
+        t = thresholds(filters)
+        price = c["price"]
+
+        def has(column, text):
+            key = (column, text)
+            hit = self._contains.get(key)
+            if hit is None:
+                hit = self._contains[key] = c[column].str.contains(text, regex=False)
+            return hit
+
+        m = price.isna() | price.between(t["min"], t["max"])
+        rating = c["rating"]
+        if self.listing:
+            reviews = c["reviews_card"]
+            m &= rating.isna() | rating.between(t["min_rating"], t["max_rating"])
+            m &= reviews.isna() | reviews.between(t["min_reviews"], t["max_reviews"])
+        else:
+            m &= rating.fillna(0.0).between(t["min_rating"], t["max_rating"])
+            m &= c["reviews"].between(t["min_reviews"], t["max_reviews"])
+        if t["prime_only"]:
+            m &= c["prime"]
+
+        def brand_match(b):
+            return has("title", b) if self.listing else has("title", b) | has("brand", b)
+
+        if t["brand"]:
+            m &= brand_match(t["brand"])
+        if t["brands"]:
+            any_brand = brand_match(t["brands"][0])
+            for b in t["brands"][1:]:
+                any_brand = any_brand | brand_match(b)
+            m &= any_brand
+        for kw in t["include_keywords"]:
+            m &= has("title", kw)
+        for kw in t["exclude_keywords"]:
+            m &= ~has("title", kw)
+        if self.listing:
+            return m
+        if t["in_stock_only"]:
+            m &= has("availability", _IN_STOCK[0]) | has("availability", _IN_STOCK[1]) | has("availability", _IN_STOCK[2])
+        bsr = c["bsr"]
+        m &= (bsr == 0) | bsr.between(t["bsr_min"], t["bsr_max"])
+        seller_type = t["seller_type"]
+        if seller_type in ("amazon", "fba", "fbm"):
+            fba = has("seller_info", "fulfillment by amazon") | has("seller_info", "fba")
+            if seller_type == "amazon":
+                m &= has("seller_info", "amazon")
+            elif seller_type == "fba":
+                m &= fba
+            else:
+                m &= ~fba
+        if t["discount_only"]:
+            m &= c["discount"]
+        return m
+
+    def select(self, filters: Dict[str, Any], limit: Optional[int] = None) -> Sequence[int]:
+        """Positions in self.rows of the rows passing `filters` (at most `limit`)."""
+        m = self.mask(filters)
+        if m is None:
+            t = thresholds(filters)
+            out = []
+            for i, row in enumerate(self.rows):
+                if row_passes(row, t, self.listing):
+                    out.append(i)
+                    if limit is not None and len(out) >= limit:
+                        break
+            return out
+        idx = m.to_numpy().nonzero()[0]
+        return idx[:limit] if limit is not None else idx
+
+    def apply(self, filters: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rows passing `filters`, in stored order (at most `limit`)."""
+        return [self.rows[i] for i in self.select(filters, limit)]
@@ -0,0 +1,184 @@
+# refinements.py
+from typing import List, Optional, Dict, Any
+from urllib.parse import quote
+
+from price_parsing import marketplace_of
+
+# Refinement ids per marketplace (amazon.<key>). A filter with no id for the current
+# marketplace is not pushed and stays a client-side check.
+REFINEMENTS: Dict[str, Dict[str, Any]] = {
+    "com": {
+        "prime": "p_85:2470955011",
+        "rating": {4: "p_72:2661618011", 3: "p_72:2661617011", 2: "p_72:2661616011", 1: "p_72:2661615011"},
+        "condition": {"new": "p_n_condition-type:6461716011"},
+        "amazon_seller": "p_6:ATVPDKIKX0DER",
+    },
+    "co.uk": {"amazon_seller": "p_6:A3P5ROKL5A1OLE"},
+    "de": {"amazon_seller": "p_6:A3JWKAKR8XB7XF"},
+    "fr": {"amazon_seller": "p_6:A1X6FK5RDHNB96"},
+    "it": {"amazon_seller": "p_6:A11IL2PNWYJU7H"},
+    "es": {"amazon_seller": "p_6:A1AT7YVPFBWXBL"},
+}
+
+# search domains that take the price range as a p_36 refinement in cents; every other
+# domain (.com, .ca, .com.au, .co.uk and unknown ones) accepts low-price / high-price
+# in whole currency units
+_PRICE_RH_DOMAINS = (".de", ".fr", ".it", ".es", ".nl", ".se", ".pl")
+
+# client-side filters that a search card can decide (rating, review count, Prime badge,
+# title) — checked before a product page is opened
+CARD_CHECKABLE = ("min_rating", "max_rating", "min_reviews", "max_reviews", "prime_only",
+                  "include_keywords", "exclude_keywords")
+
+# GUI defaults that mean "no limit"
+_NO_LIMIT = {"max_rating": 5, "max_reviews": 1_000_000_000, "bsr_max": 9_999_999}
+
+
+def _num(value) -> Optional[float]:
+    if value is None or str(value).strip() == "":
+        return None
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+class Pushdown:
+    """
+    Result of compiling the filters for one marketplace.
+
+       rh           refinements joined into the single rh= parameter
+       params       other query parameters (low-price, high-price, i)
+       pushed       filters Amazon applies server-side
+       client_side  filters still checked by _passes_advanced_filters — either not
+                    expressible as a refinement here, or only narrowed by one
+                    (a "4 stars & up" bucket for min_rating 4.3, brand name matching)
+       unapplied    filters neither pushed nor checked on this marketplace
+    """
+    __slots__ = ("rh", "params", "pushed", "client_side", "unapplied")
+
+    def __init__(self):
+        self.rh: List[str] = []
+        self.params: List[str] = []
+        self.pushed: List[str] = []
+        self.client_side: List[str] = []
+        self.unapplied: List[str] = []
+
+    def query(self) -> str:
+        parts = list(self.params)
+        if self.rh:
+            parts.append("rh=" + ",".join(self.rh))
+        return "".join("&" + p for p in parts)
+
+    def describe(self) -> str:
+        text = (f"pushed to Amazon: {', '.join(self.pushed) or 'none'}; "
+                f"client-side: {', '.join(self.client_side) or 'none'}")
+        if self.unapplied:
+            text += f"; not applied on this marketplace: {', '.join(self.unapplied)}"
+        return text
+
+
+def _price(p: Pushdown, host: str, filters: Dict[str, Any]):
+    min_val, max_val = _num(filters.get("min")), _num(filters.get("max"))
+    if min_val is None and max_val is None:
+        return
+    if host.endswith(_PRICE_RH_DOMAINS):
+        min_cents = int(min_val * 100) if min_val is not None else 0
+        max_cents = int(max_val * 100) if max_val is not None else 0
+        p.rh.append(f"p_36:{min_cents}-{max_cents}")
+    else:
+        if min_val is not None:
+            p.params.append(f"low-price={int(min_val)}")
+        if max_val is not None:
+            p.params.append(f"high-price={int(max_val)}")
+    p.pushed.append("price")
+    # search ranks by list price; the product page price is the one reported
+    p.client_side.append("price")
+
+
+def compile_filters(filters: Optional[Dict[str, Any]], base_url: str) -> Pushdown:
+    """Translate GUI filters into search URL refinements for the marketplace of `base_url`."""
+    f = filters or {}
+    host = (base_url or "").split("//")[-1].split("/")[0].lower()
+    key = marketplace_of(base_url)
+    # marketplace_of falls back to "com" for domains it has no number format for;
+    # refinement ids are never borrowed from another marketplace
+    ids = REFINEMENTS.get(key, {}) if host.endswith("." + key) else {}
+    p = Pushdown()
+
+    _price(p, host, f)
+
+    if f.get("category_node"):
+        p.params.append(f"i={quote(str(f.get('category_node')), safe='')}")
+        p.pushed.append("category_node")
+
+    if f.get("prime_only"):
+        if ids.get("prime"):
+            p.rh.append(ids["prime"])
+            p.pushed.append("prime_only")
+        p.client_side.append("prime_only")
+
+    min_rating = _num(f.get("min_rating"))
+    if min_rating and min_rating > 0:
+        bucket = ids.get("rating", {}).get(min(int(min_rating), 4))
+        if bucket:
+            p.rh.append(bucket)
+            p.pushed.append("min_rating")
+        # buckets are whole stars over rounded averages: the exact bound is checked on the card
+        p.client_side.append("min_rating")
+
+    condition = (f.get("condition") or "").lower()
+    if condition and condition != "any":
+        rid = ids.get("condition", {}).get(condition)
+        if rid:
+            p.rh.append(rid)
+            p.pushed.append("condition")
+        else:
+            # product pages rarely state the condition of the buy box offer
+            p.unapplied.append("condition")
+
+    # the client check is a substring match on title / byline, the p_89 facet an exact
+    # brand name: only a single brand given in the Brand field is pushed. The Brands
+    # field is split on spaces ("Hamilton Beach" -> two words), so it stays client-side
+    brand = (f.get("brand") or "").strip()
+    if brand and not [b for b in (f.get("brands") or []) if b]:
+        p.rh.append("p_89:" + quote(brand, safe=""))
+        p.pushed.append("brand")
+        # the facet and the title/byline match can still disagree
+        p.client_side.append("brand")
+    elif brand or f.get("brands"):
+        p.client_side.append("brand")
+
+    seller_type = (f.get("seller_type") or "").lower()
+    if seller_type and seller_type != "any":
+        if seller_type == "amazon" and ids.get("amazon_seller"):
+            p.rh.append(ids["amazon_seller"])
+            p.pushed.append("seller_type")
+        p.client_side.append("seller_type")
+
+    # no refinement exists for these
+    for name in ("max_rating", "min_reviews", "max_reviews", "bsr_min", "bsr_max"):
+        value = _num(f.get(name))
+        if value is not None and value not in (0, _NO_LIMIT.get(name)):
+            p.client_side.append(name)
+    for name in ("in_stock_only", "discount_only", "include_keywords", "exclude_keywords"):
+        if f.get(name):
+            p.client_side.append(name)
+    if f.get("keep_rejects"):
+        p = _client_side_only(p)
+    return p
+
+
+def _client_side_only(p: Pushdown) -> Pushdown:
+    """Keep-rejects runs: only the category is pushed, so no listing is dropped by Amazon
+    before the client-side check has stored it as a rejected row (refilter.py)."""
+    q = Pushdown()
+    q.params = [x for x in p.params if x.startswith("i=")]
+    q.pushed = ["category_node"] if q.params else []
+    q.unapplied = list(p.unapplied)
+    for name in p.pushed + p.client_side:
+        if name == "category_node" or name in q.client_side or name in q.unapplied:
+            continue
+        # no client-side check exists for the condition of an offer
+        (q.unapplied if name == "condition" else q.client_side).append(name)
+    return q
@@ -2,16 +2,26 @@
 import os
 import csv
 import json
-from typing import List, Dict, Any
+import hashlib
+import itertools
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+
+def _pandas():
+    # imported on first xlsx/html export only — pandas is the slowest import of the app
+    try:
+        import pandas as pd
+    except Exception:
+        raise RuntimeError("pandas required for Excel/HTML export")
+    return pd
+
+
+SNAPSHOT_DIR = ".snapshots"
 
-try:
-    import pandas as pd
-    _HAS_PANDAS = True
-except Exception:
-    _HAS_PANDAS = False
 
 class Report:
-    def __init__(self, file_name: str, directory: str, currency, filters: Dict[str, Any], base_url: str, data: List[Dict[str, Any]], export_format: str = "csv"):
+    def __init__(self, file_name: str, directory: str, currency, filters: Dict[str, Any], base_url: str, data: List[Dict[str, Any]],
+                 export_format: str = "csv", delta_key: Optional[str] = None):
         self.file_name = file_name
         self.directory = directory
         self.currency = currency
@@ -19,8 +29,15 @@ class Report:
         self.base_url = base_url
         self.data = data or []
         self.export_format = (export_format or "csv").lower()
+        self.delta = None
         os.makedirs(self.directory, exist_ok=True)
-        self._export()
+        if delta_key:
+            # delta mode: only rows that differ from the previous snapshot of `delta_key`
+            self.delta = DeltaReport(os.path.join(self.directory, SNAPSHOT_DIR, f"{delta_key}.jsonl"))
+            self.delta.write(self.data, file_name=f"{self.file_name}_delta", directory=self.directory,
+                             export_format=self.export_format, currency=currency, filters=filters, base_url=base_url)
+        else:
+            self._export()
 
     def _export(self):
         if self.export_format == "csv":
@@ -51,8 +68,7 @@ class Report:
                 writer.writerow([row.get(h, "") for h in headers])
 
     def _to_excel(self):
-        if not _HAS_PANDAS:
-            raise RuntimeError("pandas required for Excel export")
+        pd = _pandas()
         path = os.path.join(self.directory, f"{self.file_name}.xlsx")
         df = pd.DataFrame(self.data)
         df.to_excel(path, index=False)
@@ -69,8 +85,203 @@ class Report:
                 f.write(str(item) + "\n")
 
     def _to_html(self):
-        if not _HAS_PANDAS:
-            raise RuntimeError("pandas required for HTML export")
+        pd = _pandas()
         path = os.path.join(self.directory, f"{self.file_name}.html")
         df = pd.DataFrame(self.data)
         df.to_html(path, index=False)
+
+
+class StreamingReport:
+    """
+    Incremental report writer: rows are written as they arrive instead of being
+    collected and exported at the end of the run.
+
+    csv  -> header from the first row (or `columns`), one line per row
+    json -> a JSON array written element by element
+    txt  -> one str(row) per line
+    Other formats (xlsx, html) need the full table; rows are buffered and exported
+    through Report on close().
+    """
+
+    STREAMABLE = ("csv", "json", "txt")
+
+    def __init__(self, file_name: str, directory: str, currency=None, filters: Dict[str, Any] = None,
+                 base_url: str = None, export_format: str = "csv", columns: List[str] = None):
+        self.file_name = file_name
+        self.directory = directory
+        self.currency = currency
+        self.filters = filters or {}
+        self.base_url = base_url
+        self.export_format = (export_format or "csv").lower()
+        self.columns = list(columns) if columns else None
+        self.count = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._fh = None
+        self._writer = None
+        os.makedirs(self.directory, exist_ok=True)
+        if self.export_format in self.STREAMABLE:
+            self.path = os.path.join(self.directory, f"{self.file_name}.{self.export_format}")
+            self._fh = open(self.path, "w", encoding="utf-8", newline="")
+            if self.export_format == "json":
+                self._fh.write("[")
+        else:
+            ext = "xlsx" if self.export_format in ("xls", "xlsx") else self.export_format
+            self.path = os.path.join(self.directory, f"{self.file_name}.{ext}")
+
+    def write(self, row: Dict[str, Any]):
+        if self._fh is None:
+            self._buffer.append(row)
+            self.count += 1
+            return
+        if self.export_format == "csv":
+            if self._writer is None:
+                if self.columns is None:
+                    self.columns = list(row.keys())
+                self._writer = csv.writer(self._fh)
+                self._writer.writerow(self.columns)
+            self._writer.writerow([row.get(h, "") for h in self.columns])
+        elif self.export_format == "json":
+            self._fh.write(("," if self.count else "") + "\n  " + json.dumps(row, ensure_ascii=False, default=str))
+        else:
+            self._fh.write(str(row) + "\n")
+        self.count += 1
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not None:
+            if self.export_format == "json":
+                self._fh.write("\n]\n" if self.count else "]\n")
+            self._fh.close()
+            self._fh = None
+        elif self._buffer is not None:
+            Report(file_name=self.file_name, directory=self.directory, currency=self.currency,
+                   filters=self.filters, base_url=self.base_url, data=self._buffer,
+                   export_format=self.export_format)
+            self._buffer = None
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def _row_key(row: Dict[str, Any]) -> str:
+    return str(row.get("asin") or row.get("url") or "")
+
+
+class DeltaReport:
+    """
+    Compares a run against the previous snapshot of the same report and writes only
+    added / removed / changed rows, each with `change` and `changed_fields` columns.
+
+    The snapshot is a JSONL sidecar sorted by ASIN; every line holds the row, its
+    content hash and a short hash per field:
+
+        {"k": "B0..", "h": "<row hash>", "f": {"price": "<hash>", ...}, "row": {...}}
+
+    The diff is a merge-join of the sorted current keys against the snapshot read line
+    by line, so the previous snapshot is never loaded into memory; the new snapshot is
+    written during the same pass and swapped in at the end. A run without rows (blocked,
+    failed) is not diffed: the snapshot is kept, so the next run is not all "added".
+    """
+
+    def __init__(self, snapshot_path: str):
+        self.snapshot_path = snapshot_path
+        self.added = 0
+        self.removed = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.path = None
+        self.snapshot_kept = False
+
+    def _previous(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if not os.path.exists(self.snapshot_path):
+            return
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                yield entry.get("k", ""), entry
+
+    def write(self, rows: Iterable[Dict[str, Any]], file_name: str, directory: str, export_format: str = "csv",
+              currency=None, filters: Dict[str, Any] = None, base_url: str = None,
+              presorted: bool = False) -> "DeltaReport":
+        """`rows` is a list, or with presorted=True any iterable already sorted by ASIN with
+        one row per ASIN (ResultStore.iter_latest()), which is consumed as a stream."""
+        if presorted:
+            current = ((_row_key(row), row) for row in rows)
+        else:
+            # newest row wins for repeated ASINs; only keys + indexes are sorted
+            latest: Dict[str, int] = {}
+            for i, row in enumerate(rows):
+                k = _row_key(row)
+                if k:
+                    latest[k] = i
+            current = ((k, rows[i]) for k, i in sorted(latest.items()))
+        first = next(current, None)
+        prev_iter = self._previous()
+        prev = next(prev_iter, None)
+
+        # removed rows come from the snapshot: its fields belong in the header as well
+        columns = ["change", "changed_fields"]
+        for row in (first[1] if first else {}, (prev[1].get("row") or {}) if prev else {}):
+            columns.extend(k for k in row if k not in columns)
+        out = StreamingReport(file_name=file_name, directory=directory, currency=currency, filters=filters,
+                              base_url=base_url, export_format=export_format, columns=columns)
+        if first is None:
+            out.close()
+            self.path = out.path
+            self.snapshot_kept = True
+            return self
+        current = itertools.chain([first], current)
+
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        tmp = self.snapshot_path + ".tmp"
+
+        def emit(change, fields, row):
+            out.write({"change": change, "changed_fields": " ".join(fields), **row})
+
+        with open(tmp, "w", encoding="utf-8") as snap:
+            for key, row in current:
+                if not key:
+                    continue
+                while prev is not None and prev[0] < key:
+                    self.removed += 1
+                    emit("removed", [], prev[1].get("row") or {"asin": prev[0]})
+                    prev = next(prev_iter, None)
+
+                fields = {k: _digest(v) for k, v in row.items()}
+                row_hash = _digest(sorted(fields.items()))
+                if prev is not None and prev[0] == key:
+                    old = prev[1]
+                    if old.get("h") == row_hash:
+                        self.unchanged += 1
+                    else:
+                        old_fields = old.get("f") or {}
+                        diff = sorted(k for k in set(fields) | set(old_fields) if fields.get(k) != old_fields.get(k))
+                        self.changed += 1
+                        emit("changed", diff, row)
+                    prev = next(prev_iter, None)
+                else:
+                    self.added += 1
+                    emit("added", [], row)
+
+                snap.write(json.dumps({"k": key, "h": row_hash, "f": fields, "row": row},
+                                      ensure_ascii=False, default=str) + "\n")
+
+            while prev is not None:
+                self.removed += 1
+                emit("removed", [], prev[1].get("row") or {"asin": prev[0]})
+                prev = next(prev_iter, None)
+
+        out.close()
+        os.replace(tmp, self.snapshot_path)
+        self.path = out.path
+        return self
+
+    def summary(self) -> Dict[str, int]:
+        return {"added": self.added, "removed": self.removed, "changed": self.changed, "unchanged": self.unchanged}
@@ -0,0 +1,145 @@
+# result_model.py
+import os
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Sequence
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QPixmap
+
+# (header, row key) in table order
+COLUMNS = [
+    ("Title", "title"), ("ASIN", "asin"), ("Price", "price"), ("Rating", "rating"),
+    ("Reviews", "reviews"), ("Prime", "prime"), ("Stock", "stock"), ("URL", "url"),
+    ("Image URL", "image_url"), ("Brand", "brand"), ("Condition", "condition"),
+    ("Seller Type", "seller_type"), ("Discount", "discount"), ("Category Node", "category_node"),
+    ("BSR", "bsr"), ("Currency", "currency"), ("Country", "country"),
+    ("Include Keywords", "include_keywords"), ("Exclude Keywords", "exclude_keywords"),
+    ("Availability", "availability"), ("Description", "description"), ("Other", "other"),
+    ("Price Base", "price_base"), ("Base Currency", "base_currency"),
+]
+_IMAGE_COLUMN = 8
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+class ResultTableModel(QAbstractTableModel):
+    """
+    Table model over run results; the view only asks for the rows on screen.
+
+    Sources:
+      show_store(store)        rows of a ResultStore, read in pages of PAGE rows
+                               (a few pages cached), so a finished run is never loaded whole
+      attach_store(store)      same, for a running run: append() announces each row and
+                               keeps the last TAIL rows until the worker has committed them
+      show_rows(rows, index)   an in-memory list (catalog hits, re-filter frame), optionally
+                               through `index` — positions into `rows`, e.g. a filter mask
+                               result — so a re-filter swaps one array instead of the rows
+    """
+
+    PAGE = 200
+    MAX_PAGES = 16
+    TAIL = 200          # > ResultStore commit batch: older live rows are readable from the store
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._store = None
+        self._count = 0
+        self._pages: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._tail: Dict[int, Dict[str, Any]] = {}
+        self._rows: List[Dict[str, Any]] = []
+        self._index: Optional[Sequence[int]] = None
+
+    # ---------------- sources ----------------
+    def clear(self):
+        self.show_rows([])
+
+    def show_rows(self, rows: List[Dict[str, Any]], index: Optional[Sequence[int]] = None):
+        self.beginResetModel()
+        self._store = None
+        self._pages.clear()
+        self._tail = {}
+        self._rows = rows
+        self._index = index
+        self._count = len(index) if index is not None else len(rows)
+        self.endResetModel()
+
+    def show_store(self, store, count: Optional[int] = None):
+        self.beginResetModel()
+        self._store = store
+        self._pages.clear()
+        self._tail = {}
+        self._rows = []
+        self._index = None
+        self._count = len(store) if count is None else count
+        self.endResetModel()
+
+    def attach_store(self, store):
+        # rows appear as the worker announces them (restored rows of a resumed run included)
+        self.show_store(store, count=0)
+
+    def append(self, row: Dict[str, Any]):
+        """A live row from the worker (store-backed: it is already in, or about to reach, the store)."""
+        n = self._count
+        self.beginInsertRows(QModelIndex(), n, n)
+        if self._store is not None:
+            self._tail[n] = row
+            self._tail.pop(n - self.TAIL, None)
+            # the last page grows: drop it so it is re-read once committed
+            self._pages.pop(n // self.PAGE, None)
+        else:
+            self._rows.append(row)
+        self._count += 1
+        self.endInsertRows()
+
+    # ---------------- rows ----------------
+    def row(self, i: int) -> Dict[str, Any]:
+        if self._store is None:
+            return self._rows[self._index[i]] if self._index is not None else self._rows[i]
+        live = self._tail.get(i)
+        if live is not None:
+            return live
+        page, pos = divmod(i, self.PAGE)
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._store.rows(offset=page * self.PAGE, limit=self.PAGE)
+            if len(rows) == self.PAGE:
+                # only full pages are cached; a short one may still be filling up
+                self._pages[page] = rows
+                while len(self._pages) > self.MAX_PAGES:
+                    self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return rows[pos] if pos < len(rows) else {}
+
+    # ---------------- QAbstractTableModel ----------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(COLUMNS):
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._count:
+            return None
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole, Qt.DecorationRole):
+            return None
+        value = self.row(index.row()).get(COLUMNS[index.column()][1])
+        if role == Qt.DecorationRole:
+            # downloaded images show as thumbnails
+            if index.column() == _IMAGE_COLUMN and isinstance(value, str) and value and os.path.isfile(value):
+                pix = QPixmap(value)
+                if not pix.isNull():
+                    return pix.scaled(80, 80)
+            return None
+        return _text(value)
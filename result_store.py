@@ -0,0 +1,121 @@
+# result_store.py
+import os
+import json
+import sqlite3
+import threading
+from typing import List, Dict, Any, Iterator
+
+from records import as_dict
+
+
+class ResultStore:
+    """
+    On-disk row store for one run (SQLite, one JSON document per row).
+
+    The worker appends rows as they are accepted and the GUI, reports and image
+    download read them back in pages, so no stage has to hold the whole run in a list.
+
+        store = ResultStore.for_run(out_folder, name)
+        store.add(row)
+        for row in store.iter_rows(): ...
+        store.rows(offset=0, limit=200)          # one page for the table
+        store.iter_latest()                      # newest row per ASIN, sorted (delta reports)
+        store.add(row, rejected=True)            # extracted but filtered out; kept for re-filtering
+        store.iter_rows(rejected=True)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows (id INTEGER PRIMARY KEY AUTOINCREMENT, asin TEXT, data TEXT NOT NULL)"
+        )
+        # (asin, id) serves both ASIN lookups and the newest-row-per-ASIN scan of iter_latest
+        self._conn.execute("DROP INDEX IF EXISTS rows_asin")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS rows_asin_id ON rows(asin, id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rejected (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)")
+        self._conn.commit()
+        self._pending = 0
+
+    @classmethod
+    def for_run(cls, directory: str, name: str) -> "ResultStore":
+        return cls(os.path.join(directory, ".results", f"{name}.sqlite"))
+
+    # ---------------- writing ----------------
+    def add(self, row: Any, commit_every: int = 50, rejected: bool = False):
+        data = as_dict(row)
+        line = json.dumps(data, ensure_ascii=False, default=str)
+        with self._lock:
+            if rejected:
+                self._conn.execute("INSERT INTO rejected (data) VALUES (?)", (line,))
+            else:
+                self._conn.execute("INSERT INTO rows (asin, data) VALUES (?, ?)", (data.get("asin") or "", line))
+            self._pending += 1
+            if self._pending >= commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    # ---------------- reading ----------------
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def _iter(self, sql: str, params=(), batch: int = 500) -> Iterator[Dict[str, Any]]:
+        # keyset paging: the lock is only held per batch, so writers are not blocked while reading
+        self.flush()
+        last = 0
+        while True:
+            with self._lock:
+                chunk = self._conn.execute(sql, (*params, last, batch)).fetchall()
+            if not chunk:
+                return
+            for rowid, data in chunk:
+                yield json.loads(data)
+            last = chunk[-1][0]
+            if len(chunk) < batch:
+                return
+
+    def iter_rows(self, rejected: bool = False) -> Iterator[Dict[str, Any]]:
+        """Every row in insertion order (with `rejected`, the rows the filters turned down)."""
+        table = "rejected" if rejected else "rows"
+        return self._iter(f"SELECT id, data FROM {table} WHERE id > ? ORDER BY id LIMIT ?")
+
+    def rows(self, offset: int = 0, limit: int = 200) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._lock:
+            cur = self._conn.execute("SELECT data FROM rows ORDER BY id LIMIT ? OFFSET ?", (limit, offset))
+            return [json.loads(d) for (d,) in cur.fetchall()]
+
+    def iter_latest(self) -> Iterator[Dict[str, Any]]:
+        """Newest row per ASIN, ordered by ASIN (rows without an ASIN are skipped)."""
+        self.flush()
+        last = ""
+        while True:
+            # keyset paging over the (asin, id) index: each chunk reads only its own 500 ASINs
+            with self._lock:
+                chunk = self._conn.execute(
+                    "SELECT r.asin, r.data FROM (SELECT asin, MAX(id) AS id FROM rows WHERE asin > ? "
+                    "GROUP BY asin ORDER BY asin LIMIT 500) latest JOIN rows r ON r.id = latest.id ORDER BY r.asin",
+                    (last,)
+                ).fetchall()
+            if not chunk:
+                return
+            for asin, d in chunk:
+                yield json.loads(d)
+            last = chunk[-1][0]
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.commit()
+            finally:
+                self._conn.close()
@@ -0,0 +1,112 @@
+# search_crawler.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Tuple
+
+
+class SearchCrawler:
+    """
+    Fetches search result pages concurrently and deduplicates ASINs across pages.
+
+    Every page is independently addressable (build_search_url(page=n)), so up to
+    `fanout` pages are fetched ahead of the one being consumed. Results are still
+    yielded in page order, which keeps the journal and report order stable.
+
+    Sponsored products repeat on many pages; an ASIN is yielded only for the first
+    page it appears on. When a page loads with listings that are all repeats the
+    crawl stops early: Amazon keeps serving the last page past the real end of
+    results. A page that fails or comes back empty (load error, captcha, block) is
+    counted in `errors` and the crawl goes on with the next page.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int], List[Dict[str, Any]]],
+        fanout: int = 3,
+        seen: Optional[Iterable[str]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ):
+        self.fetch_page = fetch_page
+        self.fanout = max(1, int(fanout or 1))
+        self.seen = set(seen or ())
+        self.should_stop = should_stop or (lambda: False)
+        self.duplicates = 0
+        self.errors = 0
+        self.stopped_early_at = None
+        self._lock = threading.Lock()
+
+    def dedupe(self, listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        fresh = []
+        with self._lock:
+            for p in listings or []:
+                asin = p.get("asin")
+                if not asin:
+                    continue
+                if asin in self.seen:
+                    self.duplicates += 1
+                    continue
+                self.seen.add(asin)
+                fresh.append(p)
+        return fresh
+
+    def _take(self, page: int, listings: Optional[List[Dict[str, Any]]]) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """(new_listings or None for a failed page, whether the crawl should stop here)."""
+        if not any(p.get("asin") for p in listings or []):
+            self.errors += 1
+            return None, False
+        fresh = self.dedupe(listings)
+        if not fresh:
+            self.stopped_early_at = page
+            return fresh, True
+        return fresh, False
+
+    def crawl(self, pages: Iterable[int]) -> Iterator[Tuple[int, Optional[List[Dict[str, Any]]]]]:
+        """Yield (page, new_listings); new_listings is None when the page fetch raised
+        or the page had no listings."""
+        pages = list(pages)
+        if not pages:
+            return
+        if self.fanout == 1:
+            for page in pages:
+                if self.should_stop():
+                    return
+                try:
+                    listings = self.fetch_page(page)
+                except Exception:
+                    listings = None
+                fresh, stop = self._take(page, listings)
+                yield page, fresh
+                if stop:
+                    return
+            return
+
+        with ThreadPoolExecutor(max_workers=self.fanout, thread_name_prefix="search") as pool:
+            futures = {}
+            next_idx = 0
+
+            def top_up():
+                nonlocal next_idx
+                while next_idx < len(pages) and len(futures) < self.fanout and not self.should_stop():
+                    page = pages[next_idx]
+                    futures[page] = pool.submit(self.fetch_page, page)
+                    next_idx += 1
+
+            top_up()
+            try:
+                for page in pages:
+                    if self.should_stop() or page not in futures:
+                        return
+                    fut = futures.pop(page)
+                    try:
+                        listings = fut.result()
+                    except Exception:
+                        listings = None
+                    fresh, stop = self._take(page, listings)
+                    if stop:
+                        yield page, fresh
+                        return
+                    top_up()
+                    yield page, fresh
+            finally:
+                for fut in futures.values():
+                    fut.cancel()
@@ -0,0 +1,227 @@
+# selector_registry.py
+#
+# Declarative page selectors per field (and marketplace), tried in the order that
+# has worked best so far.
+#
+# CLI:  python selector_registry.py [reports/selector_stats.json] [--min-tries 50]
+#       prints hit rates and the selectors that have stopped matching
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from typing import List, Optional, Dict, Any, Callable
+
+SELECTOR_STATS_FILE = "selector_stats.json"
+
+_STREAK_DEMOTE = 3
+
+
+class Selector:
+    """
+    One way to locate a field.
+
+       by      locator strategy, same values as selenium's By ("id", "css selector", "xpath")
+       attr    what to read: "text" (element text) or an attribute / property name
+       every   try every match instead of only the first
+       tier    candidates are only reordered within a tier, so a tier holds true
+               alternatives for the same value (two layouts of one container). Candidates
+               whose order is a precedence (deal price before list price) and broad
+               fallbacks that could match the wrong element sit in separate, later tiers
+    """
+    __slots__ = ("name", "by", "value", "attr", "every", "tier")
+
+    def __init__(self, name: str, by: str, value: str, attr: str = "text", every: bool = False, tier: int = 0):
+        self.name = name
+        self.by = by
+        self.value = value
+        self.attr = attr
+        self.every = every
+        self.tier = tier
+
+    def __repr__(self) -> str:
+        return f"Selector({self.name!r})"
+
+
+# field -> candidates in their declared (fallback) order
+SELECTORS: Dict[str, List[Selector]] = {
+    # precedence: buy box (either layout), deal price, our price, then broad fallbacks —
+    # a page showing a deal also carries the list price in priceblock_ourprice
+    "price": [
+        Selector("core_price_whole", "xpath", '//*[@id="corePrice_feature_div"]//span[contains(@class,"a-price-whole")]',
+                 attr="innerText", every=True),
+        Selector("core_price_desktop_whole", "xpath",
+                 '//*[@id="corePriceDisplay_desktop_feature_div"]//span[contains(@class,"a-price-whole")]',
+                 attr="innerText", every=True),
+        Selector("priceblock_deal", "id", "priceblock_dealprice", attr="innerText", tier=1),
+        Selector("priceblock_our", "id", "priceblock_ourprice", attr="innerText", tier=2),
+        Selector("any_offscreen_currency", "xpath",
+                 "//span[contains(@class,'a-offscreen') and (contains(text(),'$') or contains(text(),'€') "
+                 "or contains(text(),'£'))]", attr="innerText", every=True, tier=3),
+        Selector("any_price_offscreen", "css selector", "span.a-price span.a-offscreen", attr="innerText", tier=4),
+    ],
+    "currency": [
+        Selector("core_price_symbol", "css selector", "#corePrice_feature_div .a-price-symbol", attr="textContent"),
+        Selector("core_price_desktop_symbol", "css selector", "#corePriceDisplay_desktop_feature_div .a-price-symbol",
+                 attr="textContent"),
+        Selector("core_price_offscreen", "css selector", "#corePrice_feature_div .a-offscreen", attr="textContent", tier=1),
+        Selector("any_price_offscreen", "css selector", "span.a-price span.a-offscreen", attr="textContent", tier=2),
+    ],
+    "rating": [
+        Selector("acr_popover", "id", "acrPopover", attr="title"),
+        Selector("any_icon_alt", "css selector", "span.a-icon-alt", tier=1),
+    ],
+    # merchant-info carries "Ships from and sold by ..." (seller_type is derived from it);
+    # the seller profile link is only the seller name
+    "seller_info": [
+        Selector("merchant_info", "id", "merchant-info"),
+        Selector("seller_profile", "id", "sellerProfileTriggerId", tier=1),
+    ],
+    "availability": [
+        Selector("availability", "id", "availability"),
+        Selector("availability_state", "css selector", "#availability .a-color-state", tier=1),
+    ],
+}
+
+# marketplace key (price_parsing.marketplace_of) -> field -> extra candidates, tried
+# alongside the shared ones
+MARKETPLACE_SELECTORS: Dict[str, Dict[str, List[Selector]]] = {}
+
+
+class SelectorRegistry:
+    """
+    Candidate selectors per (marketplace, field) with hit statistics.
+
+    first() walks the candidates and returns the first parsed value; every candidate
+    tried is recorded as a hit or a miss. Within a tier, candidates are ordered by
+    hit rate (Laplace-smoothed, declared order breaks ties) after demoting any that
+    missed several times in a row, so the layout a marketplace currently serves is
+    tried first and misses stop costing a round trip per field. Stats are kept per
+    marketplace, persisted as JSON with save() and loaded on construction. dead()
+    lists selectors that keep missing.
+
+    Thread-safe; one instance is shared by the engines of a run.
+    """
+
+    def __init__(self, path: Optional[str] = None, selectors: Optional[Dict[str, List[Selector]]] = None,
+                 by_marketplace: Optional[Dict[str, Dict[str, List[Selector]]]] = None):
+        self.path = path
+        self.selectors = selectors if selectors is not None else SELECTORS
+        self.by_marketplace = by_marketplace if by_marketplace is not None else MARKETPLACE_SELECTORS
+        self._lock = threading.Lock()
+        # "market|field|name" -> [tries, hits, last_hit (unix time, 0 = never), misses since last hit]
+        self.stats: Dict[str, List[int]] = {}
+        self._dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.stats = {k: (list(v) + [0, 0, 0, 0])[:4] for k, v in (json.load(f) or {}).items()}
+            except Exception:
+                self.stats = {}
+
+    @classmethod
+    def for_folder(cls, folder: str) -> "SelectorRegistry":
+        return cls(os.path.join(folder or "reports", SELECTOR_STATS_FILE))
+
+    # ---------------- ordering ----------------
+    def candidates(self, field: str, market: str = "com") -> List[Selector]:
+        # a handful of candidates: sorting per lookup costs microseconds, a miss a round trip
+        declared = list(self.by_marketplace.get(market, {}).get(field, [])) + list(self.selectors.get(field, []))
+        with self._lock:
+            stats = self.stats
+
+            def rank(item):
+                idx, sel = item
+                tries, hits, _, streak = stats.get(f"{market}|{field}|{sel.name}") or (0, 0, 0, 0)
+                # a layout change shows up as a miss streak long before it dents the hit rate
+                return sel.tier, streak >= _STREAK_DEMOTE, -(hits + 1) / (tries + 2), idx
+
+            return [sel for _, sel in sorted(enumerate(declared), key=rank)]
+
+    def record(self, field: str, market: str, selector: Selector, hit: bool):
+        k = f"{market}|{field}|{selector.name}"
+        with self._lock:
+            s = self.stats.get(k)
+            if s is None:
+                s = self.stats[k] = [0, 0, 0, 0]
+            s[0] += 1
+            if hit:
+                s[1] += 1
+                s[2] = int(time.time())
+                s[3] = 0
+            else:
+                s[3] += 1
+            self._dirty = True
+
+    # ---------------- lookup ----------------
+    def first(self, field: str, market: str, attempt: Callable[[Selector], Any]) -> Any:
+        """Value of the first candidate for which `attempt` returns non-None (None if none does)."""
+        for sel in self.candidates(field, market):
+            try:
+                value = attempt(sel)
+            except Exception:
+                value = None
+            self.record(field, market, sel, value is not None)
+            if value is not None:
+                return value
+        return None
+
+    # ---------------- reporting / persistence ----------------
+    def report(self) -> List[Dict[str, Any]]:
+        rows = []
+        with self._lock:
+            items = list(self.stats.items())
+        for k, (tries, hits, last_hit, streak) in sorted(items):
+            market, field, name = k.split("|", 2)
+            rows.append({"market": market, "field": field, "selector": name, "tries": int(tries), "hits": int(hits),
+                         "hit_rate": round(hits / tries, 3) if tries else 0.0, "last_hit": int(last_hit),
+                         "misses_since_hit": int(streak)})
+        return rows
+
+    def dead(self, min_tries: int = 50) -> List[Dict[str, Any]]:
+        """Selectors that missed at least `min_tries` times in a row (never hit, or stopped hitting)."""
+        return [row for row in self.report() if row["misses_since_hit"] >= min_tries]
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            data = {k: list(v) for k, v in self.stats.items()}
+            self._dirty = False
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def format_report(registry: SelectorRegistry, min_tries: int = 50) -> str:
+    lines = []
+    for r in registry.report():
+        lines.append(f"  {r['market']:6} {r['field']:13} {r['selector']:26} {r['hits']:>6}/{r['tries']:<6} "
+                     f"{r['hit_rate'] * 100:5.1f}%")
+    dead = registry.dead(min_tries)
+    if dead:
+        lines.append("Dead selectors:")
+        for r in dead:
+            since = time.strftime("%Y-%m-%d", time.localtime(r["last_hit"])) if r["last_hit"] else "never"
+            lines.append(f"  {r['market']}/{r['field']}: {r['selector']} — {r['misses_since_hit']} misses in a row, "
+                         f"last hit {since}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Selector hit rates and dead selectors")
+    ap.add_argument("path", nargs="?", default=os.path.join("reports", SELECTOR_STATS_FILE))
+    ap.add_argument("--min-tries", type=int, default=50)
+    args = ap.parse_args(argv)
+    registry = SelectorRegistry(args.path)
+    print(format_report(registry, args.min_tries) or "no selector stats recorded")
+    return 1 if registry.dead(args.min_tries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# startup.py
+#
+# Startup timing:
+#   - mark("...") records wall time since process start for app milestones
+#     (main.py marks imports done / window shown / engine loaded)
+#   - import_profile() runs `python -X importtime -c "import <module>"` in a clean
+#     interpreter and returns the slowest imports by cumulative time
+#
+# CLI:  python startup.py [--module main] [--top 15] [--budget-ms 800]
+#       exits 1 when the total import time of --module exceeds --budget-ms
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+from typing import List, Optional, Dict, Tuple
+
+_T0 = time.perf_counter()
+_MARKS: List[Tuple[str, float]] = []
+
+# "import time:       412 |       1536 | selenium.webdriver"
+_IMPORTTIME_RE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def mark(name: str) -> float:
+    """Record a milestone; returns milliseconds since this module was first imported."""
+    ms = (time.perf_counter() - _T0) * 1000
+    _MARKS.append((name, ms))
+    return ms
+
+
+def marks() -> List[Tuple[str, float]]:
+    return list(_MARKS)
+
+
+def format_marks() -> str:
+    return "\n".join(f"  {ms:8.1f} ms  {name}" for name, ms in _MARKS)
+
+
+def import_profile(module: str = "main", top: int = 15, cwd: Optional[str] = None) -> Dict[str, object]:
+    """Profile `import <module>` in a fresh interpreter with -X importtime."""
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=cwd, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m:
+            self_us, cum_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+            rows.append({"module": name, "self_ms": self_us / 1000, "cumulative_ms": cum_us / 1000,
+                         "depth": max(0, (len(indent) - 1) // 2)})
+    # the requested module is reported last, at depth 0
+    total = next((r["cumulative_ms"] for r in reversed(rows) if r["module"] == module), None)
+    if total is None:
+        total = sum(r["cumulative_ms"] for r in rows if r["depth"] == 0)
+    slowest = sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:top]
+    return {"module": module, "total_ms": round(total, 1), "ok": proc.returncode == 0,
+            "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None, "slowest": slowest}
+
+
+def format_profile(profile: Dict[str, object]) -> str:
+    lines = [f"import {profile['module']}: {profile['total_ms']} ms"]
+    if profile.get("error"):
+        lines.append(f"  (import failed: {profile['error']})")
+    for r in profile["slowest"]:
+        lines.append(f"  {r['cumulative_ms']:8.1f} ms cumulative  {r['self_ms']:7.1f} ms self  {r['module']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import-time report for app startup")
+    ap.add_argument("--module", default="main")
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=0, help="fail when total import time exceeds this")
+    args = ap.parse_args(argv)
+
+    profile = import_profile(args.module, top=args.top)
+    print(format_profile(profile))
+    if args.budget_ms and profile["total_ms"] > args.budget_ms:
+        print(f"[REGRESSION] import {args.module} took {profile['total_ms']} ms (budget {args.budget_ms:g} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# tab_pool.py
+import time
+from typing import List, Optional, Callable, Iterable, Iterator, Tuple
+
+# the old document is tagged before a tab navigates, so a readiness check cannot
+# mistake the previous page for the new one
+_STALE_ATTR = "data-tab-pool-stale"
+_NAVIGATE_JS = (
+    f"document.documentElement && document.documentElement.setAttribute('{_STALE_ATTR}', '1');"
+    "window.location.href = arguments[0];"
+)
+
+
+class TabPool:
+    """
+    Several product loads in flight inside one browser.
+
+    Navigation is started with a script (`window.location.href = url`), which returns
+    immediately, so the pool can open a URL in one tab, move on to the next tab and
+    start another. Tabs are then polled round-robin with `ready_js`; a tab that is
+    ready (or has taken longer than `timeout`) is switched to and yielded, and gets
+    the next URL once the caller resumes the generator.
+
+       pool = TabPool(driver, size=4, ready_js=READY_JS["product"])
+       for url, ready in pool.run(urls):
+           ...  # driver is on the tab showing `url`
+
+    One Chrome with N tabs shares its browser process, GPU process and caches; each
+    extra tab costs a renderer rather than a whole browser.
+    """
+
+    def __init__(self, driver, size: int = 4, ready_js: str = "return document.readyState === 'complete';",
+                 timeout: float = 30, poll: float = 0.05,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 before_start: Optional[Callable[[str], None]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.driver = driver
+        self.size = max(1, int(size or 1))
+        self.ready_js = f"if (document.documentElement && document.documentElement.hasAttribute('{_STALE_ATTR}')) return false; {ready_js}"
+        self.timeout = float(timeout or 0)
+        self.poll = poll
+        self.should_stop = should_stop or (lambda: False)
+        self.before_start = before_start
+        self._sleep = sleep
+        self.handles: List[str] = []
+        self.timeouts = 0
+
+    def open(self) -> List[str]:
+        """Current window plus size-1 new tabs."""
+        d = self.driver
+        self.handles = [d.current_window_handle]
+        for _ in range(self.size - 1):
+            try:
+                d.switch_to.new_window("tab")
+            except Exception:
+                # Selenium 3 / drivers without the new-window command
+                d.execute_script("window.open('about:blank', '_blank');")
+                d.switch_to.window([h for h in d.window_handles if h not in self.handles][-1])
+            self.handles.append(d.current_window_handle)
+        return self.handles
+
+    def close(self):
+        """Close the extra tabs, leaving the driver on the first one."""
+        d = self.driver
+        for h in self.handles[1:]:
+            try:
+                d.switch_to.window(h)
+                d.close()
+            except Exception:
+                pass
+        try:
+            if self.handles:
+                d.switch_to.window(self.handles[0])
+        except Exception:
+            pass
+        self.handles = self.handles[:1]
+
+    def _start(self, handle: str, url: str):
+        if self.before_start is not None:
+            self.before_start(url)
+        self.driver.switch_to.window(handle)
+        self.driver.execute_script(_NAVIGATE_JS, url)
+
+    def _is_ready(self, handle: str) -> bool:
+        try:
+            self.driver.switch_to.window(handle)
+            return bool(self.driver.execute_script(self.ready_js))
+        except Exception:
+            return False
+
+    def run(self, urls: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+        """Yield (url, ready) in completion order with the driver on that tab.
+
+        ready is False when the tab timed out; the page is stopped and yielded as it is.
+        """
+        if not self.handles:
+            self.open()
+        source = iter(urls)
+        busy = {}           # handle -> (url, started)
+        idle = list(self.handles)
+
+        def fill():
+            while idle and not self.should_stop():
+                url = next(source, None)
+                if url is None:
+                    return
+                handle = idle.pop(0)
+                try:
+                    self._start(handle, url)
+                except Exception:
+                    idle.append(handle)
+                    raise
+                busy[handle] = (url, time.monotonic())
+
+        fill()
+        while busy and not self.should_stop():
+            harvested = False
+            for handle in list(busy):
+                if self.should_stop():
+                    return
+                url, started = busy[handle]
+                ready = self._is_ready(handle)
+                if not ready and not (self.timeout and time.monotonic() - started > self.timeout):
+                    continue
+                if not ready:
+                    self.timeouts += 1
+                    try:
+                        self.driver.execute_script("window.stop();")
+                    except Exception:
+                        pass
+                del busy[handle]
+                harvested = True
+                yield url, ready
+                idle.append(handle)
+                fill()
+            if not harvested:
+                self._sleep(self.poll)
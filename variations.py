@@ -0,0 +1,156 @@
+# variations.py
+import re
+import json
+import threading
+from typing import Optional, Dict, Any, Tuple
+
+from records import as_dict
+
+# Product pages embed the variation ("twister") data as JS object literals, e.g.
+#   "parentAsin" : "B07PARENT1",
+#   "dimensionsDisplay" : ["Color", "Size"],
+#   "dimensionValuesDisplayData" : {"B07CHILD01": ["Black", "S"], "B07CHILD02": ["Black", "M"]},
+# Older layouts only carry asinVariationValues / dimensionToAsinMap.
+_PARENT_RE = re.compile(r'"parentAsin"\s*:\s*"([A-Z0-9]{10})"')
+_KEY_RE = {k: re.compile(r'"%s"\s*:\s*' % k) for k in (
+    "dimensionValuesDisplayData", "asinVariationValues", "dimensionToAsinMap")}
+_ASIN_RE = re.compile(r"^[A-Z0-9]{10}$")
+
+# swatches: <li ... data-defaultasin="B07CHILD01" ...> ... <span class="a-offscreen">$19.99</span>
+_SWATCH_RE = re.compile(r'<li\b[^>]*?\bdata-(?:defaultasin|asin|csa-c-item-id)="([A-Z0-9]{10})"[^>]*>(.*?)(?=<li\b|</ul>)', re.S)
+_SWATCH_PRICE_RE = re.compile(
+    r'class="[^"]*(?:a-offscreen|twisterSwatchPrice|a-size-mini)[^"]*"[^>]*>\s*([^<]*\d[^<]*)<', re.S)
+
+_decoder = json.JSONDecoder()
+
+
+def _json_after(html: str, key: str) -> Any:
+    m = _KEY_RE[key].search(html)
+    if not m:
+        return None
+    try:
+        value, _ = _decoder.raw_decode(html, m.end())
+        return value
+    except Exception:
+        return None
+
+
+def extract_variations(html: str, numbers=None) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """(parent_asin, {child_asin: {"dimensions": "Black / S", "price": 19.99 or None}}).
+
+    Empty parent and map when the page has no variations. Prices come from the
+    swatches and are only present for the variants Amazon prices inline.
+    """
+    if not html or "parentAsin" not in html:
+        return "", {}
+    m = _PARENT_RE.search(html)
+    parent = m.group(1) if m else ""
+
+    children: Dict[str, Dict[str, Any]] = {}
+    display = _json_after(html, "dimensionValuesDisplayData")
+    if isinstance(display, dict):
+        for asin, values in display.items():
+            if _ASIN_RE.match(asin):
+                label = " / ".join(str(v) for v in values) if isinstance(values, list) else str(values)
+                children[asin] = {"dimensions": label, "price": None}
+    if not children:
+        for key in ("asinVariationValues", "dimensionToAsinMap"):
+            data = _json_after(html, key)
+            if not isinstance(data, dict):
+                continue
+            for asin in (data.keys() if key == "asinVariationValues" else data.values()):
+                if isinstance(asin, str) and _ASIN_RE.match(asin):
+                    children.setdefault(asin, {"dimensions": "", "price": None})
+            if children:
+                break
+    if not children:
+        return parent, {}
+
+    if numbers is not None:
+        for asin, body in _SWATCH_RE.findall(html):
+            child = children.get(asin)
+            if child is None or child["price"] is not None:
+                continue
+            pm = _SWATCH_PRICE_RE.search(body)
+            if pm:
+                try:
+                    child["price"] = numbers.parse_price(pm.group(1))
+                except Exception:
+                    pass
+    return parent, children
+
+
+class VariationIndex:
+    """
+    Child ASINs already covered by a visited product page, for one run.
+
+    add(record) registers an accepted record's own ASIN as visited and its siblings
+    as covered. sibling(listing) turns a covered listing into a row of its own from
+    the covering page, so the scheduler can skip the visit; a variant the page shows
+    no price for still needs its own visit. Thread-safe: product pages may be
+    extracted on several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._covered: Dict[str, str] = {}     # child asin -> asin of the page that listed it
+        self._pages: Dict[str, Any] = {}       # asin -> record of that page
+        self._visited = set()
+        self.skipped = 0
+
+    def add(self, record: Any):
+        if not record:
+            return
+        asin = record.get("asin") or ""
+        children = record.get("variations") or {}
+        with self._lock:
+            if asin:
+                self._visited.add(asin)
+                if children:
+                    self._pages.setdefault(asin, record)
+            for child in children:
+                if child != asin:
+                    self._covered.setdefault(child, asin)
+
+    def covered(self, asin: Optional[str]) -> Optional[str]:
+        """ASIN of the visited sibling whose page covers `asin`, or None."""
+        if not asin:
+            return None
+        with self._lock:
+            if asin in self._visited:
+                return None
+            return self._covered.get(asin)
+
+    def sibling(self, listing: Dict[str, Any], url: str = "") -> Optional[Dict[str, Any]]:
+        """Row for a listing covered by a visited sibling's page, or None when it needs a visit.
+
+        Price and dimensions come from the page's variation data; title, image, rating
+        and reviews from the search card where it has them. Offer details (seller,
+        availability, BSR) are the visited sibling's.
+        """
+        asin = listing.get("asin") or ""
+        by = self.covered(asin)
+        if by is None:
+            return None
+        with self._lock:
+            page = self._pages.get(by)
+            variant = ((page.get("variations") or {}).get(asin) if page else None) or {}
+            if variant.get("price") is None:
+                return None
+            self.skipped += 1
+        row = dict(as_dict(page))
+        for key in ("price_base", "base_currency"):
+            row.pop(key, None)
+        row.update(asin=asin, url=url or listing.get("url") or "", price=variant["price"],
+                   parent_asin=page.get("parent_asin") or by, variations={})
+        if listing.get("title"):
+            row["title"] = listing["title"]
+        elif variant.get("dimensions"):
+            row["title"] = f"{row.get('title') or ''} ({variant['dimensions']})".strip()
+        if listing.get("image_url"):
+            row["image_url"] = listing["image_url"]
+            row["images"] = [listing["image_url"]]
+        for key in ("rating", "reviews"):
+            if listing.get(key) is not None:
+                row[key] = listing[key]
+        return row
@@ -1,24 +1,45 @@
 # worker.py
 from PySide6.QtCore import QObject, Signal, Slot
 import traceback
-import time
+import threading
+from collections import deque
 import os
 import requests
 from datetime import datetime
 
 from amazon_api import AmazonAPI
 from proxy_manager import RotatingProxyRequester
-from report import Report
+from report import Report, StreamingReport, DeltaReport, SNAPSHOT_DIR
+from result_store import ResultStore
+from checkpoint import RunJournal
+from metrics import RunMetrics
+from archive import HtmlArchive
+from pipeline import HtmlPipeline
+from search_crawler import SearchCrawler
+from currency import FxTable, normalize_record
+from marketplaces import CrossMarketRunner, parse_domains, proxies_for, get_marketplace
+from records import as_dict
+from lean_browsing import LeanBrowsing
+from rate_limiter import RateLimiter
+from driver_watchdog import DriverWatchdog, reap_orphans
+from cancellation import CancellationToken, Cancelled
+from variations import VariationIndex
+from selector_registry import SelectorRegistry
+from catalog import Catalog
+from alerts import (AlertEngine, AlertRule, PriceIndex, FileAlertSink, WebhookAlertSink,
+                    CallbackAlertSink, PRICE_INDEX_FILE)
 
 
 class ScraperWorker(QObject):
     # Signals sent to GUI
-    finished = Signal(list)         # Final product list
+    finished = Signal(dict)         # Run summary (count, result store, report path)
     error = Signal(str)             # Fatal error
     progress = Signal(int)          # % progress
     log = Signal(str)               # log output text
     partial = Signal(dict)          # live row for table
-    stopped = Signal()              # when user stops
+    store_opened = Signal(str)      # result store path; live rows are read back from it
+    stopped = Signal(dict)          # when user stops (summary of what was collected)
+    alert = Signal(dict)            # price-drop alert
 
     def __init__(
         self,
@@ -36,10 +57,52 @@ class ScraperWorker(QObject):
         self.filters = filters or {}
         self.download_images = download_images
         self.image_dir = image_dir
-        self.stop_flag = False
-
-        # Proxy rotator
-        self.proxy_rotator = RotatingProxyRequester(proxies)
+        # Stop button → every wait, sleep and in-flight load of the run (cancellation.py)
+        self.cancel = CancellationToken()
+        self.journal = None
+        self.pipeline = None
+        self.stream = None
+        self.store = None
+        self.count = 0
+        self._page_apis = []          # extra engines used by concurrent search-page fetches
+        self._page_local = threading.local()
+        # fast scan: keep search-card data only, never open product pages
+        self.listing_only = self.filters.get('scan_mode') == 'listing'
+        # color / size siblings listed on an already visited product page are not visited again
+        self.variations = VariationIndex() if self.filters.get('dedupe_variations', True) else None
+
+        # Proxy rotator — proxies pinned to another marketplace ("DE|ip:port") are left out
+        self.proxies = list(proxies or [])
+        primary = get_marketplace(self.filters.get('base_url', 'https://www.amazon.com'))
+        self.proxy_rotator = RotatingProxyRequester(proxies_for(primary.code if primary else 'US', self.proxies))
+        self.runner = None
+
+        # price normalization to a base currency (empty = off)
+        self.base_currency = (self.filters.get('base_currency') or '').upper()
+        self.fx = None
+
+        # price-drop alerts (index of last known prices lives in the output folder)
+        self.alerts = None
+        # searchable catalog of every product seen, across runs (output folder)
+        self.catalog = None
+
+        # Stage timings / counters for this run
+        self.metrics = RunMetrics(run_name=self.search_term or ' '.join(self.asin_list or []))
+
+        # Lean page loads — one instance shared by every engine of the run so savings add up
+        self.lean = None
+        if self.filters.get('lean_browsing'):
+            self.lean = LeanBrowsing(metrics=self.metrics,
+                                     sample_every=int(self.filters.get('lean_sample_every', 25) or 0))
+
+        # Politeness delay between page loads, shared by every engine of the run
+        self.rate_limiter = RateLimiter.from_filters(self.filters)
+
+        # Page-load timeouts, hung-driver kills and memory recycling for every driver of the run
+        self.watchdog = DriverWatchdog.from_filters(self.filters, self.metrics)
+
+        # Field selectors ordered by hit rate; stats carry over between runs (output folder)
+        self.selectors = SelectorRegistry.for_folder(self.filters.get('output_folder') or 'reports')
 
         # AmazonAPI engine
         self.scraper = AmazonAPI(
@@ -52,119 +115,592 @@ class ScraperWorker(QObject):
             use_uc=self.filters.get('use_uc', True),
             headless=self.filters.get('headless', False),
             pages_per_proxy=self.filters.get('pages_per_proxy', 2),
+            metrics=self.metrics,
+            archive=self._open_archive(),
+            fetch_mode=self.filters.get('fetch_mode', 'browser'),
+            lean=self.lean,
+            rate_limiter=self.rate_limiter,
+            watchdog=self.watchdog,
+            cancel=self.cancel,
+            selectors=self.selectors,
         )
 
+    @property
+    def stop_flag(self):
+        return self.cancel.cancelled
+
     def stop(self):
-        self.stop_flag = True
+        """Called from the GUI thread. Only signals: drivers belong to the worker thread,
+        which unwinds within about a second, saves what it has and emits `stopped`."""
         self.log.emit("[⚠] Stop request received…")
-        try:
-            self.scraper.stop()
-            self.scraper.cleanup()
-        except Exception:
-            pass
-        self.stopped.emit()
+        self.cancel.cancel("stopped by user")
 
     @Slot()
     def run(self):
         try:
             self.log.emit("Preparing scraper…")
 
-            products = []
-
-            # ASIN mode
-            if self.asin_list:
-                self.log.emit(f"Tracking {len(self.asin_list)} ASINs…")
-                data = self.scraper.track_asins(self.asin_list)
-                for p in data:
-                    if self.stop_flag:
-                        self.stopped.emit()
-                        return
-                    self.partial.emit(p)
-                    products.append(p)
-
-                # Save report
-                self._save_report(products)
-                self.finished.emit(products)
-                return
+            reaped = reap_orphans()
+            if reaped:
+                self.log.emit(f"[🧹] Killed {reaped} Chrome processes left over from a previous run.")
 
-            # Keyword mode — use start_page / max_pages / max_products
-            start_page = int(self.filters.get('start_page', 1) or 1)
-            max_pages = int(self.filters.get('max_pages', 1) or 1)
-            max_products = int(self.filters.get('max_products', 0) or 0)  # 0 => no limit
-
-            # scrape pages
-            scraped_count = 0
-            for page_offset in range(0, max_pages):
-                page = start_page + page_offset
-                if self.stop_flag:
-                    self.log.emit("❌ Scraping stopped by user.")
-                    self.stopped.emit()
-                    return
-
-                self.log.emit(f"Scraping page {page} (start {start_page})…")
+            if self.filters.get('metrics_port'):
                 try:
-                    page_listings = self.scraper.scrape_products(url=None, page=page, filters=self.filters)
+                    self.metrics.serve(int(self.filters.get('metrics_port')))
+                    self.log.emit(f"Metrics endpoint: http://127.0.0.1:{self.filters.get('metrics_port')}/metrics")
                 except Exception as e:
-                    self.log.emit(f"[ERROR] Failed to scrape page {page}: {e}")
-                    continue
+                    self.log.emit(f"[⚠] Metrics endpoint not started: {e}")
+
+            if self.base_currency:
+                self.fx = FxTable.for_folder(self.filters.get('output_folder') or 'reports')
+                self.fx.refresh_in_background()
+                if self.fx.updated is None:
+                    # nothing cached yet: without a first table no price can be converted
+                    self.log.emit("Downloading FX rates…")
+                    self.fx.wait_checked(15)
+                self.log.emit(f"Normalizing prices to {self.base_currency} (rates of {self.fx.updated.date() if self.fx.updated else 'unknown date'}).")
+
+            self.alerts = self._open_alerts()
+            self.catalog = self._open_catalog()
+
+            # Cross-marketplace comparison
+            compare = parse_domains(self.filters.get('compare_domains') or [])
+            if compare:
+                self._run_cross_market(compare)
+                return
 
-                for p in page_listings:
-                    if self.stop_flag:
-                        self.stopped.emit()
-                        return
-
-                    # visit product page to get full details
-                    try:
-                        item = self.scraper._get_full_product_from_listing(p)
-                    except Exception:
-                        item = None
-
-                    if item is None:
-                        continue
-
-                    # apply advanced filters
-                    try:
-                        if not self.scraper._passes_advanced_filters(item):
-                            continue
-                    except Exception:
-                        pass
-
-                    products.append(item)
-                    self.partial.emit(item)
-                    scraped_count += 1
-
-                    # progress
-                    if max_products > 0:
-                        prog = int(min(scraped_count / max_products * 100, 100))
-                    else:
-                        # Use pages progress approximation
-                        prog = int(min((page_offset + 1) / max_pages * 100, 100)) if max_pages > 0 else 0
-                    self.progress.emit(prog)
+            # Run journal — lets an interrupted run continue where it stopped; it holds
+            # ASINs and page numbers only, the rows stay in the run's result store
+            self.journal = self._open_journal()
+            resume_store = self._resume_store_path()
+
+            # Rows go to the result store (and the report stream) as they arrive; nothing
+            # below keeps the run in memory
+            self.store = self._open_store(path=resume_store)
+            if self.journal is not None and self.store is not None and not resume_store:
+                self.journal.record_store(self.store.path)
+            if self.store is not None:
+                self.store_opened.emit(self.store.path)
+            if self.filters.get('export_format', 'csv') in StreamingReport.STREAMABLE and not self._delta_key():
+                self._open_stream()
+
+            if resume_store and self.store is not None:
+                restored = 0
+                stored = set()
+                for p in self.store.iter_rows():
+                    stored.add(p.get('asin'))
+                    self._sink(p, check=False)
+                    self._track_variations(p)
+                    restored += 1
+                lost = self.journal.forget_unstored(stored)
+                if restored:
+                    self.log.emit(f"[↻] Resuming previous run — {restored} products restored from its result store.")
+                if lost:
+                    self.log.emit(f"[↻] {lost} products journaled but not stored will be visited again.")
 
-                    if max_products > 0 and scraped_count >= max_products:
+            if self.asin_list:
+                self.log.emit(f"Tracking {len(self.asin_list)} ASINs…")
+                rows = self._asin_stage()
+            else:
+                # HTTP fetch mode: product pages go through the fetch/parse pipeline
+                if self.scraper.fetch_mode == "http":
+                    self.pipeline = HtmlPipeline(
+                        fetch=self.scraper.fetch_html,
+                        base_url=self.scraper.base_url,
+                        currency=self.scraper.currency,
+                        filters=self.filters,
+                        fetch_workers=int(self.filters.get('fetch_workers', 4) or 4),
+                        parse_workers=int(self.filters.get('parse_workers', 0) or 0) or None,
+                        should_stop=self.cancel,
+                        archive=self.scraper.archive,
+                    )
+                if self.listing_only:
+                    self.log.emit("Fast scan: search results only, product pages are skipped.")
+                self.log.emit(f"Filters {self.scraper.pushdown.describe()}")
+                rows = self._filter_stage(self._detail_stage())
+
+            # search pages → listings → details → filter → sinks
+            max_products = 0 if self.asin_list else int(self.filters.get('max_products', 0) or 0)  # 0 => no limit
+            if not (max_products > 0 and self.count >= max_products):
+                for item, prog in rows:
+                    self._sink(item)
+                    self.progress.emit(prog if max_products <= 0 else int(min(self.count / max_products * 100, 100)))
+                    if max_products > 0 and self.count >= max_products:
                         break
+            rows.close()
 
-                if max_products > 0 and scraped_count >= max_products:
-                    break
+            if self.stop_flag:
+                self._finish_stopped()
+                return
 
-                # small delay to reduce blocking
-                time.sleep(0.4)
+            self._close_page_apis()
 
             # download images if requested
-            if self.download_images and self.image_dir:
+            if self.download_images and self.image_dir and self.store is not None:
                 self.log.emit("Downloading product images…")
-                self._download_images(products)
+                self._download_images(self.store.iter_rows())
 
             self.log.emit("✔ Scraping completed.")
+            if self.variations is not None and self.variations.skipped:
+                self.log.emit(f"Variants: {self.variations.skipped} product pages skipped "
+                              f"(covered by a sibling's variation data).")
+            self._log_lean_savings()
+            self._log_dead_selectors()
 
             # Save report
-            self._save_report(products)
+            report = self._save_report()
+            self._journal_complete()
 
-            self.finished.emit(products)
+            self.finished.emit(self._summary(report))
 
         except Exception as e:
             trace = traceback.format_exc()
             self.error.emit(f"{e}\n\n{trace}")
+        finally:
+            self._close_page_apis()
+            if self.stream is not None:
+                try:
+                    self.stream.close()
+                except Exception:
+                    pass
+            if self.journal is not None:
+                self.journal.close()
+            if self.pipeline is not None:
+                self.pipeline.close()
+            if self.alerts is not None:
+                try:
+                    self.alerts.close()
+                except Exception:
+                    pass
+            if self.store is not None:
+                # the GUI reopens the store by path from the run summary
+                try:
+                    self.store.close()
+                except Exception:
+                    pass
+            try:
+                self.selectors.save()
+            except Exception:
+                pass
+            if self.catalog is not None:
+                try:
+                    self.catalog.close()
+                except Exception:
+                    pass
+            self.metrics.close()
+
+    # ---------------- pipeline stages ----------------
+    def _asin_stage(self):
+        """Yield (product, progress) for every tracked ASIN not yet in the journal."""
+        total = len(self.asin_list)
+        for idx, asin in enumerate(self.asin_list):
+            if self.stop_flag:
+                return
+            if self.journal is not None and self.journal.is_asin_done(asin):
+                continue
+            try:
+                item = self.scraper._get_full_product_from_listing({"asin": asin})
+            except Exception:
+                item = None
+            if item is None:
+                # not journaled: a failed visit is retried on resume
+                continue
+            self._normalize_currency(item)
+            self._journal_asin(asin, item)
+            yield item, int((idx + 1) / total * 100)
+
+    def _detail_stage(self):
+        """Yield (listing, product or None, progress) page by page.
+
+        A page is marked done in the journal only once all of its listings were consumed;
+        when the consumer stops early (max products, stop) the page is replayed on resume.
+        """
+        start_page = int(self.filters.get('start_page', 1) or 1)
+        max_pages = int(self.filters.get('max_pages', 1) or 1)
+        for page_offset, page, page_listings in self._iter_search_pages(start_page, max_pages):
+            if self.stop_flag:
+                return
+            prog = int(min((page_offset + 1) / max_pages * 100, 100)) if max_pages > 0 else 0
+            for p, item in self._iter_details(page_listings):
+                if self.stop_flag:
+                    return
+                yield p, item, prog
+            if self.journal is not None:
+                self.journal.record_page_done(page)
+
+    def _filter_stage(self, details):
+        """Yield (product, progress) for products passing the filters; rejects are journaled."""
+        for p, item, prog in details:
+            if item is None:
+                continue
+            asin = p.get('asin')
+            self._normalize_currency(item)
+            try:
+                with self.metrics.span("filter"):
+                    if self.listing_only:
+                        passed = self.scraper._passes_listing_filters(item)
+                    else:
+                        passed = self.scraper._passes_advanced_filters(item)
+                if not passed:
+                    self.metrics.inc("filtered_out")
+                    self._journal_asin(asin, None)
+                    if self.store is not None:
+                        # kept so the GUI can re-filter with looser settings without a re-scrape
+                        self.store.add(item, rejected=True)
+                    continue
+            except Exception:
+                pass
+            self._journal_asin(asin, item)
+            # only accepted pages cover their siblings; a sibling row lists no variations
+            self._track_variations(item)
+            yield item, prog
+
+    def _sink(self, item, check=True):
+        """Deliver one accepted row: alerts, result store, report stream, live table.
+
+        check=False: a row restored from the store of an interrupted run (already stored).
+        """
+        if check:
+            self._check_alert(item)
+            self.metrics.inc("products")
+        row = as_dict(item)
+        if self.store is not None and check:
+            self.store.add(row)
+        if self.catalog is not None and check:
+            self.catalog.add(row)
+        self._stream_row(row)
+        self.partial.emit(row)
+        self.count += 1
+
+    def _log_lean_savings(self):
+        if self.lean is None:
+            return
+        text = self.lean.format_summary()
+        if text:
+            self.log.emit("Lean browsing:\n" + text)
+
+    def _log_dead_selectors(self):
+        dead = self.selectors.dead()
+        if dead:
+            self.log.emit("[⚠] Selectors that keep missing (page layout changed?): " +
+                          ", ".join(f"{r['market']}/{r['field']}:{r['selector']}" for r in dead))
+
+    def _summary(self, report=None, **extra):
+        summary = {
+            "count": self.count,
+            "lean": self.lean.summary() if self.lean is not None else None,
+            "store": self.store.path if self.store is not None else None,
+            "report": report,
+            "alerts": self.alerts.fired if self.alerts is not None else 0,
+            "scan_mode": "listing" if self.listing_only else "full",
+        }
+        summary.update(extra)
+        return summary
+
+    def _normalize_currency(self, item):
+        if self.fx is None:
+            return item
+        try:
+            return normalize_record(item, self.fx, self.base_currency)
+        except Exception:
+            return item
+
+    def _open_catalog(self):
+        if not self.filters.get('catalog', True):
+            return None
+        try:
+            return Catalog.for_folder(self.filters.get('output_folder') or 'reports')
+        except Exception as e:
+            self.log.emit(f"[⚠] Product catalog disabled: {e}")
+            return None
+
+    def _open_alerts(self):
+        rule = AlertRule.from_filters(self.filters)
+        out_folder = self.filters.get('output_folder') or 'reports'
+        try:
+            index = PriceIndex(os.path.join(out_folder, PRICE_INDEX_FILE))
+        except Exception as e:
+            self.log.emit(f"[⚠] Price index disabled: {e}")
+            return None
+        sinks = [CallbackAlertSink(lambda a: self.alert.emit(a.to_dict()))]
+        if rule.active:
+            sinks.append(FileAlertSink(os.path.join(out_folder, "alerts.jsonl")))
+            if self.filters.get('alert_webhook'):
+                try:
+                    sinks.append(WebhookAlertSink(self.filters['alert_webhook']))
+                except Exception as e:
+                    self.log.emit(f"[⚠] Alert webhook disabled: {e}")
+            self.log.emit(f"Price alerts on — {len(index)} ASINs with known prices.")
+        return AlertEngine(index, rule, sinks)
+
+    def _check_alert(self, item):
+        if self.alerts is None:
+            return
+        try:
+            a = self.alerts.check(item)
+        except Exception:
+            return
+        if a is not None:
+            self.metrics.inc("alerts")
+            self.log.emit(f"[🔔] {a.message()}")
+
+    def _run_cross_market(self, domains):
+        codes = ', '.join(f"{m.code} ({m.symbol})" for m in domains)
+        self.log.emit(f"Cross-marketplace run on {codes}…")
+
+        def make_engine(m):
+            return AmazonAPI(
+                search_term=self.search_term,
+                filters=self.filters,
+                base_url=m.base_url,
+                requester=RotatingProxyRequester(proxies_for(m.code, self.proxies)),
+                country=m.code,
+                currency=m.currency,
+                use_uc=self.filters.get('use_uc', True),
+                headless=self.filters.get('headless', False),
+                pages_per_proxy=self.filters.get('pages_per_proxy', 2),
+                metrics=self.metrics,
+                archive=self.scraper.archive,
+                fetch_mode=self.scraper.fetch_mode,
+                lean=self.lean,
+                rate_limiter=self.rate_limiter,
+                watchdog=self.watchdog,
+                cancel=self.cancel,
+                selectors=self.selectors,
+            )
+
+        done = [0]
+        total_hint = max(len(self.asin_list or []), 1) * len(domains)
+
+        def on_product(code, item):
+            self._normalize_currency(item)
+            self._check_alert(item)
+            self.metrics.inc("products")
+            if self.catalog is not None:
+                self.catalog.add(item)
+            done[0] += 1
+            self.partial.emit(as_dict(item))
+            self.progress.emit(int(min(done[0] / total_hint * 100, 99)))
+
+        self.runner = CrossMarketRunner(
+            make_engine, domains,
+            asin_list=self.asin_list, search_term=self.search_term,
+            max_pages=int(self.filters.get('max_pages', 1) or 1),
+            should_stop=self.cancel,
+            on_product=on_product,
+        )
+        counts = self.runner.run()
+        if self.stop_flag:
+            self._finish_stopped('compare_', self.runner.merged())
+            return
+        for code, n in counts.items():
+            self.log.emit(f"  {code}: {n} products")
+        self._log_lean_savings()
+
+        rows = self.runner.merged()
+        self.store = self._open_store('compare_')
+        if self.store is not None:
+            for row in rows:
+                self.store.add(row)
+        self.count = len(rows)
+        report = self._save_report(prefix='compare_', rows=rows)
+        self.finished.emit(self._summary(report, markets=counts))
+
+    def _iter_search_pages(self, start_page, max_pages):
+        """Yield (page_offset, page, listings) for pages still to process.
+
+        Pages finished in the journal are skipped and pages with queued listings are
+        replayed from it; the rest are fetched by a SearchCrawler.
+        """
+        pages = [start_page + i for i in range(max_pages)]
+        offsets = {p: i for i, p in enumerate(pages)}
+        to_fetch = []
+        queued = {}
+        seen = set()
+        if self.journal is not None:
+            # listings are re-read from the journal file; only unfinished pages are kept
+            for page, listings in self.journal.iter_listings():
+                seen.update(p.get('asin') for p in listings if p.get('asin'))
+                if page in offsets and not self.journal.is_page_done(page):
+                    queued[page] = listings
+        for page in pages:
+            if self.journal is not None and self.journal.is_page_done(page):
+                self.log.emit(f"Skipping page {page} (already done in journal).")
+            elif page not in queued:
+                to_fetch.append(page)
+
+        for page in sorted(queued):
+            self.log.emit(f"Resuming page {page} from journal ({len(queued[page])} listings)…")
+            yield offsets[page], page, queued[page]
+
+        fanout = int(self.filters.get('page_fanout', 1) or 1)
+        crawler = SearchCrawler(self._fetch_search_page, fanout=fanout, seen=seen,
+                                should_stop=self.cancel)
+        if to_fetch:
+            self.log.emit(f"Scraping pages {to_fetch[0]}–{to_fetch[-1]} (fan-out {fanout})…")
+        for page, listings in crawler.crawl(to_fetch):
+            if listings is None:
+                self.log.emit(f"[ERROR] Failed to scrape page {page} (no listings)")
+                continue
+            if self.journal is not None:
+                self.journal.record_listings(page, listings)
+            self.log.emit(f"Page {page}: {len(listings)} new listings.")
+            yield offsets[page], page, listings
+        if crawler.duplicates:
+            self.metrics.inc("duplicate_listings", crawler.duplicates)
+        if crawler.errors:
+            self.metrics.inc("search_page_errors", crawler.errors)
+        if crawler.stopped_early_at is not None:
+            self.log.emit(f"Page {crawler.stopped_early_at} had no new ASINs — stopping search early.")
+
+    def _fetch_search_page(self, page):
+        # one engine per crawler thread: a driver cannot be shared between threads
+        api = getattr(self._page_local, 'api', None)
+        if api is None:
+            if int(self.filters.get('page_fanout', 1) or 1) <= 1 or self.scraper.fetch_mode == "http":
+                # sequential crawl runs on the worker thread; HTTP fetching holds no driver
+                api = self.scraper
+            else:
+                api = self.scraper.clone()
+                self._page_apis.append(api)
+            self._page_local.api = api
+        return api.scrape_products(url=None, page=page, filters=self.filters)
+
+    def _close_page_apis(self):
+        for api in self._page_apis:
+            try:
+                api.cleanup()
+            except Exception:
+                pass
+        self._page_apis = []
+
+    def _iter_details(self, listings):
+        """Yield (listing, product or None) for every listing not already done in the journal."""
+        todo = [p for p in listings
+                if not (self.journal is not None and self.journal.is_asin_done(p.get('asin')))]
+
+        if self.listing_only:
+            for p in todo:
+                yield p, self.scraper.listing_record(p)
+            return
+
+        # cards that already fail a filter never cost a product page visit; they are kept
+        # as card-only rejected rows. With keep_rejects every card gets its product page,
+        # so re-filtering sees full rows
+        if not self.filters.get('keep_rejects'):
+            kept = []
+            for p in todo:
+                if self.scraper.prefilter_listing(p):
+                    kept.append(p)
+                else:
+                    self.metrics.inc("prefiltered")
+                    self._journal_asin(p.get('asin'), None)
+                    if self.store is not None:
+                        self.store.add(self.scraper.listing_record(p), rejected=True)
+            todo = kept
+
+        tabs = int(self.filters.get('browser_tabs', 1) or 1)
+        if self.pipeline is None and tabs > 1:
+            # several product pages in flight in one browser
+            by_url = {}
+            for p in todo:
+                url = self.scraper.product_url(p)
+                if url:
+                    by_url[url] = p
+            siblings = deque()
+            for url, item in self.scraper.visit_many(self._uncovered(by_url, siblings), tabs=tabs):
+                yield by_url[url], item
+                while siblings:
+                    yield siblings.popleft()
+            while siblings:
+                yield siblings.popleft()
+            return
+
+        if self.pipeline is None:
+            for p in todo:
+                if self.stop_flag:
+                    return
+                sibling = self._sibling_row(p, self.scraper.product_url(p))
+                if sibling is not None:
+                    yield p, sibling
+                    continue
+                # visit product page to get full details
+                try:
+                    item = self.scraper._get_full_product_from_listing(p)
+                except Exception:
+                    item = None
+                yield p, item
+            return
+
+        by_url = {}
+        for p in todo:
+            url = self.scraper.product_url(p)
+            if url:
+                by_url[url] = p
+        siblings = deque()
+        for url, item in self.pipeline.run(self._uncovered(by_url, siblings)):
+            yield by_url[url], item
+            while siblings:
+                yield siblings.popleft()
+        while siblings:
+            yield siblings.popleft()
+
+    def _uncovered(self, by_url, siblings):
+        """URLs that need a visit; covered variants go to `siblings` as (listing, row)."""
+        for url, p in by_url.items():
+            sibling = self._sibling_row(p, url)
+            if sibling is None:
+                yield url
+            else:
+                siblings.append((p, sibling))
+
+    def _sibling_row(self, listing, url):
+        """Row built from a visited sibling's variation data, or None (visit the page)."""
+        if self.variations is None:
+            return None
+        row = self.variations.sibling(listing, url or "")
+        if row is not None:
+            self.metrics.inc("variations_skipped")
+        return row
+
+    def _track_variations(self, item):
+        if self.variations is not None and item:
+            self.variations.add(item)
+
+    def _open_archive(self):
+        if not self.filters.get('archive_html'):
+            return None
+        folder = self.filters.get('archive_dir') or os.path.join(self.filters.get('output_folder') or 'reports', 'archive')
+        try:
+            return HtmlArchive(folder)
+        except Exception:
+            return None
+
+    def _open_journal(self):
+        if not self.filters.get('resume', True):
+            return None
+        try:
+            out_folder = self.filters.get('output_folder') or 'reports'
+            return RunJournal.for_run(out_folder, self.search_term, self.asin_list, self.filters, resume=True)
+        except Exception as e:
+            self.log.emit(f"[⚠] Run journal disabled: {e}")
+            return None
+
+    def _journal_asin(self, asin, product):
+        if self.journal is None or not asin:
+            return
+        try:
+            self.journal.record_asin(asin, kept=product is not None)
+        except Exception as e:
+            self.log.emit(f"[⚠] Journal write failed: {e}")
+
+    def _journal_complete(self):
+        if self.journal is None:
+            return
+        try:
+            self.journal.record_complete()
+        except Exception:
+            pass
 
     def _download_images(self, products):
         folder = self.image_dir or self.filters.get('output_folder') or 'images'
@@ -189,46 +725,157 @@ class ScraperWorker(QObject):
                     if len(ext) > 5:
                         ext = 'jpg'
                 path = os.path.join(folder, f"{asin}.{ext}")
-                r = requests.get(img, timeout=12)
+                with self.metrics.span("image_download"):
+                    r = self.cancel.call(requests.get, img, timeout=12)
                 if r.status_code == 200:
                     with open(path, 'wb') as f:
                         f.write(r.content)
                     self.log.emit(f"[✔] Saved image {path}")
                 else:
                     self.log.emit(f"[❌] Image HTTP {r.status_code}: {img}")
+            except Cancelled:
+                return
             except Exception as e:
                 self.log.emit(f"[❌] Image error for {asin}: {e}")
 
-    def _save_report(self, products):
+    def _report_name(self, prefix=''):
+        ts = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        return f"{prefix}{self._report_stem()}_{ts}"
+
+    def _report_stem(self):
+        name = 'results'
+        if self.search_term:
+            clean = ''.join(c for c in self.search_term if c.isalnum() or c in (' ', '_', '-')).strip()
+            if clean:
+                name = clean.replace(' ', '_')
+        if self.asin_list:
+            name = 'asins_' + '_'.join(self.asin_list[:5])
+        return name
+
+    def _delta_key(self, prefix=''):
+        # one snapshot per report "series": same query on the same marketplace
+        if not self.filters.get('delta_report'):
+            return None
+        market = get_marketplace(self.filters.get('base_url', 'https://www.amazon.com'))
+        return f"{prefix}{self._report_stem()}_{market.code if market else 'US'}"
+
+    def _open_stream(self):
+        out_folder = self.filters.get('output_folder') or 'reports'
         try:
-            out_folder = self.filters.get('output_folder') or 'reports'
-            os.makedirs(out_folder, exist_ok=True)
-            # create filename
-            ts = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            name = 'results'
-            if self.search_term:
-                clean = ''.join(c for c in self.search_term if c.isalnum() or c in (' ', '_', '-')).strip()
-                if clean:
-                    name = clean.replace(' ', '_')
-            if self.asin_list:
-                name = 'asins_' + '_'.join(self.asin_list[:5])
+            self.stream = StreamingReport(file_name=self._report_name(), directory=out_folder,
+                                          currency=self.filters.get('currency'), filters=self.filters,
+                                          base_url=self.filters.get('base_url'),
+                                          export_format=self.filters.get('export_format', 'csv'))
+        except Exception as e:
+            self.stream = None
+            self.log.emit(f"[❌] Failed to open report stream: {e}")
+
+    def _stream_row(self, product):
+        if self.stream is None:
+            return
+        try:
+            with self.metrics.span("report_export"):
+                self.stream.write(product)
+        except Exception as e:
+            self.log.emit(f"[❌] Report write failed: {e}")
+
+    def _resume_store_path(self):
+        """Store of the interrupted run this one resumes, or None (fresh run / no journal)."""
+        if self.journal is None or not self.journal.has_progress:
+            return None
+        path = self.journal.store_path
+        if path and os.path.exists(path):
+            return path
+        self.log.emit("[⚠] Results of the interrupted run are gone — starting over.")
+        self.journal.restart()
+        return None
+
+    def _open_store(self, prefix='', path=None):
+        out_folder = self.filters.get('output_folder') or 'reports'
+        try:
+            if path:
+                return ResultStore(path)
+            return ResultStore.for_run(out_folder, self._report_name(prefix))
+        except Exception as e:
+            self.log.emit(f"[⚠] Result store disabled: {e}")
+            return None
 
-            filename = f"{name}_{ts}"
+    def _save_report(self, prefix='', rows=None, partial=False):
+        """Finalize the run's report; returns its path (None on failure).
 
-            # Trim whitespace from all string fields
-            cleaned = []
-            for p in products:
-                cp = {}
-                for k, v in (p.items()):
-                    if isinstance(v, str):
-                        cp[k] = v.strip()
-                    else:
-                        cp[k] = v
-                cleaned.append(cp)
+        Rows come from `rows` when given (cross-marketplace table), otherwise from the
+        result store — the run's products are never held in a list here. A partial
+        (stopped) run writes a plain report and leaves the delta snapshot untouched.
+        """
+        out_folder = self.filters.get('output_folder') or 'reports'
+
+        # streamed report: rows are already on disk, just finalize the file
+        if self.stream is not None:
+            path = None
+            try:
+                with self.metrics.span("report_export"):
+                    self.stream.close()
+                path = self.stream.path
+                self.log.emit(f"[✔] Report saved: {path} ({self.stream.count} rows)")
+                self._write_run_metrics(out_folder, self.stream.file_name)
+            except Exception as e:
+                self.log.emit(f"[❌] Failed to save report: {e}")
+            self.stream = None
+            return path
 
-            Report(file_name=filename, directory=out_folder, currency=self.filters.get('currency'),
-                   filters=self.filters, base_url=self.filters.get('base_url'), data=cleaned,
-                   export_format=self.filters.get('export_format','csv'))
-            self.log.emit(f"[✔] Report saved: {out_folder}/{filename}.{self.filters.get('export_format','csv')}")
+        fmt = self.filters.get('export_format', 'csv')
+        try:
+            os.makedirs(out_folder, exist_ok=True)
+            filename = self._report_name(prefix)
+            # a stop that lands after the run's last check still counts as partial
+            delta_key = None if partial or self.stop_flag else self._delta_key(prefix)
+
+            with self.metrics.span("report_export"):
+                if delta_key and rows is None and self.store is not None:
+                    # newest row per ASIN, already sorted: merge-joined against the snapshot as a stream
+                    delta = DeltaReport(os.path.join(out_folder, SNAPSHOT_DIR, f"{delta_key}.jsonl"))
+                    delta.write(self.store.iter_latest(), file_name=f"{filename}_delta", directory=out_folder,
+                                export_format=fmt, currency=self.filters.get('currency'), filters=self.filters,
+                                base_url=self.filters.get('base_url'), presorted=True)
+                else:
+                    # xlsx / html need the whole table
+                    data = rows if rows is not None else (list(self.store.iter_rows()) if self.store is not None else [])
+                    delta = Report(file_name=filename, directory=out_folder, currency=self.filters.get('currency'),
+                                   filters=self.filters, base_url=self.filters.get('base_url'), data=data,
+                                   export_format=fmt, delta_key=delta_key).delta
+            if delta is not None and delta.snapshot_kept:
+                path = delta.path
+                self.log.emit(f"[⚠] No rows this run — delta skipped, previous snapshot kept: {path}")
+            elif delta is not None:
+                d = delta.summary()
+                path = delta.path
+                self.log.emit(f"[✔] Delta report saved: {path} "
+                              f"(+{d['added']} / -{d['removed']} / ~{d['changed']}, {d['unchanged']} unchanged)")
+            else:
+                path = os.path.join(out_folder, f"{filename}.{'xlsx' if fmt in ('xls', 'xlsx') else fmt}")
+                self.log.emit(f"[✔] Report saved: {path}")
         except Exception as e:
             self.log.emit(f"[❌] Failed to save report: {e}")
+            return None
+
+        self._write_run_metrics(out_folder, filename)
+        return path
+
+    def _finish_stopped(self, prefix='', rows=None):
+        """Stopped run: whatever was collected is saved; the journal stays open for resume."""
+        self.log.emit("❌ Scraping stopped by user.")
+        if self.count or rows:
+            self._save_report(prefix, rows, partial=True)
+        if self.store is not None:
+            # the GUI opens the store for re-filtering as soon as it gets the summary
+            self.store.flush()
+        self.stopped.emit(self._summary())
+
+    def _write_run_metrics(self, out_folder, filename):
+        # run metrics next to the report
+        try:
+            base = os.path.join(out_folder, filename)
+            self.metrics.write_summary(base + ".metrics.json")
+            self.metrics.write_prometheus(base + ".prom")
+        except Exception as e:
+            self.log.emit(f"[⚠] Failed to write run metrics: {e}")